@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+INT8 Calibration Pipeline
+Builds a memory-mapped representative dataset from recorded footage (evenly sampled video
+frames plus saved plate crops), runs full-integer TFLite quantization of the exported
+SavedModel with it, and measures speedup and accuracy drop against the float model
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from letterbox import LetterboxPreprocessor
+
+# Inputs, as produced by the pipeline scripts and convert_yolo_to_tflite.py
+DEFAULT_VIDEOS = 'script_videos/*.mp4'
+DEFAULT_CROPS_DIR = 'script_output/LPs_fastplate'
+DEFAULT_SAVED_MODEL_DIR = 'license_plate_detector_saved_model'
+DEFAULT_FLOAT_MODEL = 'androidApp/src/main/assets/models/license_plate_detector.tflite'
+
+# Outputs
+DEFAULT_DATASET_PATH = 'calibration_data_640.npy'
+DEFAULT_INT8_MODEL = 'converted_models/license_plate_detector_int8.tflite'
+
+DEFAULT_IMGSZ = 640
+CROP_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def sample_video_frames(video_paths, count):
+    """Yield up to `count` frames spread evenly over all videos (seeking, not decoding everything)"""
+    frame_counts = []
+    for path in video_paths:
+        cap = cv2.VideoCapture(path)
+        frame_counts.append(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0)
+        cap.release()
+    total_frames = sum(frame_counts)
+    if total_frames == 0 or count <= 0:
+        return
+
+    # Global frame positions, evenly spaced across the concatenated videos
+    positions = np.linspace(0, total_frames - 1, num=min(count, total_frames)).astype(np.int64)
+    video_starts = np.cumsum([0] + frame_counts[:-1])
+    for video_idx, path in enumerate(video_paths):
+        start, length = video_starts[video_idx], frame_counts[video_idx]
+        local_positions = positions[(positions >= start) & (positions < start + length)] - start
+        if len(local_positions) == 0:
+            continue
+        cap = cv2.VideoCapture(path)
+        for position in local_positions:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+            ret, frame = cap.read()
+            if ret:
+                yield frame
+        cap.release()
+
+
+def sample_crops(crops_dir, count):
+    """Yield up to `count` saved plate crops, evenly sampled from `crops_dir`"""
+    paths = sorted(path for path in glob.glob(os.path.join(crops_dir, '*'))
+                   if path.lower().endswith(CROP_EXTENSIONS))
+    if not paths or count <= 0:
+        return
+    for idx in np.linspace(0, len(paths) - 1, num=min(count, len(paths))).astype(np.int64):
+        crop = cv2.imread(paths[idx])
+        if crop is not None:
+            yield crop
+
+
+def build_calibration_dataset(output_path, video_paths, crops_dir=None, size=200, imgsz=DEFAULT_IMGSZ,
+                              crop_fraction=0.2):
+    """
+    Write a (N, imgsz, imgsz, 3) float32 [0, 1] RGB calibration set to an .npy memmap.
+
+    Images are letterboxed exactly like at inference time, and written one at a time into
+    the memory-mapped file, so the set can be much larger than RAM. Returns the number
+    of samples written (N can be below `size` if the sources run out).
+    """
+    num_crops = int(round(size * crop_fraction)) if crops_dir else 0
+    letterbox = LetterboxPreprocessor(imgsz, imgsz)
+    data = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=(size, imgsz, imgsz, 3))
+
+    written = 0
+    sources = [sample_video_frames(video_paths, size - num_crops)]
+    if num_crops:
+        sources.append(sample_crops(crops_dir, num_crops))
+    for source in sources:
+        for image in source:
+            input_tensor, _ = letterbox(image)
+            data[written] = input_tensor[0]
+            written += 1
+    data.flush()
+    del data
+
+    if written < size:
+        # Shrink the file to the samples actually written
+        trimmed = np.load(output_path, mmap_mode='r')[:written].copy()
+        np.save(output_path, trimmed)
+    print(f"✅ Calibration dataset: {written} samples (up to {num_crops} plate crops) -> {output_path}")
+    return written
+
+
+def representative_dataset(dataset_path, num_samples=None):
+    """TFLiteConverter.representative_dataset generator reading the memmapped calibration set"""
+    data = np.load(dataset_path, mmap_mode='r')
+    num_samples = len(data) if num_samples is None else min(num_samples, len(data))
+
+    def representative_data_gen():
+        for idx in range(num_samples):
+            yield [np.ascontiguousarray(data[idx:idx + 1])]
+    return representative_data_gen
+
+
+def quantize_full_integer(saved_model_dir, dataset_path, output_path, num_samples=None):
+    """
+    Full-integer quantization of a SavedModel with the calibration set.
+
+    All ops run in INT8 and the input is uint8, so frames go in without normalization;
+    the output stays float32 so yolo_postprocess decodes it unchanged.
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(dataset_path, num_samples)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    tflite_model = converter.convert()
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+    print(f"✅ INT8 model: {output_path} ({len(tflite_model) / (1024 * 1024):.2f} MB)")
+    return output_path
+
+
+def evaluate_quantization(float_model, int8_model, frames, report_path=None):
+    """Compare the INT8 model against the float model: accuracy drop and p50 speedup"""
+    from compare_detectors import compare_detectors, print_report
+
+    report = compare_detectors(float_model, [int8_model], frames)
+    reference = report['models'][report['reference']]
+    candidate = next(entry for key, entry in report['models'].items() if key != report['reference'])
+    report['speedup_p50'] = reference['latency']['p50_ms'] / candidate['latency']['p50_ms']
+    report['recall_drop'] = 1.0 - candidate['parity']['recall']
+    print_report(report)
+    print(f"⚡ INT8 speedup (p50): {report['speedup_p50']:.2f}x, recall drop vs float: {report['recall_drop']:.3f}")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report saved: {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibrate and INT8-quantize the license plate detector')
+    parser.add_argument('--videos', nargs='+', default=None,
+                        help=f'Videos to sample frames from (default: {DEFAULT_VIDEOS})')
+    parser.add_argument('--crops-dir', default=DEFAULT_CROPS_DIR, help='Directory of saved plate crops')
+    parser.add_argument('--size', type=int, default=200, help='Number of calibration samples (default: 200)')
+    parser.add_argument('--crop-fraction', type=float, default=0.2,
+                        help='Fraction of samples taken from plate crops (default: 0.2)')
+    parser.add_argument('--imgsz', type=int, default=DEFAULT_IMGSZ, help='Model input size (default: 640)')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET_PATH, help='Calibration dataset (.npy) path')
+    parser.add_argument('--reuse-dataset', action='store_true', help='Use an existing --dataset as is')
+    parser.add_argument('--saved-model', default=DEFAULT_SAVED_MODEL_DIR, help='SavedModel to quantize')
+    parser.add_argument('--output', default=DEFAULT_INT8_MODEL, help='INT8 TFLite output path')
+    parser.add_argument('--float-model', default=DEFAULT_FLOAT_MODEL, help='Float TFLite model to compare against')
+    parser.add_argument('--eval-frames', type=int, default=100, help='Frames used for evaluation (default: 100)')
+    parser.add_argument('--report', default='int8_calibration_report.json', help='Evaluation report path')
+    args = parser.parse_args()
+
+    video_paths = args.videos or sorted(glob.glob(DEFAULT_VIDEOS))
+    if not video_paths:
+        print(f"❌ No videos found ({DEFAULT_VIDEOS}), pass --videos")
+        return 1
+
+    print("🚀 INT8 Calibration Pipeline")
+    print("=" * 50)
+    if not (args.reuse_dataset and os.path.exists(args.dataset)):
+        crops_dir = args.crops_dir if os.path.isdir(args.crops_dir) else None
+        if build_calibration_dataset(args.dataset, video_paths, crops_dir, args.size, args.imgsz,
+                                     args.crop_fraction) == 0:
+            print("❌ No calibration samples could be read")
+            return 1
+
+    if not os.path.isdir(args.saved_model):
+        print(f"❌ SavedModel not found: {args.saved_model}")
+        return 1
+    try:
+        quantize_full_integer(args.saved_model, args.dataset, args.output)
+    except Exception as e:
+        print(f"❌ INT8 quantization failed: {e}")
+        return 1
+
+    if not os.path.exists(args.float_model):
+        print(f"⚠️  Float model not found ({args.float_model}), skipping evaluation")
+        return 0
+    from compare_detectors import load_frames
+    frames = load_frames(video_paths[0], args.eval_frames)
+    evaluate_quantization(args.float_model, args.output, frames, args.report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
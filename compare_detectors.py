@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Detector Parity and Speed Regression Suite
+Runs a reference detector (usually the PyTorch .pt model) and its exports (.onnx / .tflite)
+over a directory of frames or a video, then reports box-matching recall/precision, IoU and
+score deltas plus per-backend latency percentiles as JSON. Exits non-zero on regressions,
+so a re-export can be validated before it goes to devices.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from detector_backends import create_detector, match_detections
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Default regression thresholds of a candidate against the reference
+DEFAULT_THRESHOLDS = {
+    'min_recall': 0.95,           # Matched / reference detections
+    'min_precision': 0.95,        # Matched / candidate detections
+    'min_mean_iou': 0.90,         # Mean IoU of matched boxes
+    'max_mean_score_delta': 0.05,  # Mean |candidate - reference| score of matched boxes
+    'max_latency_ratio': 1.2,     # p50 latency vs the same backend in a baseline report
+}
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def load_frames(source, max_frames=100, stride=1):
+    """Read up to `max_frames` BGR frames from a video file or a directory of images"""
+    frames = []
+    if os.path.isdir(source):
+        paths = sorted(path for path in glob.glob(os.path.join(source, '*'))
+                       if path.lower().endswith(IMAGE_EXTENSIONS))
+        for path in paths[::stride][:max_frames]:
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    frame_idx = 0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_idx % stride == 0:
+            frames.append(frame)
+        frame_idx += 1
+    cap.release()
+    return frames
+
+
+def run_detector(detector, frames, warmup=3):
+    """Detect on every frame, returning (detections per frame, latencies in ms)"""
+    for frame in frames[:warmup]:
+        detector.detect(frame)
+    results, latencies = [], []
+    for frame in frames:
+        start_time = time.perf_counter()
+        results.append(detector.detect(frame))
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return results, np.asarray(latencies)
+
+
+def latency_stats(latencies):
+    """Mean and percentile latencies in ms"""
+    stats = {'mean_ms': float(latencies.mean())}
+    for p, value in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES)):
+        stats[f'p{p}_ms'] = float(value)
+    return stats
+
+
+def parity_stats(reference_results, candidate_results, iou_threshold=0.5):
+    """Aggregate box-matching metrics of candidate detections against the reference, over all frames"""
+    total_reference = total_candidate = 0
+    ious, score_deltas = [], []
+    frames_with_count_mismatch = 0
+    for reference, candidate in zip(reference_results, candidate_results):
+        ref_idx, cand_idx, frame_ious = match_detections(reference, candidate, iou_threshold)
+        total_reference += len(reference)
+        total_candidate += len(candidate)
+        ious.append(frame_ious)
+        score_deltas.append(candidate['score'][cand_idx] - reference['score'][ref_idx])
+        frames_with_count_mismatch += len(reference) != len(candidate)
+
+    ious = np.concatenate(ious) if ious else np.zeros(0)
+    score_deltas = np.abs(np.concatenate(score_deltas)) if score_deltas else np.zeros(0)
+    matched = len(ious)
+    return {
+        'reference_detections': total_reference,
+        'candidate_detections': total_candidate,
+        'matched': matched,
+        'recall': matched / total_reference if total_reference else 1.0,
+        'precision': matched / total_candidate if total_candidate else 1.0,
+        'mean_iou': float(ious.mean()) if matched else None,
+        'min_iou': float(ious.min()) if matched else None,
+        'mean_score_delta': float(score_deltas.mean()) if matched else None,
+        'max_score_delta': float(score_deltas.max()) if matched else None,
+        'frames_with_count_mismatch': frames_with_count_mismatch,
+    }
+
+
+def find_regressions(candidate_report, thresholds, baseline_latency=None):
+    """List human-readable threshold violations of one candidate entry"""
+    regressions = []
+    parity = candidate_report['parity']
+    if parity['recall'] < thresholds['min_recall']:
+        regressions.append(f"recall {parity['recall']:.3f} < {thresholds['min_recall']}")
+    if parity['precision'] < thresholds['min_precision']:
+        regressions.append(f"precision {parity['precision']:.3f} < {thresholds['min_precision']}")
+    if parity['mean_iou'] is not None and parity['mean_iou'] < thresholds['min_mean_iou']:
+        regressions.append(f"mean IoU {parity['mean_iou']:.3f} < {thresholds['min_mean_iou']}")
+    if (parity['mean_score_delta'] is not None
+            and parity['mean_score_delta'] > thresholds['max_mean_score_delta']):
+        regressions.append(f"mean score delta {parity['mean_score_delta']:.3f} > {thresholds['max_mean_score_delta']}")
+    if baseline_latency:
+        ratio = candidate_report['latency']['p50_ms'] / baseline_latency['p50_ms']
+        if ratio > thresholds['max_latency_ratio']:
+            regressions.append(f"p50 latency {ratio:.2f}x the baseline > {thresholds['max_latency_ratio']}x")
+    return regressions
+
+
+def compare_detectors(reference_model, candidate_models, frames, conf_threshold=0.25, iou_threshold=0.5,
+                      thresholds=None, baseline=None):
+    """
+    Compare candidate models against a reference model on `frames`.
+
+    Args:
+        reference_model: Model file the candidates should reproduce (i.e. the .pt model)
+        candidate_models: Exported model files (.onnx / .tflite / .pt)
+        frames: BGR frames to run on
+        conf_threshold: Detection confidence threshold for every backend
+        iou_threshold: IoU needed for a candidate box to match a reference box
+        thresholds: Regression thresholds, defaults to DEFAULT_THRESHOLDS
+        baseline: A previous report; latencies are compared to its entries with the same key
+
+    Returns:
+        Report dict; report['passed'] is False if any candidate regressed.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    baseline_models = (baseline or {}).get('models', {})
+
+    reference = create_detector(reference_model, conf_threshold=conf_threshold)
+    reference_results, reference_latencies = run_detector(reference, frames)
+    reference_key = f"{reference.name}:{os.path.basename(reference_model)}"
+    report = {
+        'frames': len(frames),
+        'conf_threshold': conf_threshold,
+        'match_iou_threshold': iou_threshold,
+        'thresholds': thresholds,
+        'reference': reference_key,
+        'models': {reference_key: {'latency': latency_stats(reference_latencies)}},
+        'regressions': {},
+    }
+
+    for model_path in candidate_models:
+        detector = create_detector(model_path, conf_threshold=conf_threshold)
+        results, latencies = run_detector(detector, frames)
+        key = f"{detector.name}:{os.path.basename(model_path)}"
+        entry = {
+            'latency': latency_stats(latencies),
+            'parity': parity_stats(reference_results, results, iou_threshold),
+        }
+        report['models'][key] = entry
+        regressions = find_regressions(entry, thresholds, baseline_models.get(key, {}).get('latency'))
+        if regressions:
+            report['regressions'][key] = regressions
+
+    report['passed'] = not report['regressions']
+    return report
+
+
+def print_report(report):
+    print(f"\n📊 {report['frames']} frames, reference {report['reference']}")
+    for key, entry in report['models'].items():
+        latency = entry['latency']
+        line = f"   {key:40s} p50={latency['p50_ms']:7.1f}ms p90={latency['p90_ms']:7.1f}ms p99={latency['p99_ms']:7.1f}ms"
+        if 'parity' in entry:
+            parity = entry['parity']
+            mean_iou = f"{parity['mean_iou']:.3f}" if parity['mean_iou'] is not None else '-'
+            line += f" recall={parity['recall']:.3f} precision={parity['precision']:.3f} IoU={mean_iou}"
+        print(line)
+    for key, regressions in report['regressions'].items():
+        for regression in regressions:
+            print(f"❌ {key}: {regression}")
+    if report['passed']:
+        print("✅ No regressions")
+
+
+def validate_export(reference_model, candidate_model, source, max_frames=100, report_path=None):
+    """Check an exported model against its source model, returning True if it has no regressions"""
+    frames = load_frames(source, max_frames)
+    if not frames:
+        print(f"❌ No frames read from: {source}")
+        return False
+    report = compare_detectors(reference_model, [candidate_model], frames)
+    print_report(report)
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report saved: {report_path}")
+    return report['passed']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detector parity and speed regression suite across backends')
+    parser.add_argument('reference', help='Reference model (i.e. license_plate_detector.pt)')
+    parser.add_argument('candidates', nargs='+', help='Models to check against the reference (.onnx / .tflite / .pt)')
+    parser.add_argument('--source', default='script_videos/luxury.mp4',
+                        help='Video file or directory of images (default: script_videos/luxury.mp4)')
+    parser.add_argument('--frames', type=int, default=100, help='Maximum number of frames (default: 100)')
+    parser.add_argument('--stride', type=int, default=1, help='Use every Nth frame/image (default: 1)')
+    parser.add_argument('--conf', type=float, default=0.25, help='Detection confidence threshold (default: 0.25)')
+    parser.add_argument('--match-iou', type=float, default=0.5, help='IoU for a box to match (default: 0.5)')
+    parser.add_argument('--baseline', help='Previous JSON report to check latency regressions against')
+    parser.add_argument('--output', default='detector_comparison.json', help='JSON report path')
+    for name, value in DEFAULT_THRESHOLDS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value,
+                            help=f'Regression threshold (default: {value})')
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames, args.stride)
+    if not frames:
+        print(f"❌ No frames read from: {args.source}")
+        return 2
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    thresholds = {name: getattr(args, name) for name in DEFAULT_THRESHOLDS}
+    report = compare_detectors(args.reference, args.candidates, frames, args.conf, args.match_iou,
+                               thresholds, baseline)
+    print_report(report)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report saved: {args.output}")
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ PyTorch to TensorFlow Lite Conversion Script
 Converts license_plate_detector.pt to optimized TFLite format for Android deployment
 """
 
+import glob
 import os
 import sys
 import shutil
@@ -232,13 +233,19 @@ def create_simple_savedmodel(model, save_dir, example_input):
         return False
 
 def create_representative_dataset():
-    """Create representative dataset for quantization"""
-    def representative_data_gen():
-        for _ in range(100):
-            # Generate random input data matching your model's expected input
-            data = np.random.random((1, INPUT_SIZE, INPUT_SIZE, 3)).astype(np.float32)
-            yield [data]
-    return representative_data_gen
+    """Create representative dataset for quantization from recorded footage (see calibration.py)"""
+    from calibration import (DEFAULT_CROPS_DIR, DEFAULT_DATASET_PATH, DEFAULT_VIDEOS,
+                             build_calibration_dataset, representative_dataset)
+    
+    if not os.path.exists(DEFAULT_DATASET_PATH):
+        print(f"   Building calibration dataset from {DEFAULT_VIDEOS} and {DEFAULT_CROPS_DIR}...")
+        video_paths = sorted(glob.glob(DEFAULT_VIDEOS))
+        crops_dir = DEFAULT_CROPS_DIR if os.path.isdir(DEFAULT_CROPS_DIR) else None
+        if build_calibration_dataset(DEFAULT_DATASET_PATH, video_paths, crops_dir, size=100, imgsz=INPUT_SIZE) == 0:
+            raise RuntimeError("No calibration samples could be read, record footage into script_videos/ first")
+    else:
+        print(f"   Using calibration dataset: {DEFAULT_DATASET_PATH}")
+    return representative_dataset(DEFAULT_DATASET_PATH)
 
 def convert_to_tflite(saved_model_dir, output_path, quantize=True):
     """Convert TensorFlow SavedModel to TensorFlow Lite"""
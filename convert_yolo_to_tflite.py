@@ -4,6 +4,7 @@ YOLO to TensorFlow Lite Conversion Script
 Uses ultralytics YOLO's built-in export functionality for proper conversion
 """
 
+import argparse
 import os
 import shutil
 from pathlib import Path
@@ -13,8 +14,10 @@ from ultralytics import YOLO
 PYTORCH_MODEL_PATH = "license_plate_detector.pt"
 ANDROID_MODELS_DIR = "androidApp/src/main/assets/models"
 TFLITE_MODEL_NAME = "license_plate_detector.tflite"
+VALIDATION_SOURCE = "script_videos/luxury.mp4"
+VALIDATION_REPORT = "tflite_validation_report.json"
 
-def main():
+def main(validate=True, validation_source=VALIDATION_SOURCE, validation_frames=100):
     """Main conversion pipeline using YOLO's export functionality"""
     print("🚀 YOLO to TensorFlow Lite Conversion Script")
     print("=" * 50)
@@ -63,6 +66,19 @@ def main():
         size_mb = os.path.getsize(tflite_path) / (1024 * 1024)
         print(f"   Exported model size: {size_mb:.2f} MB")
         
+        # Check parity/speed against the PyTorch model before anything reaches devices
+        if not validate:
+            print("⚠️ Skipping validation against the PyTorch model (--skip-validation)")
+        else:
+            from compare_detectors import validate_export
+
+            print(f"🔍 Validating export against {PYTORCH_MODEL_PATH} on {validation_source}...")
+            if not validate_export(PYTORCH_MODEL_PATH, tflite_path, validation_source,
+                                   validation_frames, VALIDATION_REPORT):
+                print(f"❌ Validation failed, not copying to Android assets (exported model kept at {tflite_path})")
+                return False
+            print(f"✅ Validation passed")
+        
         # Copy to Android assets
         print(f"📁 Copying to Android assets folder...")
         
@@ -103,5 +119,14 @@ def main():
         return False
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Convert the YOLO license plate detector to TFLite for Android")
+    parser.add_argument("--skip-validation", action="store_true",
+                        help="Copy to Android assets without the compare_detectors.py parity/speed checks "
+                             "against the PyTorch model (they run by default)")
+    parser.add_argument("--validation-source", default=VALIDATION_SOURCE,
+                        help=f"Video or image directory used for validation (default: {VALIDATION_SOURCE})")
+    parser.add_argument("--validation-frames", type=int, default=100,
+                        help="Number of frames used for validation (default: 100)")
+    args = parser.parse_args()
+    success = main(not args.skip_validation, args.validation_source, args.validation_frames)
     exit(0 if success else 1) 
\ No newline at end of file
@@ -11,6 +11,9 @@ from ultralytics import YOLO
 import time
 from pathlib import Path
 
+from letterbox import LetterboxPreprocessor
+from yolo_postprocess import decode_yolo_output, detections_to_list
+
 def test_pytorch_model(model_path, test_frame):
     """Test the original PyTorch YOLO model"""
     print("🔍 Testing PyTorch model...")
@@ -70,22 +73,10 @@ def test_tflite_model(model_path, test_frame, confidence_threshold=0.25):
         input_shape = input_details[0]['shape']
         input_height, input_width = input_shape[1], input_shape[2]
         
-        # Resize image
-        input_image = cv2.resize(test_frame, (input_width, input_height))
-        
-        # Convert BGR to RGB
-        input_image = cv2.cvtColor(input_image, cv2.COLOR_BGR2RGB)
-        
-        # Normalize based on input type
-        if input_details[0]['dtype'] == np.uint8:
-            input_image = input_image.astype(np.uint8)
-            print(f"   Using UINT8 input (0-255 range)")
-        else:
-            input_image = input_image.astype(np.float32) / 255.0
-            print(f"   Using FLOAT32 input (0-1 range)")
-        
-        # Add batch dimension
-        input_image = np.expand_dims(input_image, axis=0)
+        # Letterbox (same preprocessing as the test script), BGR->RGB and normalization
+        letterbox = LetterboxPreprocessor.for_input_details(input_details[0])
+        input_image, ratio_pad = letterbox(test_frame)
+        print(f"   Using {input_details[0]['dtype'].__name__} input, letterbox ratio/pad: {ratio_pad}")
         
         print(f"   Preprocessed shape: {input_image.shape}")
         print(f"   Preprocessed dtype: {input_image.dtype}")
@@ -142,14 +133,15 @@ def test_tflite_model(model_path, test_frame, confidence_threshold=0.25):
                 final_confidence = confidence
         
         # Apply the same postprocessing as in the test script
-        detections = postprocess_tflite_output(outputs, test_frame.shape, confidence_threshold)
+        detections = postprocess_tflite_output(outputs, test_frame.shape, confidence_threshold,
+                                               (input_height, input_width), ratio_pad)
         
         print(f"✅ TFLite model results:")
         print(f"   Detections found: {len(detections)}")
         for i, det in enumerate(detections):
             print(f"   Detection {i}: bbox={det['bbox']}, conf={det['confidence']:.3f}")
         
-        return detections, inference_time, outputs
+        return detections, inference_time, (outputs, (input_height, input_width), ratio_pad)
         
     except Exception as e:
         print(f"❌ TFLite model error: {e}")
@@ -157,80 +149,18 @@ def test_tflite_model(model_path, test_frame, confidence_threshold=0.25):
         traceback.print_exc()
         return [], 0, None
 
-def postprocess_tflite_output(outputs, original_image_shape, confidence_threshold=0.25):
+def postprocess_tflite_output(outputs, original_image_shape, confidence_threshold=0.25, input_shape=None, ratio_pad=None):
     """Postprocess TFLite outputs with debugging"""
     output = outputs[0]
-    
-    # Handle different output formats
-    if len(output.shape) == 3:
-        output = output[0]
-    
     print(f"   Processing output shape: {output.shape}")
     
-    # CRITICAL: The TFLite model has shape (5, 8400) which is TRANSPOSED!
-    # PyTorch YOLO normally outputs (num_detections, num_classes+5)
-    # But TFLite outputs (num_classes+5, num_detections)
-    if output.shape[0] == 5 and output.shape[1] > output.shape[0]:
-        print("   Detected transposed output format - transposing back")
-        output = output.T  # Transpose to get (8400, 5)
-        print(f"   After transpose: {output.shape}")
-    
-    # Extract boxes, scores, and class predictions
-    if output.shape[1] >= 5:
-        boxes = output[:, :4]
-        confidence = output[:, 4]
-        
-        if output.shape[1] > 5:
-            class_scores = output[:, 5:]
-            class_confidence = np.max(class_scores, axis=1)
-            final_confidence = confidence * class_confidence
-        else:
-            final_confidence = confidence
-    else:
-        boxes = output[:, :4]
-        final_confidence = np.ones(len(boxes)) * 0.5
-    
-    print(f"   Final confidence stats: min={final_confidence.min():.6f}, max={final_confidence.max():.6f}")
+    # The TFLite model outputs (1, 4+classes, 8400), transposed relative to PyTorch's
+    # (8400, 4+classes); the shared decoder handles either layout
+    detections = decode_yolo_output(output, original_image_shape, conf_threshold=confidence_threshold,
+                                    input_shape=input_shape, ratio_pad=ratio_pad)
     
-    # Filter by confidence threshold
-    valid_detections = final_confidence > confidence_threshold
-    boxes = boxes[valid_detections]
-    final_confidence = final_confidence[valid_detections]
-    
-    print(f"   Valid detections after filtering: {len(boxes)}")
-    
-    # Convert center coordinates to corner coordinates
-    detections = []
-    orig_h, orig_w = original_image_shape[:2]
-    
-    for i, (box, conf) in enumerate(zip(boxes, final_confidence)):
-        center_x, center_y, width, height = box
-        
-        # Convert to pixel coordinates
-        center_x *= orig_w
-        center_y *= orig_h
-        width *= orig_w
-        height *= orig_h
-        
-        # Convert to corner coordinates
-        x1 = int(center_x - width / 2)
-        y1 = int(center_y - height / 2)
-        x2 = int(center_x + width / 2)
-        y2 = int(center_y + height / 2)
-        
-        # Ensure coordinates are within image bounds
-        x1 = max(0, min(x1, orig_w))
-        y1 = max(0, min(y1, orig_h))
-        x2 = max(0, min(x2, orig_w))
-        y2 = max(0, min(y2, orig_h))
-        
-        detections.append({
-            'bbox': [x1, y1, x2, y2],
-            'confidence': float(conf),
-            'class': 'license_plate'
-        })
-    
-    return detections
+    print(f"   Valid detections after threshold + NMS: {len(detections)}")
+    return detections_to_list(detections)
 
 def draw_comparison(image, pytorch_detections, tflite_detections):
     """Draw detections from both models for comparison"""
@@ -245,7 +175,7 @@ def draw_comparison(image, pytorch_detections, tflite_detections):
     
     # Draw TFLite detections in red
     for det in tflite_detections:
-        x1, y1, x2, y2 = det['bbox']
+        x1, y1, x2, y2 = map(int, det['bbox'])
         cv2.rectangle(result, (x1, y1), (x2, y2), (0, 0, 255), 2)
         cv2.putText(result, f"TFLite: {det['confidence']:.2f}", 
                    (x1, y2+20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
@@ -328,7 +258,8 @@ def main():
             # Try different confidence thresholds for TFLite
             print("\n🔧 Testing different confidence thresholds for TFLite:")
             for threshold in [0.01, 0.05, 0.1, 0.15, 0.2, 0.25]:
-                test_dets = postprocess_tflite_output(raw_output, frame.shape, threshold)
+                outputs, input_shape, ratio_pad = raw_output
+                test_dets = postprocess_tflite_output(outputs, frame.shape, threshold, input_shape, ratio_pad)
                 print(f"   Threshold {threshold:.2f}: {len(test_dets)} detections")
         
         elif len(pytorch_dets) > 0 and len(tflite_dets) > 0:
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Detection Cache
+Per-frame detector outputs stored in a columnar .npz file keyed by (video content, model,
+backend, thresholds, rotation), so OCR / rectification / validation experiments replay the
+vehicle and plate detections instead of re-running the YOLO models on the whole video
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from yolo_postprocess import empty_detections, make_detections
+
+# Bumped whenever the stored layout changes, so old cache files are ignored
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join('script_output', 'detection_cache')
+
+# New frames after which the cache is written to disk, so a crash mid-video only loses the last few
+DEFAULT_SAVE_INTERVAL = 500
+
+# Files larger than 3 samples are fingerprinted by their size and a head, middle and tail sample,
+# so a multi-GB video is identified in milliseconds rather than hashed end to end
+FINGERPRINT_SAMPLE_BYTES = 4 * 1024 * 1024
+
+
+def file_fingerprint(path, sample_bytes=FINGERPRINT_SAMPLE_BYTES):
+    """SHA-1 of a file's content (sampled for large files, see FINGERPRINT_SAMPLE_BYTES)"""
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode('ascii'))
+    with open(path, 'rb') as f_in:
+        if size <= 3 * sample_bytes:
+            digest.update(f_in.read())
+        else:
+            for offset in (0, (size - sample_bytes) // 2, size - sample_bytes):
+                f_in.seek(offset)
+                digest.update(f_in.read(sample_bytes))
+    return digest.hexdigest()
+
+
+def detection_cache_key(video_path, model_path, backend, conf_threshold, iou_threshold, rotation=0):
+    """Everything the cached detections depend on, as a JSON-serializable dict"""
+    return {
+        'format': CACHE_FORMAT_VERSION,
+        'video': file_fingerprint(video_path),
+        'model': file_fingerprint(model_path),
+        'backend': backend,
+        'conf_threshold': round(float(conf_threshold), 6),
+        'iou_threshold': round(float(iou_threshold), 6),
+        'rotation': rotation,
+    }
+
+
+def detection_cache_path(cache_dir, video_path, model_path, key):
+    """Cache file of a key, named after the video and model so the directory stays browsable"""
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    video_name = os.path.splitext(os.path.basename(video_path))[0]
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{video_name}_{model_name}_{digest}.npz")
+
+
+class DetectionCache:
+    """
+    DETECTION_DTYPE arrays of one detector on one video, by frame index.
+
+    On disk the frames are stored in CSR layout: sorted `frame_idx`, `offsets` into the
+    concatenated `bbox` / `score` / `class_id` columns, and the JSON `key` they were made with.
+    A file whose key doesn't match is ignored (and overwritten on save). The file is rewritten every
+    `save_interval` new frames (0 only saves on an explicit `save()`).
+    """
+
+    def __init__(self, path, key, save_interval=DEFAULT_SAVE_INTERVAL):
+        self.path = path
+        self.key = key
+        self.save_interval = save_interval
+        self.hits = 0
+        self.misses = 0
+        self._frames = {}  # frame_idx -> DETECTION_DTYPE array
+        self._unsaved = 0  # Frames added since the last save
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Serializes writers of the (shared) temporary file
+        if os.path.isfile(path):
+            self._load()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as data:
+            if json.loads(str(data['key'])) != self.key:
+                print(f"Detection cache {self.path} was made with other settings, ignoring it")
+                return
+            offsets = data['offsets']
+            bbox, score, class_id = data['bbox'], data['score'], data['class_id']
+            for i, frame_idx in enumerate(data['frame_idx'].tolist()):
+                start, end = offsets[i], offsets[i + 1]
+                self._frames[frame_idx] = make_detections(bbox[start:end], score[start:end], class_id[start:end])
+
+    def get(self, frame_idx):
+        """Cached detections of a frame, or None"""
+        with self._lock:
+            detections = self._frames.get(frame_idx)
+            if detections is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return detections
+
+    def put(self, frame_idx, detections):
+        with self._lock:
+            self._frames[frame_idx] = detections
+            self._unsaved += 1
+            save_due = 0 < self.save_interval <= self._unsaved
+        if save_due:
+            self.save()
+
+    def save(self):
+        """Write the cache (atomically, via a temporary file) if frames were added since the last save"""
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return False
+                frame_indices = sorted(self._frames)
+                frames = [self._frames[frame_idx] for frame_idx in frame_indices]
+                self._unsaved = 0
+            detections = np.concatenate(frames) if frames else empty_detections()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp.npz'
+            np.savez_compressed(
+                tmp_path,
+                key=np.array(json.dumps(self.key, sort_keys=True)),
+                frame_idx=np.asarray(frame_indices, dtype=np.int64),
+                offsets=np.concatenate([[0], np.cumsum([len(frame) for frame in frames])]).astype(np.int64),
+                bbox=detections['bbox'],
+                score=detections['score'],
+                class_id=detections['class_id'],
+            )
+            os.replace(tmp_path, self.path)
+            return True
+
+
+class CachedDetector:
+    """
+    Detector wrapper replaying the cached detections of a frame index, and running the wrapped
+    detector (and caching its output) on frames not cached yet.
+    """
+
+    def __init__(self, detector, cache):
+        self.detector = detector
+        self.cache = cache
+        self.name = detector.name
+        self.model_path = detector.model_path
+
+    def detect(self, frame, frame_idx=None):
+        if frame_idx is None:
+            return self.detector.detect(frame)
+        detections = self.cache.get(frame_idx)
+        if detections is None:
+            detections = self.detector.detect(frame)
+            self.cache.put(frame_idx, detections)
+        return detections
+
+    def detect_batch(self, frames, frame_indices=None):
+        if frame_indices is None:
+            return self.detector.detect_batch(frames)
+        return [self.detect(frame, frame_idx) for frame, frame_idx in zip(frames, frame_indices)]
+
+
+def open_cached_detector(detector, video_path, conf_threshold, iou_threshold, rotation=0,
+                         cache_dir=DEFAULT_CACHE_DIR, save_interval=DEFAULT_SAVE_INTERVAL):
+    """Wrap `detector` in a CachedDetector backed by the cache file of this video and settings"""
+    key = detection_cache_key(video_path, detector.model_path, detector.name, conf_threshold, iou_threshold,
+                              rotation)
+    cache = DetectionCache(detection_cache_path(cache_dir, video_path, detector.model_path, key), key,
+                           save_interval=save_interval)
+    if len(cache):
+        print(f"Detection cache: replaying {len(cache)} frames of {detector.name} ({detector.model_path}) "
+              f"from {cache.path}")
+    return CachedDetector(detector, cache)
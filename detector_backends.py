@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Detector Backends
+One Detector interface over Ultralytics (PyTorch), ONNX Runtime and TFLite YOLO models.
+Every backend returns the same yolo_postprocess.DETECTION_DTYPE arrays, and each runtime
+is imported lazily so a pipeline only pays for the one it actually uses. Parity and speed
+checks between backends live in compare_detectors.py.
+"""
+
+import os
+from typing import List, Protocol
+
+import numpy as np
+
+from letterbox import LetterboxPreprocessor
+from yolo_postprocess import box_iou, decode_yolo_output, empty_detections, make_detections
+
+BACKENDS = ('ultralytics', 'onnx', 'tflite')
+
+# Model file extension -> backend used by backend='auto'
+BACKEND_BY_EXTENSION = {
+    '.pt': 'ultralytics',
+    '.onnx': 'onnx',
+    '.tflite': 'tflite',
+}
+
+# Default input size for exports with dynamic spatial dimensions
+DEFAULT_IMGSZ = 640
+
+
+class Detector(Protocol):
+    """A YOLO detector returning DETECTION_DTYPE arrays in original frame pixels"""
+    name: str
+    model_path: str
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        ...
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        ...
+
+
+class UltralyticsDetector:
+    """Ultralytics YOLO (.pt) backend"""
+    name = 'ultralytics'
+
+    def __init__(self, model_path, conf_threshold=0.25, iou_threshold=0.45):
+        from ultralytics import YOLO
+
+        self.model_path = model_path
+        self.model = YOLO(model_path)
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+    def _to_detections(self, result):
+        data = result.boxes.data
+        if len(data) == 0:
+            return empty_detections()
+        data = data.cpu().numpy()
+        return make_detections(data[:, :4], data[:, 4], data[:, 5].astype(np.int32))
+
+    def detect(self, frame):
+        result = self.model(frame, verbose=False, conf=self.conf_threshold, iou=self.iou_threshold)[0]
+        return self._to_detections(result)
+
+    def detect_batch(self, frames):
+        results = self.model(list(frames), verbose=False, conf=self.conf_threshold, iou=self.iou_threshold)
+        return [self._to_detections(result) for result in results]
+
+
+class ONNXRuntimeDetector:
+    """ONNX Runtime backend for YOLO models exported with `format='onnx'` (NCHW float input)"""
+    name = 'onnx'
+
+    def __init__(self, model_path, conf_threshold=0.25, iou_threshold=0.45, providers=None,
+                 num_threads=None):
+        import onnxruntime as ort
+
+        sess_options = ort.SessionOptions()
+        if num_threads:
+            sess_options.intra_op_num_threads = num_threads
+        self.model_path = model_path
+        self.session = ort.InferenceSession(
+            model_path, sess_options=sess_options, providers=providers or ['CPUExecutionProvider'])
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height, width = model_input.shape[2:4]
+        self.input_shape = (
+            height if isinstance(height, int) else DEFAULT_IMGSZ,
+            width if isinstance(width, int) else DEFAULT_IMGSZ,
+        )
+        dtype = np.float16 if model_input.type == 'tensor(float16)' else np.float32
+        self.letterbox = LetterboxPreprocessor(*self.input_shape, dtype=dtype, channels_first=True)
+
+    def detect(self, frame):
+        input_tensor, ratio_pad = self.letterbox(frame)
+        output = self.session.run(None, {self.input_name: input_tensor})[0]
+        # Ultralytics ONNX exports emit boxes in input pixels (not normalized)
+        return decode_yolo_output(
+            output, frame.shape,
+            conf_threshold=self.conf_threshold,
+            iou_threshold=self.iou_threshold,
+            input_shape=self.input_shape,
+            ratio_pad=ratio_pad,
+            normalized=False,
+        )
+
+    def detect_batch(self, frames):
+        return [self.detect(frame) for frame in frames]
+
+
+class TFLiteBackendDetector:
+    """TFLite backend, backed by a TFLiteInterpreterPool (one interpreter per worker)"""
+    name = 'tflite'
+
+    def __init__(self, model_path, conf_threshold=0.25, iou_threshold=0.45, num_workers=1,
+                 num_threads=None, use_xnnpack=True):
+        from tflite_pool import TFLiteInterpreterPool
+
+        self.model_path = model_path
+        self.pool = TFLiteInterpreterPool(model_path, num_workers, num_threads, use_xnnpack,
+                                          conf_threshold, iou_threshold)
+
+    def detect(self, frame):
+        return self.pool.detect(frame)
+
+    def detect_batch(self, frames):
+        return self.pool.detect_batch(frames)
+
+
+def resolve_backend(model_path, backend='auto'):
+    """Pick the backend for a model file ('auto' goes by file extension)"""
+    if backend != 'auto':
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown detector backend '{backend}', expected one of {BACKENDS}")
+        return backend
+    extension = os.path.splitext(model_path)[1].lower()
+    if extension not in BACKEND_BY_EXTENSION:
+        raise ValueError(f"Cannot infer detector backend from '{model_path}', pass backend explicitly")
+    return BACKEND_BY_EXTENSION[extension]
+
+
+def create_detector(model_path, backend='auto', conf_threshold=0.25, iou_threshold=0.45, **kwargs):
+    """
+    Create a Detector for `model_path`.
+
+    Extra keyword arguments go to the backend (i.e. num_threads for onnx/tflite,
+    num_workers/use_xnnpack for tflite, providers for onnx).
+    """
+    backend = resolve_backend(model_path, backend)
+    if backend == 'ultralytics':
+        return UltralyticsDetector(model_path, conf_threshold, iou_threshold)
+    if backend == 'onnx':
+        return ONNXRuntimeDetector(model_path, conf_threshold, iou_threshold, **kwargs)
+    return TFLiteBackendDetector(model_path, conf_threshold, iou_threshold, **kwargs)
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Greedily match candidate detections to reference detections of the same class.
+
+    Returns (ref_indices, cand_indices, ious) of the matched pairs.
+    """
+    if len(reference) == 0 or len(candidate) == 0:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float32)
+    iou = box_iou(reference['bbox'], candidate['bbox'])
+    iou[reference['class_id'][:, None] != candidate['class_id'][None, :]] = 0.0
+
+    ref_indices, cand_indices, ious = [], [], []
+    used = np.zeros(len(candidate), dtype=bool)
+    for ref_idx in np.argsort(reference['score'])[::-1]:
+        row = np.where(used, 0.0, iou[ref_idx])
+        cand_idx = int(row.argmax())
+        if row[cand_idx] >= iou_threshold:
+            used[cand_idx] = True
+            ref_indices.append(ref_idx)
+            cand_indices.append(cand_idx)
+            ious.append(row[cand_idx])
+    return np.asarray(ref_indices, np.int64), np.asarray(cand_indices, np.int64), np.asarray(ious, np.float32)
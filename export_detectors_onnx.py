@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+YOLO Detectors to ONNX Export Script
+Exports the vehicle (yolov8n.pt) and license plate detectors to ONNX once, so the
+runtime pipeline can run them through ONNX Runtime without importing torch/ultralytics
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Models used by python_yolo_fast_plate.py
+DEFAULT_MODELS = ['yolov8n.pt', 'license_plate_detector.pt']
+
+# Budget for the lean runtime path (numpy + cv2 + onnxruntime)
+MAX_RUNTIME_RSS_MB = 200
+MAX_RUNTIME_IMPORT_SECONDS = 1.0
+
+# Imports the ONNX detector path and reports (import seconds, peak RSS MB, torch imported)
+_RUNTIME_PROBE = """
+import resource, sys, time
+start_time = time.perf_counter()
+from detector_backends import create_detector
+import_seconds = time.perf_counter() - start_time
+for model_path in sys.argv[1:]:
+    create_detector(model_path, backend='onnx')
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(import_seconds, rss_mb, 'torch' in sys.modules)
+"""
+
+
+def export_model(model_path, imgsz=640, opset=12, simplify=True):
+    """Export a YOLO .pt model to ONNX next to it, returning the .onnx path"""
+    from ultralytics import YOLO
+
+    print(f"📥 Loading YOLO model from {model_path}")
+    model = YOLO(model_path)
+    print(f"🔄 Exporting to ONNX (imgsz={imgsz}, opset={opset})...")
+    # Static input shape and raw (pre-NMS) head: decoding/NMS runs in yolo_postprocess
+    onnx_path = str(model.export(
+        format='onnx',
+        imgsz=imgsz,
+        opset=opset,
+        simplify=simplify,
+        dynamic=False,
+        half=False,
+        device='cpu',
+    ))
+    size_mb = os.path.getsize(onnx_path) / (1024 * 1024)
+    print(f"✅ ONNX export successful: {onnx_path} ({size_mb:.2f} MB)")
+    return onnx_path
+
+
+def check_runtime_footprint(onnx_paths):
+    """
+    Load the ONNX models in a fresh interpreter and report import time and peak RSS.
+
+    Runs in a subprocess because this process has already imported torch for the export.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-c', _RUNTIME_PROBE] + [os.path.abspath(path) for path in onnx_paths],
+        cwd=script_dir, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(f"❌ Runtime check failed:\n{result.stderr}")
+        return False
+
+    import_seconds, rss_mb, torch_imported = result.stdout.split()[-3:]
+    import_seconds, rss_mb = float(import_seconds), float(rss_mb)
+    print(f"⏱️  Detector import time: {import_seconds:.3f}s (target < {MAX_RUNTIME_IMPORT_SECONDS:.0f}s)")
+    print(f"💾 Peak RSS with {len(onnx_paths)} model(s) loaded: {rss_mb:.0f} MB (target < {MAX_RUNTIME_RSS_MB} MB)")
+    if torch_imported == 'True':
+        print("⚠️  torch was imported on the ONNX path")
+
+    return (import_seconds < MAX_RUNTIME_IMPORT_SECONDS and rss_mb < MAX_RUNTIME_RSS_MB
+            and torch_imported != 'True')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export YOLO detectors to ONNX for the ONNX Runtime pipeline')
+    parser.add_argument('models', nargs='*', default=DEFAULT_MODELS,
+                        help=f"YOLO .pt models to export (default: {' '.join(DEFAULT_MODELS)})")
+    parser.add_argument('--imgsz', type=int, default=640, help='Export input size (default: 640)')
+    parser.add_argument('--opset', type=int, default=12, help='ONNX opset version (default: 12)')
+    parser.add_argument('--no-simplify', action='store_true', help='Skip onnxsim graph simplification')
+    parser.add_argument('--check-only', action='store_true',
+                        help='Skip exporting and only check the runtime footprint of existing .onnx files')
+    args = parser.parse_args()
+
+    print("🚀 YOLO to ONNX Export Script")
+    print("=" * 50)
+
+    onnx_paths = []
+    for model_path in args.models:
+        onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+        if args.check_only:
+            if not os.path.exists(onnx_path):
+                print(f"❌ ONNX model not found: {onnx_path}")
+                return False
+        elif not os.path.exists(model_path):
+            print(f"❌ PyTorch model not found: {model_path}")
+            return False
+        else:
+            try:
+                onnx_path = export_model(model_path, args.imgsz, args.opset, not args.no_simplify)
+            except Exception as e:
+                print(f"❌ Export of {model_path} failed: {e}")
+                return False
+        onnx_paths.append(onnx_path)
+
+    print("\n🔍 Checking the ONNX Runtime detector path...")
+    ok = check_runtime_footprint(onnx_paths)
+    if ok:
+        print("\n🎉 ONNX detectors ready, run python_yolo_fast_plate.py with --detector-backend onnx")
+    return ok
+
+
+if __name__ == '__main__':
+    success = main()
+    exit(0 if success else 1)
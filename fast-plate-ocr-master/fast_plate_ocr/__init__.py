@@ -2,6 +2,19 @@
 Fast Plate OCR package.
 """
 
-from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
 
 __all__ = ["ONNXPlateRecognizer"]
+
+
+def __getattr__(name: str) -> Any:
+    # Lazily import the recognizer (and onnxruntime), so importing submodules stays cheap
+    if name == "ONNXPlateRecognizer":
+        # pylint: disable=import-outside-toplevel
+        from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
+
+        return ONNXPlateRecognizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
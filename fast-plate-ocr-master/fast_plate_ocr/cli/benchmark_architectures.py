@@ -0,0 +1,134 @@
+"""
+Script to compare the CPU ONNX Runtime latency and accuracy of the OCR model architectures.
+"""
+
+import pathlib
+
+import click
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from fast_plate_ocr.train.model.config import load_config_from_yaml
+from fast_plate_ocr.train.utilities import utils
+from fast_plate_ocr.train.utilities.architecture_benchmark import (
+    ARCHITECTURE_VARIANTS,
+    benchmark_architecture,
+)
+
+# pylint: disable=too-many-arguments
+
+
+@click.command(context_settings={"max_content_width": 120})
+@click.option(
+    "--config-file",
+    required=True,
+    type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
+    help="Path pointing to the model license plate OCR config.",
+)
+@click.option(
+    "--variants",
+    "-v",
+    multiple=True,
+    default=tuple(ARCHITECTURE_VARIANTS),
+    show_default=True,
+    type=click.Choice(list(ARCHITECTURE_VARIANTS)),
+    help="Untrained architecture variants to benchmark.",
+)
+@click.option(
+    "-m",
+    "--model",
+    "model_paths",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
+    help="Trained .keras models to benchmark, instead of the untrained variants.",
+)
+@click.option(
+    "--annotations",
+    type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
+    help="Annotations CSV file used to measure the plate accuracy of the trained models.",
+)
+@click.option(
+    "--batch-size",
+    default=64,
+    show_default=True,
+    type=int,
+    help="Batch size used to measure the throughput.",
+)
+@click.option(
+    "--runs",
+    default=50,
+    show_default=True,
+    type=int,
+    help="Number of timed runs per model.",
+)
+@click.option(
+    "--num-threads",
+    default=1,
+    show_default=True,
+    type=int,
+    help="ONNX Runtime intra-op threads.",
+)
+def benchmark_architectures(
+    config_file: pathlib.Path,
+    variants: tuple[str, ...],
+    model_paths: tuple[pathlib.Path, ...],
+    annotations: pathlib.Path | None,
+    batch_size: int,
+    runs: int,
+    num_threads: int,
+) -> None:
+    """
+    Benchmark the CPU ONNX Runtime latency of the OCR model architectures.
+    """
+    config = load_config_from_yaml(config_file)
+    if model_paths:
+        models = {
+            model_path.stem: utils.load_keras_model(
+                model_path,
+                vocab_size=config.vocabulary_size,
+                max_plate_slots=config.max_plate_slots,
+            )
+            for model_path in model_paths
+        }
+    else:
+        if annotations:
+            raise click.UsageError("--annotations requires trained models passed with --model.")
+        models = {
+            variant: utils.build_model(config, **ARCHITECTURE_VARIANTS[variant])
+            for variant in variants
+        }
+    table = Table(
+        title=f"Architecture Benchmark (ONNX Runtime CPU, {num_threads} thread(s))",
+        show_header=True,
+        header_style="bold blue",
+        box=box.ROUNDED,
+    )
+    for column in ("Model", "Params", "Latency (ms)", f"Plates/s (batch {batch_size})"):
+        table.add_column(column, justify="right")
+    if annotations:
+        table.add_column("Plate accuracy", justify="right")
+    for name, model in models.items():
+        result = benchmark_architecture(
+            name,
+            model,
+            config,
+            batch_size=batch_size,
+            runs=runs,
+            num_threads=num_threads,
+            annotations_file=annotations,
+        )
+        row = [
+            result.name,
+            f"{result.num_params:,}",
+            f"{result.latency_ms:.3f}",
+            f"{result.plates_per_second:,.0f}",
+        ]
+        if result.plate_accuracy is not None:
+            row.append(f"{result.plate_accuracy:.4f}")
+        table.add_row(*row)
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    benchmark_architectures()
@@ -0,0 +1,110 @@
+"""
+Script to benchmark the per-sample and batched training augmentations.
+"""
+
+import pathlib
+import time
+
+import click
+import numpy as np
+
+from fast_plate_ocr.cli.utils import print_variables_as_table
+from fast_plate_ocr.train.data.augmentation import BATCH_TRAIN_AUGMENTATION, BatchAugmentation
+from fast_plate_ocr.train.utilities import utils
+
+# pylint: disable=too-many-arguments
+
+
+@click.command(context_settings={"max_content_width": 120})
+@click.option(
+    "--img-dir",
+    "-d",
+    required=True,
+    type=click.Path(exists=True, dir_okay=True, path_type=pathlib.Path),
+    help="Path to the images used for the benchmark.",
+)
+@click.option(
+    "--augmentation-path",
+    type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
+    help="YAML file with the batch augmentation parameters, as saved by train in "
+    "'train_batch_augmentation.yaml'. Defaults to the batch training recipe.",
+)
+@click.option(
+    "--batch-size",
+    "-b",
+    default=128,
+    show_default=True,
+    type=int,
+    help="Batch size.",
+)
+@click.option(
+    "--num-batches",
+    "-n",
+    default=20,
+    show_default=True,
+    type=int,
+    help="Number of batches to augment with each pipeline.",
+)
+@click.option(
+    "--height",
+    "-h",
+    type=int,
+    default=70,
+    show_default=True,
+    help="Height to which the images will be resize.",
+)
+@click.option(
+    "--width",
+    "-w",
+    type=int,
+    default=140,
+    show_default=True,
+    help="Width to which the images will be resize.",
+)
+def benchmark_augmentation(
+    img_dir: pathlib.Path,
+    augmentation_path: pathlib.Path | None,
+    batch_size: int,
+    num_batches: int,
+    height: int,
+    width: int,
+) -> None:
+    """
+    Benchmark the batched augmentation against the equivalent per-sample Albumentations pipeline.
+    """
+    batch_augmentation = (
+        BatchAugmentation.load(augmentation_path) if augmentation_path else BATCH_TRAIN_AUGMENTATION
+    )
+    # Same augmentations, so both sides do the same work
+    augmentation = batch_augmentation.to_albumentations()
+    images = utils.load_images_from_folder(img_dir, width=width, height=height)
+    if not images:
+        raise click.UsageError(f"No images found in {img_dir}.")
+    # Repeat the images so every batch is full
+    batch = np.stack([images[i % len(images)] for i in range(batch_size)])
+
+    per_sample_start = time.perf_counter()
+    for _ in range(num_batches):
+        np.stack([augmentation(image=image)["image"] for image in batch])
+    per_sample_time = time.perf_counter() - per_sample_start
+
+    batch_start = time.perf_counter()
+    for _ in range(num_batches):
+        batch_augmentation(batch.copy())
+    batch_time = time.perf_counter() - batch_start
+
+    num_images = batch_size * num_batches
+    print_variables_as_table(
+        c1_title="Pipeline",
+        c2_title="Throughput",
+        title="Augmentation Benchmark",
+        per_sample=f"{num_images / per_sample_time:,.0f} img/s "
+        f"({1_000 * per_sample_time / num_batches:.2f} ms/batch)",
+        batch=f"{num_images / batch_time:,.0f} img/s "
+        f"({1_000 * batch_time / num_batches:.2f} ms/batch)",
+        speedup=f"{per_sample_time / batch_time:.1f}x",
+    )
+
+
+if __name__ == "__main__":
+    benchmark_augmentation()
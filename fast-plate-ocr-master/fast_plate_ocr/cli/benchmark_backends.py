@@ -0,0 +1,119 @@
+"""
+Script to benchmark the training speed of the Keras backends on the current machine.
+"""
+
+import pathlib
+
+import click
+
+from fast_plate_ocr.cli.utils import print_variables_as_table
+from fast_plate_ocr.train.model.config import load_config_from_yaml
+from fast_plate_ocr.train.utilities.backend_benchmark import run_backend_benchmark
+from fast_plate_ocr.train.utilities.backend_utils import DtypePolicy, Framework, JitCompile
+
+# pylint: disable=too-many-arguments
+
+
+@click.command(context_settings={"max_content_width": 120})
+@click.option(
+    "--config-file",
+    required=True,
+    type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
+    help="Path pointing to the model license plate OCR config.",
+)
+@click.option(
+    "--backends",
+    "-k",
+    multiple=True,
+    default=("jax", "tensorflow", "torch"),
+    show_default=True,
+    type=click.Choice(["jax", "tensorflow", "torch"]),
+    help="Keras backends to benchmark, backends that aren't installed are reported as such.",
+)
+@click.option(
+    "--batch-size",
+    default=128,
+    show_default=True,
+    type=int,
+    help="Batch size for training.",
+)
+@click.option(
+    "--steps",
+    default=30,
+    show_default=True,
+    type=int,
+    help="Number of timed training steps.",
+)
+@click.option(
+    "--warmup-steps",
+    default=5,
+    show_default=True,
+    type=int,
+    help="Number of untimed training steps run first, these include the model compilation.",
+)
+@click.option(
+    "--dtype-policy",
+    default="float32",
+    show_default=True,
+    type=click.Choice(["float32", "mixed_float16", "mixed_bfloat16"]),
+    help="Keras dtype policy.",
+)
+@click.option(
+    "--jit-compile",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "true", "false"]),
+    help="Whether to compile the training step.",
+)
+def benchmark_backends(
+    config_file: pathlib.Path,
+    backends: tuple[Framework, ...],
+    batch_size: int,
+    steps: int,
+    warmup_steps: int,
+    dtype_policy: DtypePolicy,
+    jit_compile: JitCompile,
+) -> None:
+    """
+    Benchmark training steps per second of each Keras backend, to pick the fastest one.
+    """
+    config = load_config_from_yaml(config_file)
+    results = [
+        run_backend_benchmark(
+            framework,
+            img_height=config.img_height,
+            img_width=config.img_width,
+            max_plate_slots=config.max_plate_slots,
+            vocabulary_size=config.vocabulary_size,
+            batch_size=batch_size,
+            steps=steps,
+            warmup_steps=warmup_steps,
+            dtype_policy=dtype_policy,
+            jit_compile=jit_compile,
+        )
+        for framework in backends
+    ]
+    results.sort(key=lambda r: -r.steps_per_second if r.steps_per_second else float("inf"))
+    print_variables_as_table(
+        c1_title="Backend",
+        c2_title="Training speed",
+        title=f"Backend Benchmark (batch size {batch_size}, {dtype_policy})",
+        **{
+            result.framework: (
+                f"{result.steps_per_second:.2f} steps/s "
+                f"({result.steps_per_second * batch_size:,.0f} plates/s)"
+                if result.steps_per_second
+                else f"unavailable: {result.error}"
+            )
+            for result in results
+        },
+    )
+    if results and results[0].steps_per_second:
+        click.echo(
+            f"Fastest backend: {results[0].framework} "
+            f"(fast_plate_ocr train --backend {results[0].framework} ...)"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_backends()
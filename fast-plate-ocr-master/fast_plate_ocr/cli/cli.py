@@ -5,6 +5,10 @@ Main CLI used when training a FastPlateOCR model.
 try:
     import click
 
+    from fast_plate_ocr.cli.benchmark_architectures import benchmark_architectures
+    from fast_plate_ocr.cli.benchmark_augmentation import benchmark_augmentation
+    from fast_plate_ocr.cli.benchmark_backends import benchmark_backends
+    from fast_plate_ocr.cli.distill import distill
     from fast_plate_ocr.cli.onnx_converter import export_onnx
     from fast_plate_ocr.cli.train import train
     from fast_plate_ocr.cli.valid import valid
@@ -23,4 +27,8 @@ main_cli.add_command(visualize_predictions)
 main_cli.add_command(visualize_augmentation)
 main_cli.add_command(valid)
 main_cli.add_command(train)
+main_cli.add_command(distill)
 main_cli.add_command(export_onnx)
+main_cli.add_command(benchmark_augmentation)
+main_cli.add_command(benchmark_backends)
+main_cli.add_command(benchmark_architectures)
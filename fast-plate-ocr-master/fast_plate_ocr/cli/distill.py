@@ -0,0 +1,257 @@
+"""
+Script for distilling a (heavier) ONNX OCR model into a CNN OCR model, using unlabelled plates.
+"""
+
+import pathlib
+import shutil
+from datetime import datetime
+from typing import Literal
+
+import albumentations as A
+import click
+from torch.utils.data import DataLoader
+
+from fast_plate_ocr.cli.utils import print_params, print_train_details
+from fast_plate_ocr.inference import hub
+from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
+from fast_plate_ocr.train.data.augmentation import TRAIN_AUGMENTATION, load_augmentation
+from fast_plate_ocr.train.data.dataset import LicensePlateDataset, SoftTargetDataset
+from fast_plate_ocr.train.data.soft_targets import compile_soft_targets
+from fast_plate_ocr.train.model.config import load_config_from_yaml
+from fast_plate_ocr.train.utilities import utils
+
+# ruff: noqa: PLR0913
+# pylint: disable=too-many-arguments,too-many-locals
+
+
+@click.command(context_settings={"max_content_width": 120})
+@click.option(
+    "--teacher",
+    default="global-plates-mobile-vit-v2-model",
+    show_default=True,
+    type=click.Choice(list(hub.AVAILABLE_ONNX_MODELS)),
+    help="Teacher OCR model from the HUB.",
+)
+@click.option(
+    "--teacher-model",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
+    help="Custom ONNX teacher model, used instead of --teacher. Requires --teacher-config.",
+)
+@click.option(
+    "--teacher-config",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
+    help="Config of the custom ONNX teacher model.",
+)
+@click.option(
+    "--img-dir",
+    required=True,
+    type=click.Path(exists=True, dir_okay=True, file_okay=False, path_type=pathlib.Path),
+    help="Directory containing the unlabelled plate crops.",
+)
+@click.option(
+    "--val-annotations",
+    type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
+    help="Optional labelled validation CSV file. Without it, the agreement with the teacher on the "
+    "train images is monitored.",
+)
+@click.option(
+    "--cache-dir",
+    default="./distill_cache",
+    show_default=True,
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    help="Directory where the teacher soft targets are cached, so the teacher runs only once.",
+)
+@click.option(
+    "--teacher-batch-size",
+    default=256,
+    show_default=True,
+    type=int,
+    help="Batch size used to run the teacher.",
+)
+@click.option(
+    "--device",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "cpu", "cuda"]),
+    help="Device used by ONNX Runtime to run the teacher.",
+)
+@click.option(
+    "--temperature",
+    default=1.0,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Temperature applied to the teacher probabilities, values above 1 soften them.",
+)
+@click.option(
+    "--augmentation-path",
+    type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
+    help="YAML file pointing to the augmentation pipeline saved with Albumentations.save(...)",
+)
+@click.option(
+    "--dense/--no-dense",
+    default=True,
+    show_default=True,
+    help="Whether to use Fully Connected layers in the student head or not.",
+)
+@click.option(
+    "--activation",
+    default="relu",
+    show_default=True,
+    type=str,
+    help="Activation function to use.",
+)
+@click.option(
+    "--pool-layer",
+    default="max",
+    show_default=True,
+    type=click.Choice(["max", "avg"]),
+    help="Choose the pooling layer to use.",
+)
+@click.option(
+    "--lr",
+    default=1e-3,
+    show_default=True,
+    type=float,
+    help="Initial learning rate to use.",
+)
+@click.option(
+    "--batch-size",
+    default=128,
+    show_default=True,
+    type=int,
+    help="Batch size for training.",
+)
+@click.option(
+    "--num-workers",
+    default=0,
+    show_default=True,
+    type=int,
+    help="How many subprocesses to load data, used in the torch DataLoader.",
+)
+@click.option(
+    "--output-dir",
+    default="./trained_models",
+    type=click.Path(dir_okay=True, path_type=pathlib.Path),
+    help="Output directory where model will be saved.",
+)
+@click.option(
+    "--epochs",
+    default=300,
+    show_default=True,
+    type=int,
+    help="Number of training epochs.",
+)
+@click.option(
+    "--early-stopping-patience",
+    default=60,
+    show_default=True,
+    type=int,
+    help="Stop training when the monitored plate accuracy doesn't improve for X epochs.",
+)
+@click.option(
+    "--reduce-lr-patience",
+    default=30,
+    show_default=True,
+    type=int,
+    help="Patience to reduce the learning rate if the plate accuracy doesn't improve in X epochs.",
+)
+@click.option(
+    "--reduce-lr-factor",
+    default=0.85,
+    show_default=True,
+    type=float,
+    help="Reduce the learning rate by this factor when the plate accuracy doesn't improve.",
+)
+@print_params(table_title="CLI Distillation Parameters", c1_title="Parameter", c2_title="Details")
+def distill(
+    teacher: hub.OcrModel,
+    teacher_model: pathlib.Path | None,
+    teacher_config: pathlib.Path | None,
+    img_dir: pathlib.Path,
+    val_annotations: pathlib.Path | None,
+    cache_dir: pathlib.Path,
+    teacher_batch_size: int,
+    device: Literal["auto", "cpu", "cuda"],
+    temperature: float,
+    augmentation_path: pathlib.Path | None,
+    dense: bool,
+    activation: str,
+    pool_layer: Literal["max", "avg"],
+    lr: float,
+    batch_size: int,
+    num_workers: int,
+    output_dir: pathlib.Path,
+    epochs: int,
+    early_stopping_patience: int,
+    reduce_lr_patience: int,
+    reduce_lr_factor: float,
+) -> None:
+    """
+    Distill a teacher ONNX model into a CNN OCR model, trained on the teacher soft targets.
+    """
+    if bool(teacher_model) != bool(teacher_config):
+        raise click.UsageError("--teacher-model and --teacher-config must be given together.")
+    if teacher_model is None or teacher_config is None:
+        teacher_model, teacher_config = hub.download_model(model_name=teacher)
+    # The student predicts the same slots and alphabet as the teacher, from the same image size
+    config = load_config_from_yaml(teacher_config)
+    recognizer = ONNXPlateRecognizer(
+        model_path=teacher_model, config_path=teacher_config, device=device
+    )
+    soft_targets_dir = compile_soft_targets(
+        recognizer,
+        utils.list_image_paths(img_dir),
+        config,
+        cache_dir,
+        batch_size=teacher_batch_size,
+    )
+    train_augmentation = (
+        load_augmentation(augmentation_path) if augmentation_path else TRAIN_AUGMENTATION
+    )
+    print_train_details(train_augmentation, config.model_dump())
+    train_dataloader = DataLoader(
+        SoftTargetDataset(soft_targets_dir, transform=train_augmentation, temperature=temperature),
+        batch_size=batch_size,
+        num_workers=num_workers,
+        shuffle=True,
+    )
+    val_dataloader = (
+        DataLoader(
+            LicensePlateDataset(annotations_file=val_annotations, config=config),
+            batch_size=batch_size,
+            num_workers=num_workers,
+            shuffle=False,
+        )
+        if val_annotations
+        else None
+    )
+    monitor = "val_plate_acc" if val_dataloader else "plate_acc"
+
+    model = utils.build_model(
+        config, "cnn", dense=dense, activation=activation, pool_layer=pool_layer
+    )
+    # The soft targets are already smooth, so no label smoothing is applied on top of them
+    utils.compile_model(model, config, lr, label_smoothing=0.0)
+
+    output_dir /= datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_file_path = output_dir / (
+        f"cnn_ocr_distilled-epoch_{{epoch:02d}}-acc_{{{monitor}:.3f}}.keras"
+    )
+
+    # Save config and augmentation used for training
+    shutil.copy(teacher_config, output_dir / "config.yaml")
+    A.save(train_augmentation, output_dir / "train_augmentation.yaml", "yaml")
+
+    callbacks = utils.training_callbacks(
+        model_file_path,
+        monitor,
+        early_stopping_patience=early_stopping_patience,
+        reduce_lr_patience=reduce_lr_patience,
+        reduce_lr_factor=reduce_lr_factor,
+    )
+    model.fit(train_dataloader, epochs=epochs, validation_data=val_dataloader, callbacks=callbacks)
+
+
+if __name__ == "__main__":
+    distill()
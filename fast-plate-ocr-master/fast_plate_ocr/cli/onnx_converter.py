@@ -17,7 +17,17 @@ import tf2onnx
 from tf2onnx import constants as tf2onnx_constants
 
 from fast_plate_ocr.common.utils import log_time_taken
+from fast_plate_ocr.inference.static_batch import (
+    DEFAULT_STATIC_BATCH_SIZES,
+    static_model_path_for,
+    write_manifest,
+)
 from fast_plate_ocr.train.model.config import load_config_from_yaml
+from fast_plate_ocr.train.utilities.quantization import (
+    QUANTIZATION_MODES,
+    load_annotated_plates,
+    quantize_and_validate,
+)
 from fast_plate_ocr.train.utilities.utils import load_keras_model
 
 logging.basicConfig(
@@ -25,9 +35,54 @@ logging.basicConfig(
 )
 
 
+# ruff: noqa: PLR0913
 # pylint: disable=too-many-arguments,too-many-locals
 
 
+def _parse_batch_sizes(
+    _ctx: click.Context, _param: click.Parameter, value: str | None
+) -> tuple[int, ...]:
+    if not value:
+        return ()
+    try:
+        batch_sizes = tuple(sorted({int(size) for size in value.split(",")}))
+    except ValueError as e:
+        raise click.BadParameter("Expected comma separated integers, i.e. '1,4,8,16'.") from e
+    if batch_sizes[0] < 1:
+        raise click.BadParameter("Batch sizes must be positive.")
+    return batch_sizes
+
+
+def _keras_to_onnx(
+    model: tf.keras.Model,
+    input_shape: tuple[int | None, ...],
+    opset: int,
+    output_path: str | pathlib.Path,
+    simplify: bool,
+) -> onnx.ModelProto:
+    """
+    Convert a Keras model with an uint8 input of `input_shape` to ONNX, optionally simplified.
+    """
+    spec = (tf.TensorSpec(input_shape, tf.uint8, name="input"),)
+    # Convert from Keras to ONNX using tf2onnx library
+    with NamedTemporaryFile(suffix=".onnx") as tmp:
+        tmp_onnx = tmp.name
+        model_proto, _ = tf2onnx.convert.from_keras(
+            model,
+            input_signature=spec,
+            opset=opset,
+            output_path=tmp_onnx,
+        )
+        if simplify:
+            logging.info("Simplifying ONNX model ...")
+            model_simp, check = onnxsim.simplify(onnx.load(tmp_onnx))
+            assert check, "Simplified ONNX model could not be validated!"
+            onnx.save(model_simp, output_path)
+        else:
+            shutil.copy(tmp_onnx, output_path)
+    return model_proto
+
+
 @click.command(context_settings={"max_content_width": 120})
 @click.option(
     "-m",
@@ -62,39 +117,92 @@ logging.basicConfig(
     show_default=True,
     help="Opset version for ONNX.",
 )
+@click.option(
+    "--static-batch-sizes",
+    default=None,
+    callback=_parse_batch_sizes,
+    help="Comma separated batch sizes to also export static-batch variants for, i.e. "
+    f"'{','.join(map(str, DEFAULT_STATIC_BATCH_SIZES))}'. They are saved as '<output>_b<N>.onnx' "
+    "with a '<output>.manifest.json' that ONNXPlateRecognizer uses to dispatch requests.",
+)
+@click.option(
+    "--quantize",
+    "quantize_mode",
+    default=None,
+    type=click.Choice(QUANTIZATION_MODES),
+    help="Also save a quantized copy of the exported model, only if its plate accuracy on "
+    "--eval-annotations is within --max-accuracy-drop of the float model. 'static-int8' also "
+    "requires --calibration-annotations.",
+)
+@click.option(
+    "--quantized-output-path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="Output for the quantized model. Defaults to the output path with the mode as suffix, "
+    "i.e. 'model_dynamic_int8.onnx'.",
+)
+@click.option(
+    "--calibration-annotations",
+    default=None,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
+    help="Annotations file whose plates are used to calibrate static INT8 quantization.",
+)
+@click.option(
+    "--calibration-samples",
+    default=200,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Max number of plates used for calibration and evaluation.",
+)
+@click.option(
+    "--eval-annotations",
+    default=None,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
+    help="Annotations file used to compare plate accuracy of the quantized and float model. "
+    "Required by --quantize, unless --calibration-annotations is given (then the accuracy is "
+    "measured on the calibration plates).",
+)
+@click.option(
+    "--max-accuracy-drop",
+    default=0.01,
+    show_default=True,
+    type=click.FloatRange(min=0.0, max=1.0),
+    help="Quantized model is not saved if its plate accuracy drops more than this.",
+)
 def export_onnx(
     model_path: pathlib.Path,
     output_path: str,
     simplify: bool,
     config_file: pathlib.Path,
     opset: int,
+    static_batch_sizes: tuple[int, ...],
+    quantize_mode: str | None,
+    quantized_output_path: pathlib.Path | None,
+    calibration_annotations: pathlib.Path | None,
+    calibration_samples: int,
+    eval_annotations: pathlib.Path | None,
+    max_accuracy_drop: float,
 ) -> None:
     """
     Export Keras models to ONNX format.
     """
+    if quantize_mode == "static-int8" and calibration_annotations is None:
+        raise click.BadParameter(
+            "static-int8 needs --calibration-annotations.", param_hint="--quantize"
+        )
+    if quantize_mode is not None and eval_annotations is None and calibration_annotations is None:
+        raise click.BadParameter(
+            f"{quantize_mode} needs --eval-annotations to check the plate accuracy drop.",
+            param_hint="--quantize",
+        )
     config = load_config_from_yaml(config_file)
     model = load_keras_model(
         model_path,
         vocab_size=config.vocabulary_size,
         max_plate_slots=config.max_plate_slots,
     )
-    spec = (tf.TensorSpec((None, config.img_height, config.img_width, 1), tf.uint8, name="input"),)
-    # Convert from Keras to ONNX using tf2onnx library
-    with NamedTemporaryFile(suffix=".onnx") as tmp:
-        tmp_onnx = tmp.name
-        model_proto, _ = tf2onnx.convert.from_keras(
-            model,
-            input_signature=spec,
-            opset=opset,
-            output_path=tmp_onnx,
-        )
-        if simplify:
-            logging.info("Simplifying ONNX model ...")
-            model_simp, check = onnxsim.simplify(onnx.load(tmp_onnx))
-            assert check, "Simplified ONNX model could not be validated!"
-            onnx.save(model_simp, output_path)
-        else:
-            shutil.copy(tmp_onnx, output_path)
+    input_shape = (config.img_height, config.img_width, 1)
+    model_proto = _keras_to_onnx(model, (None, *input_shape), opset, output_path, simplify)
     output_names = [n.name for n in model_proto.graph.output]
     x = np.random.randint(0, 256, size=(1, config.img_height, config.img_width, 1), dtype=np.uint8)
     # Run dummy inference and log time taken
@@ -105,6 +213,53 @@ def export_onnx(
     if not np.allclose(model.predict(x, verbose=0), onnx_pred[0], rtol=1e-5, atol=1e-5):
         logging.warning("ONNX model output was not close to Keras model for the given tolerance!")
     logging.info("Model converted to ONNX! Saved at %s", output_path)
+    if static_batch_sizes:
+        static_models = {}
+        for batch_size in static_batch_sizes:
+            static_path = static_model_path_for(output_path, batch_size)
+            _keras_to_onnx(model, (batch_size, *input_shape), opset, static_path, simplify)
+            x_batch = np.random.randint(0, 256, size=(batch_size, *input_shape), dtype=np.uint8)
+            static_pred = rt.InferenceSession(static_path).run(output_names, {"input": x_batch})
+            if not np.allclose(
+                m.run(output_names, {"input": x_batch})[0], static_pred[0], rtol=1e-5, atol=1e-5
+            ):
+                logging.warning("Static batch %d model output differs from dynamic!", batch_size)
+            static_models[batch_size] = static_path
+            logging.info("Static batch %d model saved at %s", batch_size, static_path)
+        manifest_path = write_manifest(output_path, static_models)
+        logging.info("Static batch manifest saved at %s", manifest_path)
+    if quantize_mode is None:
+        return
+    calibration_images = None
+    if calibration_annotations is not None:
+        calibration_images, _ = load_annotated_plates(
+            calibration_annotations, config, calibration_samples
+        )
+    if eval_annotations is None:
+        logging.warning(
+            "No --eval-annotations given, the accuracy drop is measured on the calibration plates."
+        )
+        eval_annotations = calibration_annotations
+    # One of them is required with --quantize, checked before exporting
+    assert eval_annotations is not None
+    eval_x, eval_y = load_annotated_plates(eval_annotations, config, calibration_samples)
+    float_path = pathlib.Path(output_path)
+    if quantized_output_path is None:
+        quantized_output_path = float_path.with_name(
+            f"{float_path.stem}_{quantize_mode.replace('-', '_')}{float_path.suffix}"
+        )
+    if not quantize_and_validate(
+        float_path,
+        quantized_output_path,
+        quantize_mode,
+        eval_x,
+        eval_y,
+        calibration_images,
+        max_accuracy_drop,
+    ):
+        raise click.ClickException(
+            f"Quantized ({quantize_mode}) model was rejected, plate accuracy dropped too much."
+        )
 
 
 if __name__ == "__main__":
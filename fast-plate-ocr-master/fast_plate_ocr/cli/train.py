@@ -2,39 +2,113 @@
 Script for training the License Plate OCR models.
 """
 
+import os
 import pathlib
 import shutil
+import subprocess
+import sys
 from datetime import datetime
 from typing import Literal
 
 import albumentations as A
 import click
-from keras.src.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau, TensorBoard
-from keras.src.optimizers import Adam
+import keras
+from keras.src.callbacks import TensorBoard
 from torch.utils.data import DataLoader
 
 from fast_plate_ocr.cli.utils import print_params, print_train_details
-from fast_plate_ocr.train.data.augmentation import TRAIN_AUGMENTATION
+from fast_plate_ocr.train.data.augmentation import (
+    BATCH_TRAIN_AUGMENTATION,
+    TRAIN_AUGMENTATION,
+    BatchAugmentation,
+    load_augmentation,
+)
 from fast_plate_ocr.train.data.dataset import LicensePlateDataset
 from fast_plate_ocr.train.model.config import load_config_from_yaml
-from fast_plate_ocr.train.model.custom import (
-    cat_acc_metric,
-    cce_loss,
-    plate_acc_metric,
-    top_3_k_metric,
+from fast_plate_ocr.train.utilities import utils
+from fast_plate_ocr.train.utilities.backend_utils import (
+    DtypePolicy,
+    Framework,
+    JitCompile,
+    parse_jit_compile,
 )
-from fast_plate_ocr.train.model.models import cnn_ocr_model
 
 # ruff: noqa: PLR0913
 # pylint: disable=too-many-arguments,too-many-locals
 
 
+def _ensure_keras_backend(
+    _ctx: click.Context, _param: click.Parameter, value: Framework | None
+) -> Framework | None:
+    """
+    Keras binds its backend when it is first imported, so if the requested backend isn't the one
+    already loaded, the same command is run again with `KERAS_BACKEND` set.
+    """
+    if value is not None and value != keras.backend.backend():
+        env = {**os.environ, "KERAS_BACKEND": value}
+        raise SystemExit(subprocess.call([sys.executable, *sys.orig_argv[1:]], env=env))
+    return value
+
+
 @click.command(context_settings={"max_content_width": 120})
+@click.option(
+    "--backend",
+    default=None,
+    type=click.Choice(["jax", "tensorflow", "torch"]),
+    callback=_ensure_keras_backend,
+    expose_value=False,
+    help="Keras backend used for training. Defaults to the KERAS_BACKEND environment variable or "
+    "~/.keras/keras.json. See 'fast_plate_ocr benchmark-backends' to find the fastest one.",
+)
+@click.option(
+    "--dtype-policy",
+    default="float32",
+    show_default=True,
+    type=click.Choice(["float32", "mixed_float16", "mixed_bfloat16"]),
+    help="Keras dtype policy. Mixed precision computes in 16 bits while keeping the weights in "
+    "float32, mixed_bfloat16 is usually the fastest on CPUs with bf16 support.",
+)
+@click.option(
+    "--jit-compile",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "true", "false"]),
+    help="Whether to compile the training step, with XLA (TensorFlow/JAX) or torch.compile "
+    "(PyTorch).",
+)
+@click.option(
+    "--model-type",
+    default="cnn",
+    show_default=True,
+    type=click.Choice(["cnn", "light"]),
+    help="Model architecture, 'light' uses a depthwise separable backbone. See "
+    "'fast_plate_ocr benchmark-architectures' to compare their latency.",
+)
 @click.option(
     "--dense/--no-dense",
     default=True,
     show_default=True,
-    help="Whether to use Fully Connected layers in model head or not.",
+    help="Whether to use Fully Connected layers in model head or not (only for 'cnn' model).",
+)
+@click.option(
+    "--width-multiplier",
+    default=1.0,
+    show_default=True,
+    type=float,
+    help="Multiplier of the number of channels of every layer (only for 'light' model).",
+)
+@click.option(
+    "--depth",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of backbone stages, each halves the resolution (only for 'light' model).",
+)
+@click.option(
+    "--shared-head/--no-shared-head",
+    default=True,
+    show_default=True,
+    help="Whether to classify all the slots with the same Dense layer (only for 'light' model).",
 )
 @click.option(
     "--config-file",
@@ -57,7 +131,17 @@ from fast_plate_ocr.train.model.models import cnn_ocr_model
 @click.option(
     "--augmentation-path",
     type=click.Path(exists=True, file_okay=True, path_type=pathlib.Path),
-    help="YAML file pointing to the augmentation pipeline saved with Albumentations.save(...)",
+    help="YAML file pointing to the augmentation pipeline saved with Albumentations.save(...). "
+    "With --augmentation-mode batch, the BatchAugmentation parameters instead, i.e. the "
+    "'train_batch_augmentation.yaml' saved by a previous training.",
+)
+@click.option(
+    "--augmentation-mode",
+    default="per-sample",
+    show_default=True,
+    type=click.Choice(["per-sample", "batch"]),
+    help="Augment each sample inside the Dataset with Albumentations, or whole collated batches "
+    "with the faster BatchAugmentation (affine, brightness/contrast and pixel dropout).",
 )
 @click.option(
     "--lr",
@@ -87,6 +171,13 @@ from fast_plate_ocr.train.model.models import cnn_ocr_model
     type=int,
     help="How many subprocesses to load data, used in the torch DataLoader.",
 )
+@click.option(
+    "--cache-dir",
+    default=None,
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    help="If set, decode and resize the train/val images once into memory-mapped caches inside "
+    "this directory, and read every epoch from them instead of the image files.",
+)
 @click.option(
     "--output-dir",
     default="./trained_models",
@@ -147,7 +238,7 @@ from fast_plate_ocr.train.model.models import cnn_ocr_model
     default="max",
     show_default=True,
     type=click.Choice(["max", "avg"]),
-    help="Choose the pooling layer to use.",
+    help="Choose the pooling layer to use (only for 'cnn' model).",
 )
 @click.option(
     "--weights-path",
@@ -156,15 +247,23 @@ from fast_plate_ocr.train.model.models import cnn_ocr_model
 )
 @print_params(table_title="CLI Training Parameters", c1_title="Parameter", c2_title="Details")
 def train(
+    dtype_policy: DtypePolicy,
+    jit_compile: JitCompile,
+    model_type: Literal["cnn", "light"],
     dense: bool,
+    width_multiplier: float,
+    depth: int,
+    shared_head: bool,
     config_file: pathlib.Path,
     annotations: pathlib.Path,
     val_annotations: pathlib.Path,
     augmentation_path: pathlib.Path | None,
+    augmentation_mode: Literal["per-sample", "batch"],
     lr: float,
     label_smoothing: float,
     batch_size: int,
     num_workers: int,
+    cache_dir: pathlib.Path | None,
     output_dir: pathlib.Path,
     epochs: int,
     tensorboard: bool,
@@ -179,24 +278,41 @@ def train(
     """
     Train the License Plate OCR model.
     """
-    train_augmentation = (
-        A.load(augmentation_path, data_format="yaml") if augmentation_path else TRAIN_AUGMENTATION
-    )
     config = load_config_from_yaml(config_file)
-    print_train_details(train_augmentation, config.model_dump())
+    # Only one of them is used, per-sample inside the Dataset or batch after collation
+    per_sample_augmentation: A.Compose | None = None
+    batch_augmentation: BatchAugmentation | None = None
+    if augmentation_mode == "batch":
+        batch_augmentation = (
+            BatchAugmentation.load(augmentation_path)
+            if augmentation_path
+            else BATCH_TRAIN_AUGMENTATION
+        )
+        print_train_details(batch_augmentation, config.model_dump())
+    else:
+        per_sample_augmentation = (
+            load_augmentation(augmentation_path) if augmentation_path else TRAIN_AUGMENTATION
+        )
+        print_train_details(per_sample_augmentation, config.model_dump())
     train_torch_dataset = LicensePlateDataset(
         annotations_file=annotations,
-        transform=train_augmentation,
+        transform=per_sample_augmentation,
         config=config,
+        cache_dir=cache_dir,
     )
     train_dataloader = DataLoader(
-        train_torch_dataset, batch_size=batch_size, num_workers=num_workers, shuffle=True
+        train_torch_dataset,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        shuffle=True,
+        collate_fn=batch_augmentation.collate if batch_augmentation is not None else None,
     )
 
     if val_annotations:
         val_torch_dataset = LicensePlateDataset(
             annotations_file=val_annotations,
             config=config,
+            cache_dir=cache_dir,
         )
         val_dataloader = DataLoader(
             val_torch_dataset, batch_size=batch_size, num_workers=num_workers, shuffle=False
@@ -205,31 +321,23 @@ def train(
         val_dataloader = None
 
     # Train
-    model = cnn_ocr_model(
-        h=config.img_height,
-        w=config.img_width,
-        dense=dense,
-        max_plate_slots=config.max_plate_slots,
-        vocabulary_size=config.vocabulary_size,
-        activation=activation,
-        pool_layer=pool_layer,
+    keras.config.set_dtype_policy(dtype_policy)
+    model_kwargs = (
+        {"width_multiplier": width_multiplier, "depth": depth, "shared_head": shared_head}
+        if model_type == "light"
+        else {"dense": dense, "pool_layer": pool_layer}
     )
+    model = utils.build_model(config, model_type, activation=activation, **model_kwargs)
 
     if weights_path:
         model.load_weights(weights_path)
 
-    model.compile(
-        loss=cce_loss(vocabulary_size=config.vocabulary_size, label_smoothing=label_smoothing),
-        optimizer=Adam(lr),
-        metrics=[
-            cat_acc_metric(
-                max_plate_slots=config.max_plate_slots, vocabulary_size=config.vocabulary_size
-            ),
-            plate_acc_metric(
-                max_plate_slots=config.max_plate_slots, vocabulary_size=config.vocabulary_size
-            ),
-            top_3_k_metric(vocabulary_size=config.vocabulary_size),
-        ],
+    utils.compile_model(
+        model,
+        config,
+        lr,
+        label_smoothing=label_smoothing,
+        jit_compile=parse_jit_compile(jit_compile),
     )
 
     output_dir /= datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -238,35 +346,18 @@ def train(
 
     # Save params and config used for training
     shutil.copy(config_file, output_dir / "config.yaml")
-    A.save(train_augmentation, output_dir / "train_augmentation.yaml", "yaml")
+    if batch_augmentation is not None:
+        batch_augmentation.save(output_dir / "train_batch_augmentation.yaml")
+    if per_sample_augmentation is not None:
+        A.save(per_sample_augmentation, output_dir / "train_augmentation.yaml", "yaml")
 
-    callbacks = [
-        # Reduce the learning rate by 0.5x if 'val_plate_acc' doesn't improve within X epochs
-        ReduceLROnPlateau(
-            "val_plate_acc",
-            patience=reduce_lr_patience,
-            factor=reduce_lr_factor,
-            min_lr=1e-6,
-            verbose=1,
-        ),
-        # Stop training when 'val_plate_acc' doesn't improve for X epochs
-        EarlyStopping(
-            monitor="val_plate_acc",
-            patience=early_stopping_patience,
-            mode="max",
-            restore_best_weights=False,
-            verbose=1,
-        ),
-        # We don't use EarlyStopping restore_best_weights=True because it won't restore the best
-        # weights when it didn't manage to EarlyStop but finished all epochs
-        ModelCheckpoint(
-            model_file_path,
-            monitor="val_plate_acc",
-            mode="max",
-            save_best_only=True,
-            verbose=1,
-        ),
-    ]
+    callbacks = utils.training_callbacks(
+        model_file_path,
+        "val_plate_acc",
+        early_stopping_patience=early_stopping_patience,
+        reduce_lr_patience=reduce_lr_patience,
+        reduce_lr_factor=reduce_lr_factor,
+    )
 
     if tensorboard:
         run_dir = tensorboard_dir / datetime.now().strftime("run_%Y%m%d_%H%M%S")
@@ -14,6 +14,8 @@ from rich.console import Console
 from rich.pretty import Pretty
 from rich.table import Table
 
+from fast_plate_ocr.train.data.augmentation import BatchAugmentation
+
 
 def print_variables_as_table(
     c1_title: str, c2_title: str, title: str = "Variables Table", **kwargs: Any
@@ -72,7 +74,9 @@ def print_params(
     return decorator
 
 
-def print_train_details(augmentation: A.Compose, config: dict[str, Any]) -> None:
+def print_train_details(
+    augmentation: A.Compose | BatchAugmentation, config: dict[str, Any]
+) -> None:
     console = Console()
     console.print("\n")
     console.print("[bold blue]Augmentation Pipeline:[/bold blue]")
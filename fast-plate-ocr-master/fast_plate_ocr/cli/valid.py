@@ -2,16 +2,67 @@
 Script for validating trained OCR models.
 """
 
+import logging
 import pathlib
+from typing import Literal
 
 import click
+import numpy as np
 from torch.utils.data import DataLoader
 
+from fast_plate_ocr.cli.utils import print_variables_as_table
+from fast_plate_ocr.inference.cascade import calibrate_threshold
+from fast_plate_ocr.inference.confusion import save_confusion_matrix
+from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
 from fast_plate_ocr.train.data.dataset import LicensePlateDataset
 
 # Custom metris / losses
-from fast_plate_ocr.train.model.config import load_config_from_yaml
+from fast_plate_ocr.train.model.config import PlateOCRConfig, load_config_from_yaml
 from fast_plate_ocr.train.utilities import utils
+from fast_plate_ocr.train.utilities.evaluation import validate_keras_model, validate_onnx_model
+
+# ruff: noqa: PLR0913
+# pylint: disable=too-many-arguments
+
+
+def _valid_onnx(
+    model_path: pathlib.Path,
+    config_file: pathlib.Path,
+    config: PlateOCRConfig,
+    annotations: pathlib.Path,
+    batch_size: int,
+    num_workers: int,
+    device: Literal["auto", "cpu", "cuda"],
+    confusion_matrix_path: pathlib.Path | None,
+    cascade_max_error: float | None,
+) -> None:
+    recognizer = ONNXPlateRecognizer(model_path=model_path, config_path=config_file, device=device)
+    result = validate_onnx_model(
+        recognizer, config, annotations, batch_size=batch_size, num_workers=num_workers
+    )
+    cascade_metrics = {}
+    if cascade_max_error is not None:
+        threshold = calibrate_threshold(
+            result.min_confidence, result.plate_correct, max_error_rate=cascade_max_error
+        )
+        cascade_metrics = {
+            "cascade_threshold": f"{threshold:.4f}",
+            "cascade_escalated": f"{np.mean(result.min_confidence < threshold):.2%}",
+        }
+    print_variables_as_table(
+        c1_title="Metric",
+        c2_title="Value",
+        title=f"Validation of '{model_path.name}'",
+        plates=result.num_plates,
+        plate_accuracy=f"{result.plate_accuracy:.4f}",
+        slot_accuracy=[round(float(acc), 4) for acc in result.slot_accuracy],
+        plates_per_second=f"{result.plates_per_second:,.1f}",
+        inference_time=f"{result.inference_seconds:.2f}s of {result.elapsed_seconds:.2f}s",
+        **cascade_metrics,
+    )
+    if confusion_matrix_path is not None:
+        save_confusion_matrix(result.confusion, confusion_matrix_path)
+        logging.info("Saved confusion matrix to %s", confusion_matrix_path)
 
 
 @click.command(context_settings={"max_content_width": 120})
@@ -21,7 +72,8 @@ from fast_plate_ocr.train.utilities import utils
     "model_path",
     required=True,
     type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
-    help="Path to the saved .keras model.",
+    help="Path to the saved .keras model, or to an exported .onnx model. ONNX models run through "
+    "ONNXPlateRecognizer, exactly as they are used for inference.",
 )
 @click.option(
     "--config-file",
@@ -39,27 +91,94 @@ from fast_plate_ocr.train.utilities import utils
 @click.option(
     "-b",
     "--batch-size",
-    default=1,
+    default=None,
+    type=int,
+    help="Batch size. Defaults to 1 for .keras models and 256 for .onnx models.",
+)
+@click.option(
+    "--num-workers",
+    default=0,
     show_default=True,
     type=int,
-    help="Batch size.",
+    help="How many subprocesses to read the images with, used in the torch DataLoader.",
+)
+@click.option(
+    "--device",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "cpu", "cuda"]),
+    help="Device used to run .onnx models.",
+)
+@click.option(
+    "--confusion-matrix",
+    "confusion_matrix_path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="If set, save the per-character confusion matrix (.npy) to this path. It can be used for "
+    "confusion-aware decoding, see fast_plate_ocr.inference.confusion.",
+)
+@click.option(
+    "--cascade-max-error",
+    default=None,
+    type=click.FloatRange(min=0, max=1),
+    help="If set (.onnx models only), calibrate the confidence threshold under which this model "
+    "should escalate plates to a heavier one in a cascade (see fast_plate_ocr.inference.cascade), "
+    "so the plates it keeps have at most this error rate.",
 )
 def valid(
     model_path: pathlib.Path,
     config_file: pathlib.Path,
     annotations: pathlib.Path,
-    batch_size: int,
+    batch_size: int | None,
+    num_workers: int,
+    device: Literal["auto", "cpu", "cuda"],
+    confusion_matrix_path: pathlib.Path | None,
+    cascade_max_error: float | None,
 ) -> None:
     """
     Validate the trained OCR model on a labeled set.
     """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
     config = load_config_from_yaml(config_file)
+    if model_path.suffix == ".onnx":
+        _valid_onnx(
+            model_path,
+            config_file,
+            config,
+            annotations,
+            batch_size or 256,
+            num_workers,
+            device,
+            confusion_matrix_path,
+            cascade_max_error,
+        )
+        return
+    if cascade_max_error is not None:
+        raise click.UsageError("--cascade-max-error is only supported for .onnx models.")
     model = utils.load_keras_model(
         model_path, vocab_size=config.vocabulary_size, max_plate_slots=config.max_plate_slots
     )
-    val_torch_dataset = LicensePlateDataset(annotations_file=annotations, config=config)
-    val_dataloader = DataLoader(val_torch_dataset, batch_size=batch_size, shuffle=False)
-    model.evaluate(val_dataloader)
+    if confusion_matrix_path is None:
+        val_torch_dataset = LicensePlateDataset(annotations_file=annotations, config=config)
+        val_dataloader = DataLoader(
+            val_torch_dataset, batch_size=batch_size or 1, num_workers=num_workers, shuffle=False
+        )
+        model.evaluate(val_dataloader)
+        return
+    # The confusion matrix needs the predictions, so the metrics are collected in the same pass
+    result = validate_keras_model(
+        model, config, annotations, batch_size=batch_size or 1, num_workers=num_workers
+    )
+    print_variables_as_table(
+        c1_title="Metric",
+        c2_title="Value",
+        title=f"Validation of '{model_path.name}'",
+        plates=result.num_plates,
+        plate_accuracy=f"{result.plate_accuracy:.4f}",
+        slot_accuracy=[round(float(acc), 4) for acc in result.slot_accuracy],
+    )
+    save_confusion_matrix(result.confusion, confusion_matrix_path)
+    logging.info("Saved confusion matrix to %s", confusion_matrix_path)
 
 
 if __name__ == "__main__":
@@ -12,7 +12,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import numpy.typing as npt
 
-from fast_plate_ocr.train.data.augmentation import TRAIN_AUGMENTATION
+from fast_plate_ocr.train.data.augmentation import TRAIN_AUGMENTATION, load_augmentation
 from fast_plate_ocr.train.utilities import utils
 
 
@@ -157,7 +157,7 @@ def visualize_augmentation(
     Visualize augmentation pipeline applied to raw images.
     """
     _set_seed(seed)
-    aug = A.load(augmentation_path, data_format="yaml") if augmentation_path else TRAIN_AUGMENTATION
+    aug = load_augmentation(augmentation_path) if augmentation_path else TRAIN_AUGMENTATION
     images, augmented_images = load_images(img_dir, num_images, shuffle, height, width, aug)
     display_images(images, augmented_images, columns, rows, show_original)
 
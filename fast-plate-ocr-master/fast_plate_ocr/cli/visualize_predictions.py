@@ -2,23 +2,60 @@
 Script for displaying an image with the OCR model predictions.
 """
 
+import contextlib
 import logging
 import pathlib
+from collections.abc import Callable
+from typing import cast
 
 import click
 import cv2
 import keras
 import numpy as np
+import numpy.typing as npt
 
-from fast_plate_ocr.train.model.config import load_config_from_yaml
+from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
+from fast_plate_ocr.inference.process import postprocess_output
+from fast_plate_ocr.train.model.config import PlateOCRConfig, load_config_from_yaml
 from fast_plate_ocr.train.utilities import utils
-from fast_plate_ocr.train.utilities.utils import postprocess_model_output
+from fast_plate_ocr.train.utilities.review import PredictionReviewReport
+
+# pylint: disable=too-many-arguments,too-many-locals
+
+_Prediction = tuple[list[str], npt.NDArray]
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
 )
 
 
+def _load_predictor(
+    model_path: pathlib.Path, config_file: pathlib.Path, config: PlateOCRConfig
+) -> Callable[[npt.NDArray[np.uint8]], _Prediction]:
+    """
+    Return a function that runs the Keras or ONNX model on a (N, H, W, 1) batch, and returns the
+    plates with the confidence of each slot.
+    """
+    if model_path.suffix == ".onnx":
+        recognizer = ONNXPlateRecognizer(model_path=model_path, config_path=config_file)
+        return lambda x: cast(_Prediction, recognizer.run(list(x), return_confidence=True))
+
+    model = utils.load_keras_model(
+        model_path, vocab_size=config.vocabulary_size, max_plate_slots=config.max_plate_slots
+    )
+
+    def predict(x: npt.NDArray[np.uint8]) -> _Prediction:
+        prediction = keras.ops.stop_gradient(model(x, training=False)).numpy()
+        return cast(
+            _Prediction,
+            postprocess_output(
+                prediction, config.max_plate_slots, config.alphabet, return_confidence=True
+            ),
+        )
+
+    return predict
+
+
 @click.command(context_settings={"max_content_width": 120})
 @click.option(
     "-m",
@@ -26,7 +63,7 @@ logging.basicConfig(
     "model_path",
     required=True,
     type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path),
-    help="Path to the saved .keras model.",
+    help="Path to the saved .keras model, or to an exported .onnx model.",
 )
 @click.option(
     "--config-file",
@@ -55,38 +92,80 @@ logging.basicConfig(
     type=float,
     help="Display plates that any of the plate characters are below this number.",
 )
+@click.option(
+    "-r",
+    "--report-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    help="If set, write the (filtered) predictions to review.csv and review.html inside this "
+    "directory, instead of displaying them one by one.",
+)
+@click.option(
+    "-b",
+    "--batch-size",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Number of images read and predicted at once.",
+)
+@click.option(
+    "--num-workers",
+    type=click.IntRange(min=0),
+    default=4,
+    show_default=True,
+    help="Number of threads reading the next batches while the current one is predicted, 0 "
+    "reads them in the main thread.",
+)
 def visualize_predictions(
     model_path: pathlib.Path,
     config_file: pathlib.Path,
     img_dir: pathlib.Path,
     low_conf_thresh: float,
     filter_conf: float | None,
+    report_dir: pathlib.Path | None,
+    batch_size: int,
+    num_workers: int,
 ):
     """
     Visualize OCR model predictions on unlabeled data.
     """
     config = load_config_from_yaml(config_file)
-    model = utils.load_keras_model(
-        model_path, vocab_size=config.vocabulary_size, max_plate_slots=config.max_plate_slots
-    )
-    images = utils.load_images_from_folder(
-        img_dir, width=config.img_width, height=config.img_height
+    predict = _load_predictor(model_path, config_file, config)
+    image_paths = utils.list_image_paths(img_dir)
+    batches = utils.iter_image_batches(
+        image_paths,
+        width=config.img_width,
+        height=config.img_height,
+        batch_size=batch_size,
+        num_workers=num_workers,
     )
-    for image in images:
-        x = np.expand_dims(image, 0)
-        prediction = model(x, training=False)
-        prediction = keras.ops.stop_gradient(prediction).numpy()
-        plate, probs = postprocess_model_output(
-            prediction=prediction,
-            alphabet=config.alphabet,
-            max_plate_slots=config.max_plate_slots,
-            vocab_size=config.vocabulary_size,
+    with contextlib.ExitStack() as stack:
+        report = (
+            stack.enter_context(PredictionReviewReport(report_dir, low_conf_thresh))
+            if report_dir
+            else None
+        )
+        for batch_paths, x in batches:
+            plates, probs = predict(x)
+            for image_path, image, plate, plate_probs in zip(
+                batch_paths, x, plates, probs, strict=True
+            ):
+                if filter_conf and not np.any(plate_probs < filter_conf):
+                    continue
+                if report is not None:
+                    report.add(image_path, image, plate, plate_probs)
+                else:
+                    utils.display_predictions(
+                        image=image, plate=plate, probs=plate_probs, low_conf_thresh=low_conf_thresh
+                    )
+    if report is not None:
+        logging.info(
+            "Wrote %d of %d predictions to review in %s",
+            report.num_rows,
+            len(image_paths),
+            report_dir,
         )
-        if not filter_conf or (filter_conf and np.any(probs < filter_conf)):
-            utils.display_predictions(
-                image=image, plate=plate, probs=probs, low_conf_thresh=low_conf_thresh
-            )
-    cv2.destroyAllWindows()
+    else:
+        cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+"""
+Vectorized encoding/decoding of plate texts.
+
+Plates are converted to/from alphabet indices with precomputed lookup tables, working on whole
+batches at once instead of comparing characters one by one in Python.
+"""
+
+from collections.abc import Sequence
+from functools import lru_cache
+
+import numpy as np
+import numpy.typing as npt
+
+
+@lru_cache(maxsize=32)
+def char_lookup_table(alphabet: str) -> npt.NDArray[np.int16]:
+    """
+    Lookup table from character code point to its index in the alphabet.
+
+    Characters not in the alphabet map to -1. The last entry is always -1, so code points beyond
+    the table can be clipped to it.
+    """
+    if len(alphabet) > np.iinfo(np.int16).max:
+        raise ValueError(f"Alphabet of {len(alphabet)} characters is too big.")
+    if len(set(alphabet)) != len(alphabet):
+        raise ValueError(f"Alphabet '{alphabet}' contains repeated characters.")
+    table = np.full(max(map(ord, alphabet)) + 2, -1, dtype=np.int16)
+    table[[ord(char) for char in alphabet]] = np.arange(len(alphabet), dtype=np.int16)
+    return table
+
+
+@lru_cache(maxsize=32)
+def _alphabet_code_points(alphabet: str) -> npt.NDArray[np.uint32]:
+    return np.array([ord(char) for char in alphabet], dtype=np.uint32)
+
+
+@lru_cache(maxsize=32)
+def _identity(vocabulary_size: int) -> npt.NDArray[np.uint8]:
+    identity = np.eye(vocabulary_size, dtype=np.uint8)
+    identity.flags.writeable = False
+    return identity
+
+
+def encode_plates(
+    plates: Sequence[str],
+    alphabet: str,
+    max_plate_slots: int,
+    pad_char: str | None = None,
+) -> npt.NDArray[np.int16]:
+    """
+    Encode plates as alphabet indices.
+
+    :param plates: Plate texts.
+    :param alphabet: Alphabet of the model.
+    :param max_plate_slots: Number of slots of the encoded plates.
+    :param pad_char: Character used to pad plates shorter than `max_plate_slots`. If None, all the
+     plates must already have `max_plate_slots` characters.
+    :return: Array of shape (N, max_plate_slots) with the index of each character.
+    """
+    if pad_char is not None:
+        plates = [plate.ljust(max_plate_slots, pad_char) for plate in plates]
+    text = "".join(plates)
+    if len(text) != len(plates) * max_plate_slots:
+        raise ValueError(f"All plates must have (or be padded to) {max_plate_slots} characters.")
+    table = char_lookup_table(alphabet)
+    code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    indices = table[np.minimum(code_points, len(table) - 1)]
+    if np.any(indices < 0):
+        unknown = sorted({char for char in text if char not in alphabet})
+        raise ValueError(f"Characters {unknown} are not part of the alphabet '{alphabet}'.")
+    return indices.reshape(len(plates), max_plate_slots)
+
+
+def one_hot_encode(indices: npt.NDArray[np.integer], vocabulary_size: int) -> npt.NDArray[np.uint8]:
+    """
+    One-hot encode alphabet indices of any shape, adding a trailing `vocabulary_size` axis.
+    """
+    return _identity(vocabulary_size)[indices]
+
+
+def decode_plates(indices: npt.NDArray[np.integer], alphabet: str) -> list[str]:
+    """
+    Decode alphabet indices of shape (N, max_plate_slots) back into plate texts.
+    """
+    indices = np.asarray(indices)
+    max_plate_slots = indices.shape[-1]
+    text = _alphabet_code_points(alphabet)[indices].tobytes().decode("utf-32-le")
+    return [text[i : i + max_plate_slots] for i in range(0, len(text), max_plate_slots)]
@@ -0,0 +1,118 @@
+"""
+Confidence-based cascade of OCR models.
+
+A cheap model reads every plate, and only the plates it isn't confident about are read again by a
+heavier model. Since most plates are easy, the mean cost per plate approaches the cheap model's.
+"""
+
+import math
+from typing import NamedTuple, Protocol, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer, load_image_from_source
+
+
+class PlateRecognizer(Protocol):
+    """Any OCR model used as the fallback of the cascade, e.g. `ONNXPlateRecognizer`."""
+
+    def run(self, source: list[npt.NDArray]) -> list[str]: ...
+
+
+class CascadeResult(NamedTuple):
+    """Plates read by the cascade, in the same order as the input images."""
+
+    plates: list[str]
+    min_confidence: npt.NDArray[np.float32]
+    """Minimum per-slot confidence of the first model, shape (N,)."""
+    escalated: npt.NDArray[np.bool_]
+    """Whether each plate was read by the fallback model, shape (N,)."""
+
+
+def calibrate_threshold(
+    min_confidence: npt.ArrayLike, correct: npt.ArrayLike, max_error_rate: float = 0.01
+) -> float:
+    """
+    Find the lowest threshold for which the plates the first model keeps (minimum per-slot
+    confidence above or equal to the threshold) have at most `max_error_rate` errors, measured on a
+    labelled set. The lowest threshold is the one that sends the fewest plates to the fallback.
+
+    :param min_confidence: Minimum per-slot confidence of the first model for each plate.
+    :param correct: Whether the first model read each plate correctly.
+    :param max_error_rate: Maximum error rate allowed for the plates kept by the first model.
+    :return: The threshold, `math.inf` if no threshold meets the error rate (i.e. every plate should
+     be escalated).
+    """
+    min_confidence = np.asarray(min_confidence, dtype=np.float64)
+    correct = np.asarray(correct, dtype=bool)
+    order = np.argsort(-min_confidence, kind="stable")
+    sorted_confidence = min_confidence[order]
+    errors = np.cumsum(~correct[order])
+    counts = np.arange(1, len(order) + 1)
+    # The kept plates can only be cut where the confidence changes, equal confidences go together
+    cut = np.append(sorted_confidence[1:] < sorted_confidence[:-1], True)
+    valid = np.flatnonzero((errors <= max_error_rate * counts) & cut)
+    if len(valid) == 0:
+        return math.inf
+    return float(sorted_confidence[valid[-1]])
+
+
+class CascadePlateRecognizer:
+    """
+    Reads plates with a cheap model first, and re-reads the ones whose minimum per-slot confidence
+    is below `threshold` with a heavier fallback model, in a single batch.
+    """
+
+    def __init__(
+        self, first: ONNXPlateRecognizer, fallback: PlateRecognizer, threshold: float
+    ) -> None:
+        """
+        :param first: Cheap model, run on every plate.
+        :param fallback: Heavier model, run only on the plates the first model isn't confident
+         about. It can be any object with a `run(images) -> list[str]` method.
+        :param threshold: Plates with a minimum per-slot confidence below this are escalated, see
+         `calibrate_threshold`.
+        """
+        self.first = first
+        self.fallback = fallback
+        self.threshold = threshold
+        self.num_plates = 0
+        self.num_escalated = 0
+
+    @property
+    def escalation_rate(self) -> float:
+        """Fraction of the plates read so far that were escalated to the fallback model."""
+        return self.num_escalated / self.num_plates if self.num_plates else 0.0
+
+    def run_cascade(
+        self, source: str | list[str] | npt.NDArray | list[npt.NDArray]
+    ) -> CascadeResult:
+        """
+        Read the plates of one or more images.
+
+        :param source: Same as in `ONNXPlateRecognizer.run`.
+        :return: The plates, with the first model confidence and which of them were escalated.
+        """
+        images = load_image_from_source(source)
+        if isinstance(images, np.ndarray):
+            images = [images]
+        plates, confidence = cast(
+            tuple[list[str], npt.NDArray], self.first.run(images, return_confidence=True)
+        )
+        min_confidence = np.min(confidence, axis=-1)
+        escalated = min_confidence < self.threshold
+        escalated_idx = np.flatnonzero(escalated)
+        if len(escalated_idx):
+            fallback_plates = self.fallback.run([images[idx] for idx in escalated_idx])
+            for idx, plate in zip(escalated_idx, fallback_plates, strict=True):
+                plates[idx] = plate
+        self.num_plates += len(plates)
+        self.num_escalated += len(escalated_idx)
+        return CascadeResult(plates=plates, min_confidence=min_confidence, escalated=escalated)
+
+    def run(self, source: str | list[str] | npt.NDArray | list[npt.NDArray]) -> list[str]:
+        """
+        Read the plates of one or more images, see `run_cascade`.
+        """
+        return self.run_cascade(source).plates
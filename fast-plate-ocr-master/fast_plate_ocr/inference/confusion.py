@@ -0,0 +1,105 @@
+"""
+Confusion-aware correction of per-slot character probabilities.
+
+A confusion matrix is collected on a labelled validation set (see ``fast_plate_ocr valid
+--confusion-matrix``) and turned into a correction matrix holding ``P(true char | predicted
+char)``. At inference time the per-slot probabilities are re-weighted with a single batched
+matrix product before decoding, instead of remapping characters in string space afterward.
+"""
+
+import pathlib
+
+import numpy as np
+import numpy.typing as npt
+
+
+def confusion_matrix(
+    y_true: npt.NDArray, y_pred: npt.NDArray, vocabulary_size: int
+) -> npt.NDArray[np.int64]:
+    """
+    Count (true, predicted) character index pairs.
+
+    :param y_true: Ground truth character indices, any shape (i.e. (N, max_plate_slots)).
+    :param y_pred: Predicted character indices, same shape as ``y_true``.
+    :param vocabulary_size: Number of characters in the model alphabet.
+    :return: Matrix of shape (vocabulary_size, vocabulary_size), rows are true characters and
+     columns are predicted characters.
+    """
+    y_true = np.asarray(y_true, dtype=np.int64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.int64).ravel()
+    if y_true.shape != y_pred.shape:
+        raise ValueError(f"Shape mismatch: y_true {y_true.shape} vs y_pred {y_pred.shape}")
+    counts = np.bincount(y_true * vocabulary_size + y_pred, minlength=vocabulary_size**2)
+    return counts.reshape(vocabulary_size, vocabulary_size)
+
+
+def correction_matrix(confusion: npt.NDArray, smoothing: float = 1.0) -> npt.NDArray[np.float32]:
+    """
+    Build the ``P(true | predicted)`` correction matrix from a confusion matrix.
+
+    Each predicted character gets ``smoothing`` extra pseudo-counts on the diagonal, so characters
+    never (or rarely) seen during validation fall back to the identity instead of being remapped
+    on the evidence of a handful of samples.
+
+    :param confusion: Confusion matrix with true characters as rows and predicted as columns.
+    :param smoothing: Diagonal pseudo-count added before normalizing.
+    :return: Matrix ``C`` of shape (V, V) where ``C[pred, true] = P(true | pred)``. Rows sum to 1.
+    """
+    confusion = np.asarray(confusion, dtype=np.float64)
+    if confusion.ndim != 2 or confusion.shape[0] != confusion.shape[1]:
+        raise ValueError(f"Confusion matrix must be square, got shape {confusion.shape}")
+    smoothed = confusion.T + smoothing * np.eye(confusion.shape[0])
+    row_sums = smoothed.sum(axis=1, keepdims=True)
+    # Rows with no counts at all (smoothing=0) stay as identity
+    identity = np.eye(confusion.shape[0])
+    correction = np.divide(smoothed, row_sums, out=identity, where=row_sums > 0)
+    return correction.astype(np.float32)
+
+
+def apply_confusion_correction(
+    model_output: npt.NDArray,
+    correction: npt.NDArray,
+    max_plate_slots: int,
+) -> npt.NDArray[np.float32]:
+    """
+    Re-weight per-slot probabilities with a correction matrix.
+
+    :param model_output: Model output probabilities, reshapeable to (N, max_plate_slots, V).
+    :param correction: Correction matrix from ``correction_matrix``, shape (V, V).
+    :param max_plate_slots: Maximum number of characters in a license plate.
+    :return: Corrected probabilities with shape (N, max_plate_slots, V).
+    """
+    vocabulary_size = correction.shape[0]
+    predictions = model_output.reshape((-1, max_plate_slots, vocabulary_size))
+    # out[n, s, t] = sum_p P(pred=p | image) * P(true=t | pred=p)
+    return np.matmul(predictions, correction.astype(predictions.dtype, copy=False))
+
+
+def save_confusion_matrix(confusion: npt.NDArray, path: str | pathlib.Path) -> None:
+    """
+    Save a confusion matrix as a ``.npy`` file.
+
+    :param confusion: Confusion matrix to save.
+    :param path: Destination path.
+    """
+    np.save(path, np.asarray(confusion, dtype=np.int64))
+
+
+def load_correction_matrix(
+    path: str | pathlib.Path, vocabulary_size: int | None = None, smoothing: float = 1.0
+) -> npt.NDArray[np.float32]:
+    """
+    Load a saved confusion matrix and convert it to a correction matrix.
+
+    :param path: Path to the ``.npy`` confusion matrix.
+    :param vocabulary_size: If given, check the matrix matches the model alphabet size.
+    :param smoothing: Diagonal pseudo-count, see ``correction_matrix``.
+    :return: Correction matrix of shape (V, V).
+    """
+    confusion = np.load(path)
+    if vocabulary_size is not None and confusion.shape != (vocabulary_size, vocabulary_size):
+        raise ValueError(
+            f"Confusion matrix {path} has shape {confusion.shape}, expected "
+            f"({vocabulary_size}, {vocabulary_size}) for the model alphabet."
+        )
+    return correction_matrix(confusion, smoothing=smoothing)
@@ -5,12 +5,9 @@ Utilities function used for doing inference with the OCR models.
 import logging
 import pathlib
 import shutil
-import urllib.request
 from http import HTTPStatus
 from typing import Literal
 
-from tqdm.asyncio import tqdm
-
 from fast_plate_ocr.inference.utils import safe_write
 
 BASE_URL: str = "https://github.com/ankandrew/cnn-ocr-lp/releases/download"
@@ -53,6 +50,12 @@ def _download_with_progress(url: str, filename: pathlib.Path) -> None:
     :param url: URL of the model to download.
     :param filename: Where to save the OCR model.
     """
+    # Only needed when downloading, so importing the package doesn't pay for them
+    # pylint: disable=import-outside-toplevel
+    import urllib.request
+
+    from tqdm import tqdm
+
     with urllib.request.urlopen(url) as response, safe_write(filename, mode="wb") as out_file:
         if response.getcode() != HTTPStatus.OK:
             raise ValueError(f"Failed to download file from {url}. Status code: {response.status}")
@@ -11,19 +11,16 @@ from typing import Literal
 import numpy as np
 import numpy.typing as npt
 import onnxruntime as ort
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
 
 from fast_plate_ocr.common.utils import measure_time
 from fast_plate_ocr.inference import hub
 from fast_plate_ocr.inference.config import load_config_from_yaml
 from fast_plate_ocr.inference.hub import OcrModel
 from fast_plate_ocr.inference.process import postprocess_output, preprocess_image, read_plate_image
+from fast_plate_ocr.inference.static_batch import load_manifest, plan_batches
 
 
-def _load_image_from_source(
+def load_image_from_source(
     source: str | list[str] | npt.NDArray | list[npt.NDArray],
 ) -> npt.NDArray | list[npt.NDArray]:
     """
@@ -59,6 +56,10 @@ def _load_image_from_source(
     raise ValueError("Unsupported input type. Only file path or numpy array is supported.")
 
 
+# Kept for scripts importing the former private name
+_load_image_from_source = load_image_from_source
+
+
 class ONNXPlateRecognizer:
     """
     ONNX inference class for performing license plates OCR.
@@ -73,6 +74,7 @@ class ONNXPlateRecognizer:
         model_path: str | os.PathLike[str] | None = None,
         config_path: str | os.PathLike[str] | None = None,
         force_download: bool = False,
+        use_static_batches: bool = True,
     ) -> None:
         """
         Initializes the ONNXPlateRecognizer with the specified OCR model and inference device.
@@ -99,6 +101,9 @@ class ONNXPlateRecognizer:
             model_path: Path to ONNX model file to use (In case you want to use a custom one).
             config_path: Path to config file to use (In case you want to use a custom one).
             force_download: Force and download the model, even if it already exists.
+            use_static_batches: If the model has static-batch variants (see
+                `fast_plate_ocr export-onnx --static-batch-sizes`), run each request on the
+                smallest of them that fits, padding only as needed.
         Returns:
             None.
         """
@@ -143,6 +148,43 @@ class ONNXPlateRecognizer:
         )
         self.logger.info("Using ONNX Runtime with %s.", self.providers)
 
+        # Static-batch variants of the model, keyed by batch size
+        self.static_models: dict[int, ort.InferenceSession] = {}
+        if use_static_batches:
+            self._load_static_models(model_path, sess_options)
+
+    def _load_static_models(
+        self, model_path: str | os.PathLike[str], sess_options: ort.SessionOptions | None
+    ) -> None:
+        for batch_size, static_model_path in load_manifest(model_path).items():
+            self.static_models[batch_size] = ort.InferenceSession(
+                static_model_path, providers=self.providers, sess_options=sess_options
+            )
+        if self.static_models:
+            self.logger.info("Using static batch sizes %s.", sorted(self.static_models))
+
+    def _run_model(self, x: npt.NDArray) -> npt.NDArray:
+        """
+        Run the model on a preprocessed (N, H, W, 1) batch, dispatching to the static-batch
+        variants when there are any.
+        """
+        if not self.static_models:
+            return self.model.run(None, {"input": x})[0]
+        outputs = []
+        start = 0
+        for batch_size in plan_batches(len(x), tuple(self.static_models)):
+            chunk = x[start : start + batch_size]
+            num_images = len(chunk)
+            if num_images < batch_size:
+                # Zero-pad the last run, the outputs of the padding rows are dropped below
+                padding = np.zeros((batch_size - num_images, *x.shape[1:]), dtype=x.dtype)
+                chunk = np.concatenate([chunk, padding])
+            outputs.append(
+                self.static_models[batch_size].run(None, {"input": chunk})[0][:num_images]
+            )
+            start += num_images
+        return np.concatenate(outputs)
+
     def benchmark(self, n_iter: int = 10_000, include_processing: bool = False) -> None:
         """
         Benchmark time taken to run the OCR model. This reports the average inference time and the
@@ -169,6 +211,13 @@ class ONNXPlateRecognizer:
         avg_time = (cum_time / n_iter) if n_iter > 0 else 0.0
         avg_pps = (1_000 / avg_time) if n_iter > 0 else 0.0
 
+        # Only needed for reporting, so importing the recognizer doesn't pay for them
+        # pylint: disable=import-outside-toplevel
+        from rich.console import Console
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich.text import Text
+
         console = Console()
         model_info = Panel(
             Text(f"Model: {self.model_name}\nProviders: {self.providers}", style="bold green"),
@@ -185,6 +234,27 @@ class ONNXPlateRecognizer:
         table.add_row("Plates Per Second (PPS)", f"{avg_pps:.4f}")
         console.print(table)
 
+    def run_probabilities(
+        self, source: str | list[str] | npt.NDArray | list[npt.NDArray]
+    ) -> npt.NDArray:
+        """
+        Runs the OCR model and returns the probability of every character for each plate slot,
+        i.e. to use the model as the teacher of a smaller one.
+
+        Args:
+            source: The image(s), same as in `run`.
+
+        Returns:
+            A numpy array with the shape `(N, plate_slots, vocabulary_size)`, where the last axis
+                follows the order of the model alphabet.
+        """
+        x = load_image_from_source(source)
+        # Preprocess
+        x = preprocess_image(x, self.config["img_height"], self.config["img_width"])
+        # Run model
+        y = self._run_model(x)
+        return y.reshape((-1, self.config["max_plate_slots"], len(self.config["alphabet"])))
+
     def run(
         self,
         source: str | list[str] | npt.NDArray | list[npt.NDArray],
@@ -205,14 +275,10 @@ class ONNXPlateRecognizer:
                 array is returned with the shape `(N, plate_slots)`, where N is the batch size and
                 each plate slot is the confidence for the recognized license plate character.
         """
-        x = _load_image_from_source(source)
-        # Preprocess
-        x = preprocess_image(x, self.config["img_height"], self.config["img_width"])
-        # Run model
-        y: list[npt.NDArray] = self.model.run(None, {"input": x})
+        y = self.run_probabilities(source)
         # Postprocess model output
         return postprocess_output(
-            y[0],
+            y,
             self.config["max_plate_slots"],
             self.config["alphabet"],
             return_confidence=return_confidence,
@@ -8,6 +8,8 @@ import cv2
 import numpy as np
 import numpy.typing as npt
 
+from fast_plate_ocr.common.encoding import decode_plates
+
 
 def read_plate_image(image_path: str) -> npt.NDArray:
     """
@@ -68,10 +70,7 @@ def postprocess_output(
      confidence scores have shape (N, max_plate_slots) where N is the batch size.
     """
     predictions = model_output.reshape((-1, max_plate_slots, len(model_alphabet)))
-    prediction_indices = np.argmax(predictions, axis=-1)
-    alphabet_array = np.array(list(model_alphabet))
-    plate_chars = alphabet_array[prediction_indices]
-    plates: list[str] = np.apply_along_axis("".join, 1, plate_chars).tolist()
+    plates = decode_plates(np.argmax(predictions, axis=-1), model_alphabet)
     if return_confidence:
         probs = np.max(predictions, axis=-1)
         return plates, probs
@@ -0,0 +1,101 @@
+"""
+Static-batch ONNX model variants and the manifest that ties them to the dynamic-batch model.
+
+ONNX Runtime can pre-plan memory and specialize kernels when every input dimension is known, so
+for the common batch sizes a model can be exported once per batch size. A JSON manifest stored
+next to the dynamic model lists those variants, and requests are split and padded to fit them.
+"""
+
+import json
+import os
+import pathlib
+from collections.abc import Mapping
+
+MANIFEST_SUFFIX = ".manifest.json"
+"""Suffix replacing `.onnx` in the dynamic model file name to get its manifest file name."""
+
+DEFAULT_STATIC_BATCH_SIZES: tuple[int, ...] = (1, 4, 8, 16)
+"""Batch sizes exported by default when static variants are requested."""
+
+
+def manifest_path_for(model_path: str | os.PathLike[str]) -> pathlib.Path:
+    """
+    Path of the static-batch manifest of a (dynamic-batch) ONNX model.
+
+    :param model_path: Path to the dynamic-batch ONNX model, i.e. `model.onnx`.
+    :return: Manifest path, i.e. `model.manifest.json`.
+    """
+    model_path = pathlib.Path(model_path)
+    return model_path.with_name(model_path.stem + MANIFEST_SUFFIX)
+
+
+def static_model_path_for(model_path: str | os.PathLike[str], batch_size: int) -> pathlib.Path:
+    """
+    Path of the static-batch variant of a model, i.e. `model_b8.onnx` for batch size 8.
+    """
+    model_path = pathlib.Path(model_path)
+    return model_path.with_name(f"{model_path.stem}_b{batch_size}{model_path.suffix}")
+
+
+def write_manifest(
+    model_path: str | os.PathLike[str], static_models: Mapping[int, str | os.PathLike[str]]
+) -> pathlib.Path:
+    """
+    Write the manifest listing the static-batch variants of a model.
+
+    :param model_path: Path to the dynamic-batch ONNX model.
+    :param static_models: Mapping of batch size to the static-batch model path.
+    :return: Path of the written manifest.
+    """
+    manifest_path = manifest_path_for(model_path)
+    manifest = {
+        "dynamic": pathlib.Path(model_path).name,
+        "static": {
+            str(batch_size): os.path.relpath(path, manifest_path.parent)
+            for batch_size, path in sorted(static_models.items())
+        },
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f_out:
+        json.dump(manifest, f_out, indent=2)
+    return manifest_path
+
+
+def load_manifest(model_path: str | os.PathLike[str]) -> dict[int, pathlib.Path]:
+    """
+    Read the static-batch variants of a model from its manifest.
+
+    :param model_path: Path to the dynamic-batch ONNX model.
+    :return: Mapping of batch size to model path, empty if the model has no manifest.
+    """
+    manifest_path = manifest_path_for(model_path)
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, encoding="utf-8") as f_in:
+        manifest = json.load(f_in)
+    return {
+        int(batch_size): manifest_path.parent / path
+        for batch_size, path in manifest.get("static", {}).items()
+    }
+
+
+def plan_batches(num_images: int, batch_sizes: list[int] | tuple[int, ...]) -> list[int]:
+    """
+    Split a request of `num_images` into runs of the available static batch sizes.
+
+    Full runs of the largest batch size are used while more images than that remain, and the
+    rest goes to the smallest batch size that fits it, so only the last run is padded.
+
+    :param num_images: Number of images to run.
+    :param batch_sizes: Available static batch sizes.
+    :return: Batch size of each run, in order. The padding of the last run is
+     `sum(plan) - num_images`.
+    """
+    if not batch_sizes:
+        raise ValueError("At least one static batch size is needed.")
+    sizes = sorted(set(batch_sizes))
+    largest = sizes[-1]
+    plan = [largest] * (num_images // largest)
+    remainder = num_images % largest
+    if remainder:
+        plan.append(next(size for size in sizes if size >= remainder))
+    return plan
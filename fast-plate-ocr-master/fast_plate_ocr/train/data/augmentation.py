@@ -2,8 +2,17 @@
 Augmentations used for training the OCR model.
 """
 
+import os
+import pathlib
+from typing import cast
+
 import albumentations as A
 import cv2
+import numpy as np
+import numpy.typing as npt
+import torch
+import yaml
+from torch.utils.data import default_collate
 
 BORDER_COLOR_BLACK: tuple[int, int, int] = (0, 0, 0)
 
@@ -29,3 +38,164 @@ TRAIN_AUGMENTATION = A.Compose(
     ]
 )
 """Training augmentations recipe."""
+
+
+def load_augmentation(path: str | pathlib.Path) -> A.Compose:
+    """
+    Load an augmentation pipeline saved with `A.save(..., data_format="yaml")`.
+    """
+    return cast(A.Compose, A.load(path, data_format="yaml"))
+
+
+class BatchAugmentation:
+    """
+    Augmentations applied to whole uint8 batches of shape (N, H, W, 1), after collation.
+
+    Each sample gets its own random parameters, but these are drawn for the whole batch at once and
+    the photometric ops run vectorized over the batch, avoiding the per-sample overhead of the
+    Albumentations pipeline. It is a lighter recipe than `TRAIN_AUGMENTATION`: the affine and
+    brightness/contrast limits are the same, but there is no motion blur nor coarse dropout, and
+    pixel dropout is applied to `dropout_p` of the samples on its own (not as one of two choices).
+    See `to_albumentations` for the equivalent per-sample pipeline.
+    """
+
+    def __init__(
+        self,
+        shift_limit: float = 0.06,
+        scale_limit: float = 0.1,
+        rotate_limit: float = 9.0,
+        brightness_limit: float = 0.1,
+        contrast_limit: float = 0.1,
+        dropout_prob: float = 0.01,
+        dropout_p: float = 0.2,
+    ) -> None:
+        """
+        :param shift_limit: Max shift, as a fraction of the image width/height.
+        :param scale_limit: Max scale change, the scale is sampled from [1 - limit, 1 + limit].
+        :param rotate_limit: Max rotation in degrees.
+        :param brightness_limit: Max brightness change, as a fraction of 255.
+        :param contrast_limit: Max contrast change, the factor is sampled from [1 - limit,
+         1 + limit].
+        :param dropout_prob: Probability of zeroing each pixel of the samples with pixel dropout.
+        :param dropout_p: Probability of applying pixel dropout to a sample.
+        """
+        self.shift_limit = shift_limit
+        self.scale_limit = scale_limit
+        self.rotate_limit = rotate_limit
+        self.brightness_limit = brightness_limit
+        self.contrast_limit = contrast_limit
+        self.dropout_prob = dropout_prob
+        self.dropout_p = dropout_p
+
+    def __call__(self, images: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Augment a batch of images, with shape (N, H, W, 1) or (N, H, W).
+        """
+        images = self.affine(images)
+        images = self.brightness_contrast(images)
+        return self.pixel_dropout(images)
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v}" for k, v in self.to_dict().items())
+        return f"{type(self).__name__}({params})"
+
+    def to_dict(self) -> dict[str, float]:
+        return dict(vars(self))
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """
+        Save the parameters to a YAML file, which can be loaded back with `BatchAugmentation.load`.
+        """
+        with open(path, "w", encoding="utf-8") as f_out:
+            yaml.safe_dump(self.to_dict(), f_out)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> "BatchAugmentation":
+        """
+        Load the parameters saved with `BatchAugmentation.save`.
+        """
+        with open(path, encoding="utf-8") as f_in:
+            return cls(**yaml.safe_load(f_in))
+
+    def to_albumentations(self) -> A.Compose:
+        """
+        Per-sample Albumentations pipeline applying the same augmentations, i.e. to benchmark both.
+        """
+        return A.Compose(
+            [
+                A.ShiftScaleRotate(
+                    shift_limit=self.shift_limit,
+                    scale_limit=self.scale_limit,
+                    rotate_limit=self.rotate_limit,
+                    border_mode=cv2.BORDER_CONSTANT,
+                    value=BORDER_COLOR_BLACK,
+                    p=1,
+                ),
+                A.RandomBrightnessContrast(
+                    brightness_limit=self.brightness_limit,
+                    contrast_limit=self.contrast_limit,
+                    p=1,
+                ),
+                A.PixelDropout(dropout_prob=self.dropout_prob, p=self.dropout_p),
+            ]
+        )
+
+    def affine_matrices(self, num_images: int, height: int, width: int) -> npt.NDArray[np.float32]:
+        """
+        Random shift/scale/rotate matrices of shape (N, 2, 3), around the center of the image.
+        """
+        # Uses NumPy global random state, which torch re-seeds in each DataLoader worker
+        angle = np.deg2rad(np.random.uniform(-self.rotate_limit, self.rotate_limit, num_images))
+        scale = np.random.uniform(1 - self.scale_limit, 1 + self.scale_limit, num_images)
+        shift_x = np.random.uniform(-self.shift_limit, self.shift_limit, num_images) * width
+        shift_y = np.random.uniform(-self.shift_limit, self.shift_limit, num_images) * height
+        alpha, beta = scale * np.cos(angle), scale * np.sin(angle)
+        center_x, center_y = (width - 1) / 2, (height - 1) / 2
+        matrices = np.empty((num_images, 2, 3), dtype=np.float32)
+        matrices[:, 0, 0], matrices[:, 0, 1] = alpha, beta
+        matrices[:, 1, 0], matrices[:, 1, 1] = -beta, alpha
+        matrices[:, 0, 2] = (1 - alpha) * center_x - beta * center_y + shift_x
+        matrices[:, 1, 2] = beta * center_x + (1 - alpha) * center_y + shift_y
+        return matrices
+
+    def affine(self, images: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        num_images, height, width = images.shape[:3]
+        matrices = self.affine_matrices(num_images, height, width)
+        warped = np.empty_like(images)
+        # OpenCV warps a small image faster than a vectorized NumPy gather over the whole batch
+        for image, matrix, out in zip(images, matrices, warped, strict=True):
+            out.reshape(height, width)[:] = cv2.warpAffine(
+                image,
+                matrix,
+                (width, height),
+                flags=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=0,
+            ).reshape(height, width)
+        return warped
+
+    def brightness_contrast(self, images: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        shape = (len(images),) + (1,) * (images.ndim - 1)
+        contrast = np.random.uniform(1 - self.contrast_limit, 1 + self.contrast_limit, shape)
+        brightness = np.random.uniform(-self.brightness_limit, self.brightness_limit, shape) * 255
+        out = images * contrast.astype(np.float32) + brightness.astype(np.float32)
+        return np.clip(out, 0, 255, out=out).astype(np.uint8)
+
+    def pixel_dropout(self, images: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        selected = np.flatnonzero(np.random.random_sample(len(images)) < self.dropout_p)
+        if selected.size:
+            dropped = images[selected]
+            dropped[np.random.random_sample(dropped.shape) < self.dropout_prob] = 0
+            images[selected] = dropped
+        return images
+
+    def collate(self, batch: list[tuple[npt.NDArray, npt.NDArray]]) -> tuple[torch.Tensor, ...]:
+        """
+        DataLoader `collate_fn` that collates the batch and then augments the images.
+        """
+        x, y = default_collate(batch)
+        return torch.from_numpy(self(x.numpy())), y
+
+
+BATCH_TRAIN_AUGMENTATION = BatchAugmentation()
+"""Batched version of the training augmentations recipe."""
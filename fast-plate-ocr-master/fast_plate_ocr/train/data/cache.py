@@ -0,0 +1,138 @@
+"""
+Compiled dataset cache.
+
+Decodes and resizes every image of an annotations file once, into a single memory-mapped uint8
+array, with the plates stored as int8 alphabet index arrays. Datasets then read samples straight
+from the memory map, so DataLoader worker processes share the same page cache and epochs don't
+touch the image files again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from tqdm import tqdm
+
+from fast_plate_ocr.common.encoding import encode_plates
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from fast_plate_ocr.train.utilities import utils
+
+IMAGES_FILE = "images.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "meta.json"
+
+
+def cache_dir_for(
+    annotations_file: str | os.PathLike[str],
+    config: PlateOCRConfig,
+    cache_root: str | os.PathLike[str],
+) -> pathlib.Path:
+    """
+    Directory of the compiled cache of an annotations file.
+
+    The name includes a fingerprint of the annotations file (path, size and modification time) and
+    of the config fields that change the stored arrays, so editing either compiles a new cache.
+    """
+    annotations_file = pathlib.Path(annotations_file).resolve()
+    stat = annotations_file.stat()
+    fingerprint = json.dumps(
+        [
+            str(annotations_file),
+            stat.st_size,
+            stat.st_mtime_ns,
+            config.img_height,
+            config.img_width,
+            config.max_plate_slots,
+            config.alphabet,
+            config.pad_char,
+        ]
+    )
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+    return pathlib.Path(cache_root) / f"{annotations_file.stem}_{digest}"
+
+
+def create_images_memmap(
+    cache_dir: pathlib.Path, num_images: int, config: PlateOCRConfig
+) -> np.memmap:
+    """
+    Create the writable (N, H, W, 1) uint8 images memory map of a cache directory.
+    """
+    return np.lib.format.open_memmap(
+        cache_dir / IMAGES_FILE,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(num_images, config.img_height, config.img_width, 1),
+    )
+
+
+def compile_dataset(
+    annotations_file: str | os.PathLike[str],
+    config: PlateOCRConfig,
+    cache_root: str | os.PathLike[str],
+) -> pathlib.Path:
+    """
+    Compile an annotations file into a memory-mapped cache, unless it was already compiled.
+
+    :param annotations_file: CSV with `image_path` (relative to the CSV) and `plate_text` columns.
+    :param config: OCR config, which defines the image size and the plate encoding.
+    :param cache_root: Directory holding the compiled caches.
+    :return: Directory of the compiled cache.
+    """
+    cache_dir = cache_dir_for(annotations_file, config, cache_root)
+    if (cache_dir / META_FILE).exists():
+        return cache_dir
+
+    annotations = pd.read_csv(annotations_file)
+    base_dir = os.path.dirname(os.path.realpath(annotations_file))
+    image_paths = [os.path.join(base_dir, path) for path in annotations["image_path"]]
+    plates = annotations["plate_text"].tolist()
+    assert all(
+        len(plate) <= config.max_plate_slots for plate in plates
+    ), "Plates are longer than max_plate_slots specified param. Change the parameter."
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    if config.vocabulary_size > np.iinfo(np.int8).max + 1:
+        raise ValueError(
+            f"Alphabet of {config.vocabulary_size} characters doesn't fit int8 indices."
+        )
+    labels = encode_plates(plates, config.alphabet, config.max_plate_slots, config.pad_char)
+    labels = labels.astype(np.int8)
+    np.save(cache_dir / LABELS_FILE, labels)
+    images = create_images_memmap(cache_dir, len(image_paths), config)
+    for idx, image_path in enumerate(tqdm(image_paths, desc=f"Compiling {cache_dir.name}")):
+        images[idx] = utils.read_plate_image(image_path, config.img_height, config.img_width)
+    images.flush()
+    del images
+
+    # Written last, so an interrupted compilation is redone on the next run
+    with open(cache_dir / META_FILE, "w", encoding="utf-8") as f_out:
+        json.dump(
+            {
+                "annotations_file": str(pathlib.Path(annotations_file).resolve()),
+                "num_samples": len(image_paths),
+                "config": config.model_dump(),
+            },
+            f_out,
+            indent=2,
+        )
+    logging.info("Compiled %d samples into %s", len(image_paths), cache_dir)
+    return cache_dir
+
+
+def load_compiled_dataset(
+    cache_dir: str | os.PathLike[str],
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.int8]]:
+    """
+    Open a compiled cache read-only.
+
+    :return: Memory-mapped images of shape (N, H, W, 1) and int8 labels of shape (N, slots).
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    images = np.load(cache_dir / IMAGES_FILE, mmap_mode="r")
+    labels = np.load(cache_dir / LABELS_FILE)
+    return images, labels
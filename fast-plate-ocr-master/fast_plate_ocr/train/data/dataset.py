@@ -6,10 +6,14 @@ import os
 from os import PathLike
 
 import albumentations as A
+import numpy as np
 import numpy.typing as npt
 import pandas as pd
 from torch.utils.data import Dataset
 
+from fast_plate_ocr.common.encoding import encode_plates, one_hot_encode
+from fast_plate_ocr.train.data.cache import compile_dataset, load_compiled_dataset
+from fast_plate_ocr.train.data.soft_targets import load_soft_targets
 from fast_plate_ocr.train.model.config import PlateOCRConfig
 from fast_plate_ocr.train.utilities import utils
 
@@ -20,7 +24,25 @@ class LicensePlateDataset(Dataset):
         annotations_file: str | PathLike[str],
         config: PlateOCRConfig,
         transform: A.Compose | None = None,
+        cache_dir: str | PathLike[str] | None = None,
     ) -> None:
+        """
+        :param annotations_file: CSV with `image_path` (relative to the CSV) and `plate_text`.
+        :param config: OCR config of the model.
+        :param transform: Augmentation applied to each image.
+        :param cache_dir: If set, the annotations are compiled once into a memory-mapped cache
+         inside this directory (see `fast_plate_ocr.train.data.cache`) and samples are read from
+         it instead of decoding the image files every epoch.
+        """
+        self.config = config
+        self.transform = transform
+        self.compiled_dir = None
+        # int8 alphabet indices when read from the compiled cache, int16 when encoded here
+        self._labels: npt.NDArray[np.integer]
+        if cache_dir is not None:
+            self.compiled_dir = compile_dataset(annotations_file, config, cache_dir)
+            self._images, self._labels = load_compiled_dataset(self.compiled_dir)
+            return
         annotations = pd.read_csv(annotations_file)
         annotations["image_path"] = (
             os.path.dirname(os.path.realpath(annotations_file)) + os.sep + annotations["image_path"]
@@ -29,25 +51,88 @@ class LicensePlateDataset(Dataset):
             annotations["plate_text"].str.len() <= config.max_plate_slots
         ).all(), "Plates are longer than max_plate_slots specified param. Change the parameter."
         self.annotations = annotations.to_numpy()
-        self.config = config
-        self.transform = transform
+        # Encode all the plates upfront, samples only index the one-hot lookup table
+        self._labels = encode_plates(
+            annotations["plate_text"].tolist(),
+            config.alphabet,
+            config.max_plate_slots,
+            config.pad_char,
+        )
 
     def __len__(self) -> int:
+        if self.compiled_dir is not None:
+            return len(self._labels)
         return self.annotations.shape[0]
 
     def __getitem__(self, idx) -> tuple[npt.NDArray, npt.NDArray]:
-        image_path, plate_text = self.annotations[idx]
-        x = utils.read_plate_image(
-            image_path=image_path,
-            img_height=self.config.img_height,
-            img_width=self.config.img_width,
-        )
-        y = utils.target_transform(
-            plate_text=plate_text,
-            max_plate_slots=self.config.max_plate_slots,
-            alphabet=self.config.alphabet,
-            pad_char=self.config.pad_char,
-        )
+        if self.compiled_dir is not None:
+            # Copy out of the read-only memory map, augmentations and collation may write to it
+            x = np.array(self._images[idx])
+        else:
+            x = utils.read_plate_image(
+                image_path=self.annotations[idx][0],
+                img_height=self.config.img_height,
+                img_width=self.config.img_width,
+            )
+        y = one_hot_encode(self._labels[idx], self.config.vocabulary_size)
         if self.transform:
             x = self.transform(image=x)["image"]
         return x, y
+
+    def __getstate__(self) -> dict:
+        # Worker processes started with 'spawn' re-open the memory map instead of receiving a copy
+        state = self.__dict__.copy()
+        if self.compiled_dir is not None:
+            del state["_images"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.compiled_dir is not None:
+            self._images, _ = load_compiled_dataset(self.compiled_dir)
+
+
+class SoftTargetDataset(Dataset):
+    def __init__(
+        self,
+        cache_dir: str | PathLike[str],
+        transform: A.Compose | None = None,
+        temperature: float = 1.0,
+    ) -> None:
+        """
+        :param cache_dir: Soft targets cache, see `fast_plate_ocr.train.data.soft_targets`.
+        :param transform: Augmentation applied to each image.
+        :param temperature: Temperature applied to the teacher probabilities, values above 1 soften
+         them (more weight to the teacher's second guesses) and values below 1 sharpen them.
+        """
+        if temperature <= 0:
+            raise ValueError(f"Temperature must be positive, got {temperature}.")
+        self.cache_dir = cache_dir
+        self.transform = transform
+        self.temperature = temperature
+        self._images, self._soft_targets = load_soft_targets(cache_dir)
+
+    def __len__(self) -> int:
+        return len(self._soft_targets)
+
+    def __getitem__(self, idx) -> tuple[npt.NDArray, npt.NDArray]:
+        # Copy out of the read-only memory map, augmentations and collation may write to it
+        x = np.array(self._images[idx])
+        y = self._soft_targets[idx].astype(np.float32)
+        if self.temperature != 1.0:
+            y **= 1.0 / self.temperature
+        # Also corrects the float16 rounding of the cached probabilities
+        y /= y.sum(axis=-1, keepdims=True)
+        if self.transform:
+            x = self.transform(image=x)["image"]
+        return x, y
+
+    def __getstate__(self) -> dict:
+        # Worker processes started with 'spawn' re-open the memory maps instead of receiving a copy
+        state = self.__dict__.copy()
+        del state["_images"], state["_soft_targets"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._images, self._soft_targets = load_soft_targets(self.cache_dir)
@@ -0,0 +1,120 @@
+"""
+Soft targets cache for knowledge distillation.
+
+The teacher model runs once over a folder of unlabelled plate crops. Its per-slot probabilities
+are stored as a memory-mapped float16 array, next to the resized images, so every distillation
+epoch reads both from the memory maps instead of running the teacher again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+from tqdm import tqdm
+
+from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
+from fast_plate_ocr.train.data.cache import IMAGES_FILE, META_FILE, create_images_memmap
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from fast_plate_ocr.train.utilities import utils
+
+# pylint: disable=too-many-arguments
+
+SOFT_TARGETS_FILE = "soft_targets.npy"
+
+
+def soft_targets_dir_for(
+    image_paths: Sequence[str],
+    teacher_name: str,
+    config: PlateOCRConfig,
+    cache_root: str | os.PathLike[str],
+) -> pathlib.Path:
+    """
+    Directory of the soft targets cache of a set of images.
+
+    The name includes a fingerprint of the image paths, the teacher and the config, so changing any
+    of them caches new soft targets.
+    """
+    fingerprint = json.dumps([list(image_paths), teacher_name, config.model_dump()])
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+    return pathlib.Path(cache_root) / f"{teacher_name}_{digest}"
+
+
+def compile_soft_targets(
+    teacher: ONNXPlateRecognizer,
+    image_paths: Sequence[str],
+    config: PlateOCRConfig,
+    cache_root: str | os.PathLike[str],
+    batch_size: int = 256,
+    num_workers: int = 4,
+) -> pathlib.Path:
+    """
+    Run the teacher over the images and cache its soft targets, unless they were already cached.
+
+    :param teacher: Recognizer of the teacher model.
+    :param image_paths: Paths of the unlabelled plate crops.
+    :param config: OCR config of the teacher, which is also the one of the student.
+    :param cache_root: Directory holding the soft targets caches.
+    :param batch_size: Number of images per teacher run.
+    :param num_workers: Number of threads reading the images.
+    :return: Directory of the soft targets cache.
+    """
+    cache_dir = soft_targets_dir_for(image_paths, teacher.model_name, config, cache_root)
+    if (cache_dir / META_FILE).exists():
+        return cache_dir
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    images = create_images_memmap(cache_dir, len(image_paths), config)
+    soft_targets = np.lib.format.open_memmap(
+        cache_dir / SOFT_TARGETS_FILE,
+        mode="w+",
+        dtype=np.float16,
+        shape=(len(image_paths), config.max_plate_slots, config.vocabulary_size),
+    )
+    start = 0
+    batches = utils.iter_image_batches(
+        image_paths, config.img_width, config.img_height, batch_size, num_workers
+    )
+    with tqdm(total=len(image_paths), desc=f"Running teacher {teacher.model_name}") as pbar:
+        for _, batch in batches:
+            end = start + len(batch)
+            images[start:end] = batch
+            soft_targets[start:end] = teacher.run_probabilities(list(batch))
+            start = end
+            pbar.update(len(batch))
+    images.flush()
+    soft_targets.flush()
+    del images, soft_targets
+
+    # Written last, so an interrupted run of the teacher is redone on the next run
+    with open(cache_dir / META_FILE, "w", encoding="utf-8") as f_out:
+        json.dump(
+            {
+                "teacher": teacher.model_name,
+                "num_samples": len(image_paths),
+                "config": config.model_dump(),
+            },
+            f_out,
+            indent=2,
+        )
+    logging.info("Cached soft targets of %d images into %s", len(image_paths), cache_dir)
+    return cache_dir
+
+
+def load_soft_targets(
+    cache_dir: str | os.PathLike[str],
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.float16]]:
+    """
+    Open a soft targets cache read-only.
+
+    :return: Memory-mapped images of shape (N, H, W, 1) and soft targets of shape
+     (N, slots, vocabulary_size).
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    images = np.load(cache_dir / IMAGES_FILE, mmap_mode="r")
+    soft_targets = np.load(cache_dir / SOFT_TARGETS_FILE, mmap_mode="r")
+    return images, soft_targets
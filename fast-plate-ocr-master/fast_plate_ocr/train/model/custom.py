@@ -71,7 +71,8 @@ def cce_loss(vocabulary_size: int, label_smoothing: float = 0.2):
         Computes the categorical cross-entropy loss.
         """
         y_true = ops.reshape(y_true, newshape=(-1, vocabulary_size))
-        y_pred = ops.reshape(y_pred, newshape=(-1, vocabulary_size))
+        # Compute the loss in float32, also when training with a mixed precision policy
+        y_pred = ops.cast(ops.reshape(y_pred, newshape=(-1, vocabulary_size)), "float32")
         return ops.mean(
             losses.categorical_crossentropy(
                 y_true, y_pred, from_logits=False, label_smoothing=label_smoothing
@@ -12,6 +12,7 @@ from keras.src.layers import (
     Dropout,
     GlobalAveragePooling2D,
     Input,
+    Permute,
     Rescaling,
     Reshape,
     Softmax,
@@ -21,6 +22,7 @@ from keras.src.models import Model
 from fast_plate_ocr.train.model.layer_blocks import (
     block_average_conv_down,
     block_bn,
+    block_bn_sep_conv_l2,
     block_max_conv_down,
     block_no_activation,
 )
@@ -66,6 +68,58 @@ def cnn_ocr_model(
     return Model(inputs=input_tensor, outputs=x)
 
 
+def _scale_channels(n_c: int, width_multiplier: float, divisor: int = 8) -> int:
+    """
+    Scale the number of channels by `width_multiplier`, rounded to a multiple of `divisor`.
+    """
+    return max(divisor, int(n_c * width_multiplier + divisor / 2) // divisor * divisor)
+
+
+def cnn_ocr_light_model(
+    h: int,
+    w: int,
+    max_plate_slots: int,
+    vocabulary_size: int,
+    width_multiplier: float = 1.0,
+    depth: int = 4,
+    shared_head: bool = True,
+    activation: str = "relu",
+) -> Model:
+    """
+    Lightweight variant of `cnn_ocr_model`, with a depthwise separable backbone. Each stage halves
+    the resolution and doubles the channels, up to 256 (scaled by `width_multiplier`).
+
+    :param width_multiplier: Multiplier of the number of channels of every layer.
+    :param depth: Number of separable conv stages.
+    :param shared_head: Whether to classify all the slots with the same weights (`head_shared`) or
+     with one Dense layer per slot (`head`).
+    """
+    if depth < 1:
+        raise ValueError(f"Depth must be at least 1, got {depth}.")
+    input_tensor = Input((h, w, 1))
+    x = Rescaling(1.0 / 255)(input_tensor)
+    # Stem
+    x, _ = block_bn(
+        x,
+        k=3,
+        n_c=_scale_channels(16, width_multiplier),
+        s=2,
+        padding="same",
+        activation=activation,
+    )
+    # Backbone
+    for stage in range(depth):
+        n_c = _scale_channels(min(32 * 2**stage, 256), width_multiplier)
+        x, _ = block_bn_sep_conv_l2(x, k=3, n_c=n_c, s=1, padding="same", activation=activation)
+        x, _ = block_bn_sep_conv_l2(x, k=3, n_c=n_c, s=2, padding="same", activation=activation)
+    x = (
+        head_shared(x, max_plate_slots, vocabulary_size)
+        if shared_head
+        else head(x, max_plate_slots, vocabulary_size)
+    )
+    return Model(inputs=input_tensor, outputs=x)
+
+
 def head(x, max_plate_slots: int, vocabulary_size: int):
     """
     Model's head with Fully Connected (FC) layers.
@@ -90,3 +144,23 @@ def head_no_fc(x, max_plate_slots: int, vocabulary_size: int):
     x = Reshape((max_plate_slots, vocabulary_size, 1))(x)
     x = Softmax(axis=-2)(x)
     return x
+
+
+def head_shared(x, max_plate_slots: int, vocabulary_size: int):
+    """
+    Model's head with a single Dense classifier shared by all the slots.
+
+    The features of each slot are a learned weighting of the feature map positions, then the same
+    Dense layer classifies every slot.
+    """
+    _, height, width, channels = x.shape
+    x = Reshape((height * width, channels))(x)
+    x = Permute((2, 1))(x)
+    x = Dense(units=max_plate_slots)(x)
+    x = Permute((2, 1))(x)
+    # dropout for more robust learning
+    x = Dropout(0.5)(x)
+    x = Dense(units=vocabulary_size)(x)
+    x = Softmax(axis=-1)(x)
+    x = Reshape((max_plate_slots * vocabulary_size,))(x)
+    return x
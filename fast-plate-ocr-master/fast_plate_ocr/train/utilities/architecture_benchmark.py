@@ -0,0 +1,137 @@
+"""
+CPU ONNX Runtime latency (and optionally accuracy) of the OCR model architectures.
+
+Models are exported with `keras.Model.export(format="onnx")`, which works with any Keras backend,
+so the architectures can be compared without TensorFlow installed. Latency doesn't depend on the
+weights, so untrained models are enough to compare the architecture variants.
+"""
+
+import os
+import pathlib
+import statistics
+import time
+from tempfile import TemporaryDirectory
+from typing import Any, NamedTuple
+
+import keras
+import numpy as np
+import onnxruntime as ort
+from torch.utils.data import DataLoader
+
+from fast_plate_ocr.train.data.dataset import LicensePlateDataset
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+
+# pylint: disable=too-many-arguments
+
+ARCHITECTURE_VARIANTS: dict[str, dict[str, Any]] = {
+    "cnn": {"model_type": "cnn"},
+    "light-1.0": {"model_type": "light", "width_multiplier": 1.0, "depth": 4},
+    "light-0.75": {"model_type": "light", "width_multiplier": 0.75, "depth": 4},
+    "light-0.5": {"model_type": "light", "width_multiplier": 0.5, "depth": 4},
+    "light-0.5-d3": {"model_type": "light", "width_multiplier": 0.5, "depth": 3},
+}
+"""Architecture variants compared by default, as `train` options."""
+
+
+class ArchitectureBenchmark(NamedTuple):
+    """Result of benchmarking a model architecture."""
+
+    name: str
+    num_params: int
+    latency_ms: float
+    """Median latency of a single plate, in milliseconds."""
+    plates_per_second: float
+    """Throughput when running batches of plates."""
+    plate_accuracy: float | None = None
+
+
+def export_onnx(model: keras.Model, output_path: str | os.PathLike[str]) -> None:
+    """
+    Export a Keras model with a float (N, H, W, 1) input to ONNX.
+    """
+    # The model must have been called once before it can be exported
+    model(np.zeros((1, *model.input_shape[1:]), dtype="float32"))
+    model.export(output_path, format="onnx", verbose=False)
+
+
+def _onnx_session(model_path: str | os.PathLike[str], num_threads: int) -> ort.InferenceSession:
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = num_threads
+    return ort.InferenceSession(
+        model_path, sess_options=sess_options, providers=["CPUExecutionProvider"]
+    )
+
+
+def _median_seconds(session: ort.InferenceSession, x: np.ndarray, runs: int, warmup: int) -> float:
+    input_name = session.get_inputs()[0].name
+    timings = []
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        session.run(None, {input_name: x})
+        if i >= warmup:
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _plate_accuracy(
+    session: ort.InferenceSession,
+    config: PlateOCRConfig,
+    annotations_file: str | os.PathLike[str],
+    batch_size: int,
+) -> float:
+    input_name = session.get_inputs()[0].name
+    dataset = LicensePlateDataset(annotations_file=annotations_file, config=config)
+    num_plates = 0
+    plates_correct = 0
+    for x, y in DataLoader(dataset, batch_size=batch_size, shuffle=False):
+        y_pred = session.run(None, {input_name: x.numpy().astype(np.float32)})[0]
+        y_pred = y_pred.reshape((-1, config.max_plate_slots, config.vocabulary_size))
+        correct = y_pred.argmax(axis=-1) == y.numpy().argmax(axis=-1)
+        num_plates += len(correct)
+        plates_correct += int(np.all(correct, axis=-1).sum())
+    return plates_correct / num_plates if num_plates else 0.0
+
+
+def benchmark_architecture(
+    name: str,
+    model: keras.Model,
+    config: PlateOCRConfig,
+    *,
+    batch_size: int = 64,
+    runs: int = 50,
+    warmup: int = 5,
+    num_threads: int = 1,
+    annotations_file: str | os.PathLike[str] | None = None,
+) -> ArchitectureBenchmark:
+    """
+    Export a model to ONNX and measure it with ONNX Runtime on CPU.
+
+    :param name: Name of the model in the results.
+    :param model: Keras model to benchmark.
+    :param config: OCR config of the model.
+    :param batch_size: Batch size used to measure the throughput.
+    :param runs: Number of timed runs.
+    :param warmup: Number of untimed runs done first.
+    :param num_threads: ONNX Runtime intra-op threads.
+    :param annotations_file: If given, the plate accuracy of the model is measured on this set.
+    :return: The benchmark result.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        model_path = pathlib.Path(tmp_dir) / "model.onnx"
+        export_onnx(model, model_path)
+        session = _onnx_session(model_path, num_threads)
+    rng = np.random.default_rng(0)
+    shape = (config.img_height, config.img_width, 1)
+    single = rng.integers(0, 256, size=(1, *shape)).astype(np.float32)
+    batch = rng.integers(0, 256, size=(batch_size, *shape)).astype(np.float32)
+    return ArchitectureBenchmark(
+        name=name,
+        num_params=model.count_params(),
+        latency_ms=1_000 * _median_seconds(session, single, runs, warmup),
+        plates_per_second=batch_size / _median_seconds(session, batch, runs, warmup),
+        plate_accuracy=(
+            _plate_accuracy(session, config, annotations_file, batch_size)
+            if annotations_file is not None
+            else None
+        ),
+    )
@@ -0,0 +1,126 @@
+"""
+Short training benchmark, used to pick the fastest Keras backend on the current machine.
+
+Keras binds its backend when it is first imported, so each backend is benchmarked in its own
+subprocess with `KERAS_BACKEND` set.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from fast_plate_ocr.train.utilities.backend_utils import (
+    DtypePolicy,
+    Framework,
+    JitCompile,
+    parse_jit_compile,
+)
+
+# ruff: noqa: PLR0913
+# pylint: disable=too-many-arguments
+
+
+class BackendBenchmark(NamedTuple):
+    """Result of benchmarking a backend."""
+
+    framework: Framework
+    steps_per_second: float | None
+    """Training steps per second, None if the benchmark failed."""
+    error: str | None = None
+
+
+def _compiled_model(
+    img_height: int,
+    img_width: int,
+    max_plate_slots: int,
+    vocabulary_size: int,
+    dtype_policy: DtypePolicy,
+    jit_compile: JitCompile,
+):
+    # pylint: disable=import-outside-toplevel
+    import keras
+
+    from fast_plate_ocr.train.model.custom import cce_loss
+    from fast_plate_ocr.train.model.models import cnn_ocr_model
+
+    keras.config.set_dtype_policy(dtype_policy)
+    model = cnn_ocr_model(
+        h=img_height, w=img_width, max_plate_slots=max_plate_slots, vocabulary_size=vocabulary_size
+    )
+    model.compile(
+        loss=cce_loss(vocabulary_size=vocabulary_size),
+        optimizer=keras.optimizers.Adam(1e-3),
+        jit_compile=parse_jit_compile(jit_compile),
+    )
+    return model
+
+
+def benchmark_training_steps(
+    img_height: int,
+    img_width: int,
+    max_plate_slots: int,
+    vocabulary_size: int,
+    *,
+    batch_size: int = 128,
+    steps: int = 30,
+    warmup_steps: int = 5,
+    dtype_policy: DtypePolicy = "float32",
+    jit_compile: JitCompile = "auto",
+) -> float:
+    """
+    Measure the training steps per second of the default CNN OCR model, with the Keras backend of
+    the current process.
+
+    :return: Training steps per second, after `warmup_steps` (which include compilation).
+    """
+    model = _compiled_model(
+        img_height, img_width, max_plate_slots, vocabulary_size, dtype_policy, jit_compile
+    )
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 256, size=(batch_size, img_height, img_width, 1), dtype=np.uint8)
+    y = np.eye(vocabulary_size, dtype=np.float32)[
+        rng.integers(0, vocabulary_size, size=(batch_size, max_plate_slots))
+    ]
+    for _ in range(warmup_steps):
+        model.train_on_batch(x, y)
+    start = time.perf_counter()
+    for _ in range(steps):
+        model.train_on_batch(x, y)
+    return steps / (time.perf_counter() - start)
+
+
+def run_backend_benchmark(
+    framework: Framework, timeout: float | None = None, **kwargs
+) -> BackendBenchmark:
+    """
+    Run `benchmark_training_steps` in a subprocess using the given Keras backend.
+
+    :param framework: Keras backend to benchmark.
+    :param timeout: Seconds after which the benchmark is stopped and reported as failed.
+    :param kwargs: Arguments of `benchmark_training_steps`.
+    :return: The benchmark result, with the error message if it failed (i.e. backend not installed).
+    """
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", __name__, json.dumps(kwargs)],
+            env={**os.environ, "KERAS_BACKEND": framework},
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        return BackendBenchmark(framework, None, f"Timed out after {timeout}s")
+    if result.returncode != 0:
+        stderr_lines = result.stderr.strip().splitlines()
+        return BackendBenchmark(framework, None, stderr_lines[-1] if stderr_lines else "Failed")
+    return BackendBenchmark(framework, float(result.stdout.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    print(benchmark_training_steps(**json.loads(sys.argv[1])))
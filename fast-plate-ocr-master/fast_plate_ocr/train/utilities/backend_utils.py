@@ -8,6 +8,12 @@ from typing import Literal, TypeAlias
 Framework: TypeAlias = Literal["jax", "tensorflow", "torch"]
 """Supported backend frameworks for Keras."""
 
+DtypePolicy: TypeAlias = Literal["float32", "mixed_float16", "mixed_bfloat16"]
+"""Keras dtype policies supported for training."""
+
+JitCompile: TypeAlias = Literal["auto", "true", "false"]
+"""Values of the `jit_compile` argument of `Model.compile`, as strings for the CLI."""
+
 
 def set_jax_backend() -> None:
     """Set Keras backend to jax."""
@@ -29,6 +35,11 @@ def set_keras_backend(framework: Framework) -> None:
     os.environ["KERAS_BACKEND"] = framework
 
 
+def parse_jit_compile(jit_compile: JitCompile) -> bool | Literal["auto"]:
+    """Convert the CLI value of `jit_compile` to the one expected by `Model.compile`."""
+    return "auto" if jit_compile == "auto" else jit_compile == "true"
+
+
 def reload_keras_backend(framework: Framework) -> None:
     """Reload the Keras backend with a given framework."""
     # pylint: disable=import-outside-toplevel
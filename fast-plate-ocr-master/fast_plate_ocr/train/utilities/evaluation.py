@@ -0,0 +1,175 @@
+"""
+Batched evaluation of Keras and exported ONNX models on labeled sets.
+"""
+
+import os
+import time
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+from torch.utils.data import DataLoader
+
+from fast_plate_ocr.common.encoding import encode_plates
+from fast_plate_ocr.inference.confusion import confusion_matrix
+from fast_plate_ocr.inference.onnx_inference import ONNXPlateRecognizer
+from fast_plate_ocr.train.data.dataset import LicensePlateDataset
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+
+
+class OnnxValidationResult(NamedTuple):
+    """Metrics of an ONNX model on a labeled set."""
+
+    num_plates: int
+    plate_accuracy: float
+    slot_accuracy: npt.NDArray[np.float64]
+    """Accuracy of each character slot, shape (max_plate_slots,)."""
+    confusion: npt.NDArray[np.int64]
+    """Per-character confusion matrix, true characters as rows and predicted as columns."""
+    elapsed_seconds: float
+    inference_seconds: float
+    """Time spent in `ONNXPlateRecognizer.run`, the rest is spent reading images."""
+    min_confidence: npt.NDArray[np.float32]
+    """Minimum per-slot confidence of each plate, shape (num_plates,)."""
+    plate_correct: npt.NDArray[np.bool_]
+    """Whether each plate was fully read correctly, shape (num_plates,)."""
+
+    @property
+    def plates_per_second(self) -> float:
+        return self.num_plates / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class KerasValidationResult(NamedTuple):
+    """Metrics of a Keras model on a labeled set."""
+
+    num_plates: int
+    plate_accuracy: float
+    slot_accuracy: npt.NDArray[np.float64]
+    """Accuracy of each character slot, shape (max_plate_slots,)."""
+    confusion: npt.NDArray[np.int64]
+    """Per-character confusion matrix, true characters as rows and predicted as columns."""
+
+
+class _MetricsAccumulator:
+    """Running plate/slot accuracy and confusion matrix over the batches of a labeled set."""
+
+    def __init__(self, max_plate_slots: int, vocabulary_size: int) -> None:
+        self.vocabulary_size = vocabulary_size
+        self.num_plates = 0
+        self.plates_correct = 0
+        self.slots_correct = np.zeros(max_plate_slots, dtype=np.int64)
+        self.confusion = np.zeros((vocabulary_size, vocabulary_size), dtype=np.int64)
+        self._plate_correct: list[npt.NDArray[np.bool_]] = []
+
+    def update(self, y_true: npt.NDArray, y_pred: npt.NDArray) -> None:
+        """Add a batch of alphabet indices, both of shape (N, max_plate_slots)."""
+        correct = y_pred == y_true
+        plate_correct = np.all(correct, axis=-1)
+        self.num_plates += len(correct)
+        self.plates_correct += int(plate_correct.sum())
+        self.slots_correct += correct.sum(axis=0)
+        self.confusion += confusion_matrix(y_true, y_pred, self.vocabulary_size)
+        self._plate_correct.append(plate_correct)
+
+    @property
+    def plate_accuracy(self) -> float:
+        return self.plates_correct / self.num_plates if self.num_plates else 0.0
+
+    @property
+    def slot_accuracy(self) -> npt.NDArray[np.float64]:
+        return self.slots_correct / max(self.num_plates, 1)
+
+    @property
+    def plate_correct(self) -> npt.NDArray[np.bool_]:
+        """Whether each plate seen so far was fully read correctly, shape (num_plates,)."""
+        if not self._plate_correct:
+            return np.empty(0, dtype=bool)
+        return np.concatenate(self._plate_correct)
+
+
+def validate_keras_model(
+    model: Any,
+    config: PlateOCRConfig,
+    annotations_file: str | os.PathLike[str],
+    batch_size: int = 1,
+    num_workers: int = 0,
+) -> KerasValidationResult:
+    """
+    Run a Keras model on a labeled set and collect plate/slot accuracy and the confusion matrix, in
+    a single pass over the images.
+
+    :param model: Keras OCR model, with a flat (N, max_plate_slots * vocabulary_size) output or an
+     already (N, max_plate_slots, vocabulary_size) one.
+    :param config: OCR config of the model.
+    :param annotations_file: Annotations file, as used for training/validation.
+    :param batch_size: Number of plates per model run.
+    :param num_workers: How many subprocesses read the images, 0 reads them in the main process.
+    :return: The validation metrics.
+    """
+    dataset = LicensePlateDataset(annotations_file=annotations_file, config=config)
+    dataloader = DataLoader(dataset, batch_size=batch_size, num_workers=num_workers, shuffle=False)
+    metrics = _MetricsAccumulator(config.max_plate_slots, config.vocabulary_size)
+    for x, y in dataloader:
+        y_pred = np.asarray(model.predict_on_batch(x.numpy()))
+        y_pred = y_pred.reshape((-1, config.max_plate_slots, config.vocabulary_size))
+        metrics.update(y.numpy().argmax(axis=-1), y_pred.argmax(axis=-1))
+    return KerasValidationResult(
+        num_plates=metrics.num_plates,
+        plate_accuracy=metrics.plate_accuracy,
+        slot_accuracy=metrics.slot_accuracy,
+        confusion=metrics.confusion,
+    )
+
+
+def validate_onnx_model(
+    recognizer: ONNXPlateRecognizer,
+    config: PlateOCRConfig,
+    annotations_file: str | os.PathLike[str],
+    batch_size: int = 256,
+    num_workers: int = 0,
+) -> OnnxValidationResult:
+    """
+    Run an ONNX model on a labeled set through `ONNXPlateRecognizer`, exactly as it is used for
+    inference, and collect plate/slot accuracy and the confusion matrix.
+
+    Images are read and resized by `num_workers` DataLoader processes while the model runs on the
+    previous batch.
+
+    :param recognizer: Recognizer of the model to validate.
+    :param config: OCR config of the model.
+    :param annotations_file: Annotations file, as used for training/validation.
+    :param batch_size: Number of plates per model run.
+    :param num_workers: How many subprocesses read the images, 0 reads them in the main process.
+    :return: The validation metrics.
+    """
+    dataloader = DataLoader(
+        LicensePlateDataset(annotations_file=annotations_file, config=config),
+        batch_size=batch_size,
+        num_workers=num_workers,
+        shuffle=False,
+    )
+    metrics = _MetricsAccumulator(config.max_plate_slots, config.vocabulary_size)
+    min_confidence = []
+    inference_seconds = 0.0
+    start = time.perf_counter()
+    for x, y in dataloader:
+        inference_start = time.perf_counter()
+        plates, confidence = recognizer.run(list(x.numpy()), return_confidence=True)
+        inference_seconds += time.perf_counter() - inference_start
+        metrics.update(
+            y.numpy().argmax(axis=-1),
+            encode_plates(plates, config.alphabet, config.max_plate_slots),
+        )
+        min_confidence.append(np.min(confidence, axis=-1))
+    return OnnxValidationResult(
+        num_plates=metrics.num_plates,
+        plate_accuracy=metrics.plate_accuracy,
+        slot_accuracy=metrics.slot_accuracy,
+        confusion=metrics.confusion,
+        elapsed_seconds=time.perf_counter() - start,
+        inference_seconds=inference_seconds,
+        min_confidence=(
+            np.concatenate(min_confidence) if min_confidence else np.empty(0, dtype=np.float32)
+        ),
+        plate_correct=metrics.plate_correct,
+    )
@@ -0,0 +1,241 @@
+"""
+Post-training quantization and evaluation of exported ONNX OCR models.
+"""
+
+import logging
+import os
+import pathlib
+import time
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import onnx
+import onnxruntime as rt
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_dynamic,
+    quantize_static,
+)
+
+from fast_plate_ocr.train.data.dataset import LicensePlateDataset
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+
+QUANTIZATION_MODES: tuple[str, ...] = ("dynamic-int8", "static-int8", "fp16")
+"""Supported post-training quantization modes."""
+
+
+class PlateCalibrationDataReader(CalibrationDataReader):
+    """
+    Feeds calibration plate images to `onnxruntime.quantization.quantize_static`.
+    """
+
+    def __init__(self, images: npt.NDArray[np.uint8], input_name: str = "input") -> None:
+        self.images = images
+        self.input_name = input_name
+        self._start, self._end = 0, len(images)
+        self._idx = 0
+
+    def get_next(self) -> dict[str, npt.NDArray[np.uint8]] | None:
+        if self._idx >= self._end:
+            return None
+        batch = self.images[self._idx : self._idx + 1]
+        self._idx += 1
+        return {self.input_name: batch}
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def set_range(self, start_index: int, end_index: int) -> None:
+        """
+        Only feed the images in [start_index, end_index), used by ONNX Runtime to calibrate in
+        strides.
+        """
+        self._start, self._end = start_index, min(end_index, len(self.images))
+        self._idx = start_index
+
+    def rewind(self) -> None:
+        self._idx = self._start
+
+
+class OnnxModelEvaluation(NamedTuple):
+    """
+    Plate accuracy and single-image latency of an ONNX OCR model.
+    """
+
+    predictions: npt.NDArray
+    plate_accuracy: float | None
+    latency_ms: float
+
+
+def load_annotated_plates(
+    annotations_file: str | os.PathLike[str],
+    config: PlateOCRConfig,
+    max_samples: int | None = None,
+) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8]]:
+    """
+    Read plate images and one-hot targets from an annotations CSV.
+
+    :param annotations_file: Annotations file, as used for training/validation.
+    :param config: OCR config of the model.
+    :param max_samples: If set, evenly sample at most this many plates.
+    :return: Images of shape (N, H, W, 1) and targets of shape (N, max_plate_slots, vocab_size).
+    """
+    dataset = LicensePlateDataset(annotations_file=annotations_file, config=config)
+    indices = np.arange(len(dataset))
+    if max_samples is not None and max_samples < len(dataset):
+        indices = np.linspace(0, len(dataset) - 1, num=max_samples).astype(np.int64)
+    samples = [dataset[idx] for idx in indices]
+    return np.stack([x for x, _ in samples]), np.stack([y for _, y in samples])
+
+
+def quantize_onnx_model(
+    input_path: str | os.PathLike[str],
+    output_path: str | os.PathLike[str],
+    mode: str,
+    calibration_images: npt.NDArray[np.uint8] | None = None,
+) -> None:
+    """
+    Quantize a float ONNX OCR model.
+
+    :param input_path: Float ONNX model.
+    :param output_path: Where to save the quantized model.
+    :param mode: One of `QUANTIZATION_MODES`. `dynamic-int8` quantizes weights only,
+     `static-int8` also quantizes activations using `calibration_images`, and `fp16` converts
+     weights and activations to half precision (inputs/outputs keep their types).
+    :param calibration_images: Plate images used by `static-int8`.
+    """
+    if mode == "dynamic-int8":
+        quantize_dynamic(input_path, output_path, weight_type=QuantType.QInt8)
+    elif mode == "static-int8":
+        if calibration_images is None or len(calibration_images) == 0:
+            raise ValueError("Static INT8 quantization needs calibration images.")
+        input_name = (
+            rt.InferenceSession(input_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        )
+        quantize_static(
+            input_path,
+            output_path,
+            PlateCalibrationDataReader(calibration_images, input_name),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QInt8,
+            weight_type=QuantType.QInt8,
+        )
+    elif mode == "fp16":
+        # Ships with onnxruntime, so no onnxconverter-common dependency is needed
+        # pylint: disable=import-outside-toplevel
+        from onnxruntime.transformers.float16 import convert_float_to_float16
+
+        model_fp16 = convert_float_to_float16(onnx.load(input_path), keep_io_types=True)
+        onnx.save(model_fp16, output_path)
+    else:
+        raise ValueError(
+            f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}."
+        )
+
+
+def plate_accuracy(
+    y_true: npt.NDArray, y_pred: npt.NDArray, max_plate_slots: int, vocabulary_size: int
+) -> float:
+    """
+    Fraction of plates with every character slot predicted correctly.
+
+    :param y_true: One-hot targets of shape (N, max_plate_slots, vocabulary_size).
+    :param y_pred: Model outputs, reshapeable to the same shape.
+    """
+    y_true = np.asarray(y_true).reshape(-1, max_plate_slots, vocabulary_size)
+    y_pred = np.asarray(y_pred).reshape(-1, max_plate_slots, vocabulary_size)
+    return float(np.all(y_true.argmax(axis=-1) == y_pred.argmax(axis=-1), axis=-1).mean())
+
+
+def evaluate_onnx_model(
+    model_path: str | os.PathLike[str],
+    x: npt.NDArray[np.uint8],
+    y: npt.NDArray | None = None,
+    num_latency_runs: int = 50,
+) -> OnnxModelEvaluation:
+    """
+    Run an ONNX OCR model over `x`, returning its predictions, plate accuracy (if `y` is given)
+    and median single-image latency on CPU.
+    """
+    session = rt.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    predictions = np.concatenate(
+        [session.run(None, {input_name: x[i : i + 1]})[0] for i in range(len(x))]
+    )
+    latencies = []
+    for i in range(num_latency_runs):
+        sample = x[i % len(x)][np.newaxis]
+        start = time.perf_counter()
+        session.run(None, {input_name: sample})
+        latencies.append((time.perf_counter() - start) * 1_000)
+    accuracy = None
+    if y is not None:
+        max_plate_slots, vocabulary_size = y.shape[1:]
+        accuracy = plate_accuracy(y, predictions, max_plate_slots, vocabulary_size)
+    return OnnxModelEvaluation(predictions, accuracy, float(np.median(latencies)))
+
+
+def quantize_and_validate(
+    float_model_path: pathlib.Path,
+    output_path: pathlib.Path,
+    mode: str,
+    x: npt.NDArray[np.uint8],
+    y: npt.NDArray,
+    calibration_images: npt.NDArray[np.uint8] | None = None,
+    max_accuracy_drop: float = 0.01,
+) -> bool:
+    """
+    Quantize a float ONNX model and only save it if its plate accuracy on (`x`, `y`) is within
+    `max_accuracy_drop` of the float model.
+
+    :return: True if the quantized model was saved at `output_path`.
+    """
+    tmp_path = output_path.with_name(f"{output_path.stem}.tmp{output_path.suffix}")
+    try:
+        quantize_onnx_model(float_model_path, tmp_path, mode, calibration_images)
+        float_eval = evaluate_onnx_model(float_model_path, x)
+        quant_eval = evaluate_onnx_model(tmp_path, x)
+        if not np.allclose(float_eval.predictions, quant_eval.predictions, rtol=1e-2, atol=1e-2):
+            logging.warning("Quantized (%s) model output is not close to the float model!", mode)
+        logging.info(
+            "Latency (median, batch 1): float %.3fms, %s %.3fms (%.2fx)",
+            float_eval.latency_ms,
+            mode,
+            quant_eval.latency_ms,
+            float_eval.latency_ms / quant_eval.latency_ms,
+        )
+        logging.info(
+            "Size: float %.2f MB, %s %.2f MB",
+            os.path.getsize(float_model_path) / 1024**2,
+            mode,
+            os.path.getsize(tmp_path) / 1024**2,
+        )
+        max_plate_slots, vocabulary_size = y.shape[1:]
+        float_accuracy = plate_accuracy(y, float_eval.predictions, max_plate_slots, vocabulary_size)
+        quant_accuracy = plate_accuracy(y, quant_eval.predictions, max_plate_slots, vocabulary_size)
+        accuracy_drop = float_accuracy - quant_accuracy
+        logging.info(
+            "Plate accuracy: float %.4f, %s %.4f (drop %.4f)",
+            float_accuracy,
+            mode,
+            quant_accuracy,
+            accuracy_drop,
+        )
+        if accuracy_drop > max_accuracy_drop:
+            logging.error(
+                "Accuracy drop %.4f exceeds max allowed %.4f, not saving %s model.",
+                accuracy_drop,
+                max_accuracy_drop,
+                mode,
+            )
+            return False
+        os.replace(tmp_path, output_path)
+        logging.info("Quantized (%s) model saved at %s", mode, output_path)
+        return True
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -0,0 +1,124 @@
+"""
+Review reports of OCR predictions.
+
+Predictions are streamed to a CSV file and to an HTML page linking the plate crops, which are
+written next to it, so large sets can be reviewed afterward in a browser instead of one image at a
+time in an OpenCV window.
+"""
+
+import csv
+import html
+import pathlib
+from types import TracebackType
+from typing import IO, Any
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+CSV_FILE = "review.csv"
+HTML_FILE = "review.html"
+CROPS_DIR = "crops"
+
+_HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>OCR predictions review</title>
+<style>
+body { font-family: sans-serif; }
+table { border-collapse: collapse; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; text-align: left; }
+.plate { font-family: monospace; font-size: 1.4em; }
+.low { color: #d00; font-weight: bold; text-decoration: underline; }
+</style>
+</head>
+<body>
+<table>
+<tr>
+<th>Image</th><th>Plate</th><th>Mean confidence</th><th>Confidence per slot</th><th>Path</th>
+</tr>
+"""
+_HTML_FOOTER = "</table>\n</body>\n</html>\n"
+
+
+class PredictionReviewReport:
+    """
+    Context manager writing predictions to `review.csv` and `review.html` inside a directory, with
+    the plate crops as PNG files in its `crops` subdirectory.
+
+    Rows are written as they are added, so neither memory usage nor the HTML page size grows with
+    the size of the crops.
+    """
+
+    def __init__(self, output_dir: pathlib.Path, low_conf_thresh: float) -> None:
+        """
+        :param output_dir: Directory where the report files are written.
+        :param low_conf_thresh: Characters with a confidence below this are highlighted.
+        """
+        self.output_dir = output_dir
+        self.low_conf_thresh = low_conf_thresh
+        self.num_rows = 0
+        self._csv_file: IO[str] | None = None
+        self._csv_writer: Any | None = None
+        self._html_file: IO[str] | None = None
+
+    def __enter__(self) -> "PredictionReviewReport":
+        (self.output_dir / CROPS_DIR).mkdir(parents=True, exist_ok=True)
+        self._csv_file = open(self.output_dir / CSV_FILE, "w", encoding="utf-8", newline="")
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_writer.writerow(
+            ["image_path", "plate", "mean_confidence", "slot_confidences", "low_conf_positions"]
+        )
+        self._html_file = open(self.output_dir / HTML_FILE, "w", encoding="utf-8")
+        self._html_file.write(_HTML_HEADER)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        if self._html_file is not None:
+            self._html_file.write(_HTML_FOOTER)
+            self._html_file.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+
+    def add(self, image_path: str, image: npt.NDArray, plate: str, probs: npt.NDArray) -> None:
+        """
+        Add a prediction to the report.
+
+        :param image_path: Path of the image.
+        :param image: Image fed to the model.
+        :param plate: Predicted plate.
+        :param probs: Confidence of each plate slot.
+        """
+        if self._csv_writer is None or self._html_file is None:
+            raise RuntimeError("The report must be used as a context manager.")
+        low_conf = np.flatnonzero(np.asarray(probs) < self.low_conf_thresh)
+        self._csv_writer.writerow(
+            [
+                image_path,
+                plate,
+                f"{np.mean(probs):.4f}",
+                " ".join(f"{prob:.4f}" for prob in probs),
+                " ".join(str(pos) for pos in low_conf),
+            ]
+        )
+        crop_path = f"{CROPS_DIR}/{self.num_rows:06d}.png"
+        cv2.imwrite(str(self.output_dir / crop_path), image)
+        plate_html = "".join(
+            f'<span class="low">{html.escape(char)}</span>'
+            if pos in low_conf
+            else html.escape(char)
+            for pos, char in enumerate(plate)
+        )
+        self._html_file.write(
+            f'<tr><td><img src="{crop_path}" loading="lazy">'
+            f'</td><td class="plate">{plate_html}</td><td>{100 * np.mean(probs):.2f}%</td>'
+            f"<td>{' '.join(f'{prob:.2f}' for prob in probs)}</td>"
+            f"<td>{html.escape(image_path)}</td></tr>\n"
+        )
+        self.num_rows += 1
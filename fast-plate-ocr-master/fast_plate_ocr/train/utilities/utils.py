@@ -5,22 +5,33 @@ Utility functions module
 import logging
 import pathlib
 import random
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Literal
 
 import cv2
 import keras
 import numpy as np
 import numpy.typing as npt
+from keras.src.callbacks import Callback, EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
+from keras.src.optimizers import Adam
 
+from fast_plate_ocr.common import encoding
+from fast_plate_ocr.train.model.config import PlateOCRConfig
 from fast_plate_ocr.train.model.custom import (
     cat_acc_metric,
     cce_loss,
     plate_acc_metric,
     top_3_k_metric,
 )
+from fast_plate_ocr.train.model.models import cnn_ocr_light_model, cnn_ocr_model
 
 
 def one_hot_plate(plate: str, alphabet: str) -> list[list[int]]:
-    return [[0 if char != letter else 1 for char in alphabet] for letter in plate]
+    return encoding.one_hot_encode(
+        encoding.encode_plates([plate], alphabet, max_plate_slots=len(plate))[0], len(alphabet)
+    ).tolist()
 
 
 def target_transform(
@@ -29,11 +40,9 @@ def target_transform(
     alphabet: str,
     pad_char: str,
 ) -> npt.NDArray[np.uint8]:
-    # Pad the plates which length is smaller than 'max_plate_slots'
-    plate_text = plate_text.ljust(max_plate_slots, pad_char)
-    # Generate numpy arrays with one-hot encoding of plates
-    encoded_plate = np.array(one_hot_plate(plate_text, alphabet=alphabet), dtype=np.uint8)
-    return encoded_plate
+    # Pad the plates which length is smaller than 'max_plate_slots' and one-hot encode them
+    indices = encoding.encode_plates([plate_text], alphabet, max_plate_slots, pad_char)[0]
+    return encoding.one_hot_encode(indices, len(alphabet))
 
 
 def read_plate_image(image_path: str, img_height: int, img_width: int) -> npt.NDArray:
@@ -69,19 +78,108 @@ def load_keras_model(
     return model
 
 
+def build_model(config: PlateOCRConfig, model_type: str = "cnn", **kwargs) -> keras.Model:
+    """
+    Build an OCR model, with the same options as the `train` command.
+
+    :param config: OCR config of the model.
+    :param model_type: Either 'cnn' (`cnn_ocr_model`) or 'light' (`cnn_ocr_light_model`).
+    :param kwargs: Extra arguments of the model function.
+    """
+    model_fn: Callable[..., keras.Model]
+    if model_type == "cnn":
+        model_fn = cnn_ocr_model
+    elif model_type == "light":
+        model_fn = cnn_ocr_light_model
+    else:
+        raise ValueError(f"Unknown model type '{model_type}'.")
+    return model_fn(
+        h=config.img_height,
+        w=config.img_width,
+        max_plate_slots=config.max_plate_slots,
+        vocabulary_size=config.vocabulary_size,
+        **kwargs,
+    )
+
+
+def compile_model(
+    model: keras.Model,
+    config: PlateOCRConfig,
+    lr: float,
+    label_smoothing: float = 0.0,
+    jit_compile: bool | Literal["auto"] = "auto",
+) -> None:
+    """
+    Compile an OCR model with the Adam optimizer, the OCR loss and the OCR metrics.
+    """
+    model.compile(
+        loss=cce_loss(vocabulary_size=config.vocabulary_size, label_smoothing=label_smoothing),
+        optimizer=Adam(lr),
+        metrics=[
+            cat_acc_metric(
+                max_plate_slots=config.max_plate_slots, vocabulary_size=config.vocabulary_size
+            ),
+            plate_acc_metric(
+                max_plate_slots=config.max_plate_slots, vocabulary_size=config.vocabulary_size
+            ),
+            top_3_k_metric(vocabulary_size=config.vocabulary_size),
+        ],
+        jit_compile=jit_compile,
+    )
+
+
+def training_callbacks(
+    model_file_path: str | pathlib.Path,
+    monitor: str,
+    early_stopping_patience: int,
+    reduce_lr_patience: int,
+    reduce_lr_factor: float,
+) -> list[Callback]:
+    """
+    Callbacks reducing the learning rate and stopping the training when the `monitor` accuracy
+    doesn't improve, and saving the best model.
+    """
+    return [
+        # Reduce the learning rate if `monitor` doesn't improve within X epochs
+        ReduceLROnPlateau(
+            monitor,
+            patience=reduce_lr_patience,
+            factor=reduce_lr_factor,
+            mode="max",
+            min_lr=1e-6,
+            verbose=1,
+        ),
+        # Stop training when `monitor` doesn't improve for X epochs
+        EarlyStopping(
+            monitor=monitor,
+            patience=early_stopping_patience,
+            mode="max",
+            restore_best_weights=False,
+            verbose=1,
+        ),
+        # We don't use EarlyStopping restore_best_weights=True because it won't restore the best
+        # weights when it didn't manage to EarlyStop but finished all epochs
+        ModelCheckpoint(
+            model_file_path,
+            monitor=monitor,
+            mode="max",
+            save_best_only=True,
+            verbose=1,
+        ),
+    ]
+
+
 IMG_EXTENSIONS: set[str] = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff", ".webp"}
 """Valid image extensions for the scope of this script."""
 
 
-def load_images_from_folder(
+def list_image_paths(
     img_dir: pathlib.Path,
-    width: int,
-    height: int,
     shuffle: bool = False,
     limit: int | None = None,
-) -> list[npt.NDArray]:
+) -> list[str]:
     """
-    Return all images read from a directory. This uses the same read function used during training.
+    Return the paths of all the images of a directory, sorted unless `shuffle` is set.
     """
     image_paths = sorted(
         str(f.resolve()) for f in img_dir.iterdir() if f.is_file() and f.suffix in IMG_EXTENSIONS
@@ -90,24 +188,70 @@ def load_images_from_folder(
         image_paths = image_paths[:limit]
     if shuffle:
         random.shuffle(image_paths)
+    return image_paths
+
+
+def load_images_from_folder(
+    img_dir: pathlib.Path,
+    width: int,
+    height: int,
+    shuffle: bool = False,
+    limit: int | None = None,
+) -> list[npt.NDArray]:
+    """
+    Return all images read from a directory. This uses the same read function used during training.
+    """
+    image_paths = list_image_paths(img_dir, shuffle=shuffle, limit=limit)
     images = [read_plate_image(i, img_height=height, img_width=width) for i in image_paths]
     return images
 
 
-def postprocess_model_output(
-    prediction: npt.NDArray,
-    alphabet: str,
-    max_plate_slots: int,
-    vocab_size: int,
-) -> tuple[str, npt.NDArray]:
+def iter_image_batches(
+    image_paths: Sequence[str],
+    width: int,
+    height: int,
+    batch_size: int,
+    num_workers: int = 4,
+    prefetch_batches: int = 2,
+) -> Iterator[tuple[list[str], npt.NDArray[np.uint8]]]:
     """
-    Return plate text and confidence scores from raw model output.
+    Lazily read images in batches, using the same read function used during training.
+
+    While a batch is being consumed, the next `prefetch_batches` are read by `num_workers` threads
+    (OpenCV releases the GIL while decoding), so at most `prefetch_batches + 1` batches are kept in
+    memory. With `num_workers=0` the batches are read in the calling thread, when requested.
+
+    :param image_paths: Paths of the images to read.
+    :param width: Width to which the images are resized.
+    :param height: Height to which the images are resized.
+    :param batch_size: Number of images per batch.
+    :param num_workers: Number of threads reading images, 0 to read them in the calling thread.
+    :param prefetch_batches: Number of batches read ahead of the one being consumed.
+    :return: Iterator of (paths, images) tuples, images with shape (N, H, W, 1).
     """
-    prediction = prediction.reshape((max_plate_slots, vocab_size))
-    probs = np.max(prediction, axis=-1)
-    prediction = np.argmax(prediction, axis=-1)
-    plate = "".join([alphabet[x] for x in prediction])
-    return plate, probs
+    if num_workers == 0:
+        for start in range(0, len(image_paths), batch_size):
+            batch_paths = list(image_paths[start : start + batch_size])
+            images = [
+                read_plate_image(path, img_height=height, img_width=width) for path in batch_paths
+            ]
+            yield batch_paths, np.stack(images)
+        return
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        pending: deque[tuple[list[str], list[Future]]] = deque()
+        for start in range(0, len(image_paths), batch_size):
+            batch_paths = list(image_paths[start : start + batch_size])
+            futures = [
+                executor.submit(read_plate_image, path, img_height=height, img_width=width)
+                for path in batch_paths
+            ]
+            pending.append((batch_paths, futures))
+            if len(pending) > prefetch_batches:
+                batch_paths, futures = pending.popleft()
+                yield batch_paths, np.stack([future.result() for future in futures])
+        while pending:
+            batch_paths, futures = pending.popleft()
+            yield batch_paths, np.stack([future.result() for future in futures])
 
 
 def low_confidence_positions(probs, thresh=0.3) -> npt.NDArray:
@@ -4,7 +4,16 @@ defined in a `conftest.py` can be used by any test in that package without needi
 (pytest will automatically discover them).
 """
 
+import pathlib
+from collections.abc import Callable
+
+import numpy as np
+import onnx
 import pytest
+import yaml
+from onnx import TensorProto, helper, numpy_helper
+
+from fast_plate_ocr.train.model.config import PlateOCRConfig
 
 
 @pytest.fixture(scope="function")
@@ -15,3 +24,95 @@ def temp_directory(tmpdir):
     temp_dir = tmpdir.mkdir("temp")
     yield temp_dir
     temp_dir.remove()
+
+
+@pytest.fixture(name="tiny_ocr_config")
+def tiny_ocr_config_fixture() -> PlateOCRConfig:
+    """
+    OCR config of 3 slots, a 10 letters (plus pad) alphabet and 8x16 images, small enough for
+    quick ONNX and Keras models.
+    """
+    return PlateOCRConfig(
+        max_plate_slots=3,
+        alphabet="ABCDEFGHIJ_",
+        pad_char="_",
+        img_height=8,
+        img_width=16,
+    )
+
+
+def _save_tiny_ocr_model(
+    path: pathlib.Path,
+    config: PlateOCRConfig,
+    batch_size: int | None = None,
+    softmax: bool = False,
+    scale: float | None = None,
+) -> pathlib.Path:
+    """
+    Save a tiny uint8 image -> (N, slots * vocab) random linear model, shaped like the exported OCR
+    models, and its config next to it (same path with a `.yaml` suffix).
+
+    :param path: Where to save the ONNX model.
+    :param config: OCR config of the model.
+    :param batch_size: Static batch dimension, None for a dynamic one.
+    :param softmax: Apply a softmax over each slot, so the output are per-slot probabilities.
+    :param scale: If set, the logits are multiplied by it (before the softmax).
+    :return: Path of the saved config.
+    """
+    num_pixels = config.img_height * config.img_width
+    num_outputs = config.max_plate_slots * config.vocabulary_size
+    weights = np.random.default_rng(0).normal(size=(num_pixels, num_outputs)).astype(np.float32)
+    nodes = [
+        helper.make_node("Cast", ["input"], ["x_float"], to=TensorProto.FLOAT),
+        helper.make_node("Reshape", ["x_float", "shape"], ["x_flat"]),
+        helper.make_node("MatMul", ["x_flat", "weights"], ["logits"]),
+    ]
+    initializers = [
+        numpy_helper.from_array(np.array([-1, num_pixels], dtype=np.int64), "shape"),
+        numpy_helper.from_array(weights, "weights"),
+    ]
+    if scale is not None:
+        nodes.append(helper.make_node("Mul", ["logits", "scale"], ["scaled_logits"]))
+        initializers.append(numpy_helper.from_array(np.array(scale, dtype=np.float32), "scale"))
+    if softmax:
+        nodes += [
+            helper.make_node("Reshape", [nodes[-1].output[0], "slots_shape"], ["slot_logits"]),
+            helper.make_node("Softmax", ["slot_logits"], ["probs"], axis=-1),
+            helper.make_node("Reshape", ["probs", "output_shape"], ["output"]),
+        ]
+        initializers += [
+            numpy_helper.from_array(
+                np.array([-1, config.max_plate_slots, config.vocabulary_size], dtype=np.int64),
+                "slots_shape",
+            ),
+            numpy_helper.from_array(np.array([-1, num_outputs], dtype=np.int64), "output_shape"),
+        ]
+    else:
+        nodes[-1].output[0] = "output"
+    graph = helper.make_graph(
+        nodes,
+        "tiny_ocr",
+        [
+            helper.make_tensor_value_info(
+                "input", TensorProto.UINT8, [batch_size, config.img_height, config.img_width, 1]
+            )
+        ],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, [batch_size, num_outputs])],
+        initializer=initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 16)])
+    model.ir_version = 8
+    onnx.save(model, path)
+    config_path = path.with_suffix(".yaml")
+    config_path.write_text(
+        yaml.safe_dump(config.model_dump(exclude={"vocabulary_size"})), encoding="utf-8"
+    )
+    return config_path
+
+
+@pytest.fixture(name="save_tiny_ocr_model")
+def save_tiny_ocr_model_fixture() -> Callable[..., pathlib.Path]:
+    """
+    Factory saving tiny ONNX OCR models (see `_save_tiny_ocr_model`).
+    """
+    return _save_tiny_ocr_model
@@ -0,0 +1,61 @@
+"""
+Tests for plate encoding module.
+"""
+
+import numpy as np
+import pytest
+
+from fast_plate_ocr.common.encoding import decode_plates, encode_plates, one_hot_encode
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_"
+
+
+@pytest.mark.parametrize(
+    "plates, max_plate_slots, expected",
+    [
+        (["A1"], 4, [[10, 1, 36, 36]]),
+        (["ZZ9", "0"], 4, [[35, 35, 9, 36], [0, 36, 36, 36]]),
+        (["AB123CD"], 7, [[10, 11, 1, 2, 3, 12, 13]]),
+        ([], 3, np.empty((0, 3))),
+    ],
+)
+def test_encode_plates(plates: list[str], max_plate_slots: int, expected: list[list[int]]) -> None:
+    encoded = encode_plates(plates, ALPHABET, max_plate_slots, pad_char="_")
+    assert encoded.shape == (len(plates), max_plate_slots)
+    np.testing.assert_array_equal(encoded, expected)
+
+
+@pytest.mark.parametrize(
+    "plates, alphabet, pad_char",
+    [
+        (["AB-12"], ALPHABET, "_"),
+        (["añ"], "abc_", "_"),
+        (["ABC"], ALPHABET, None),
+        (["ABC1234X"], ALPHABET, "_"),
+    ],
+)
+def test_encode_plates_invalid(plates: list[str], alphabet: str, pad_char: str | None) -> None:
+    with pytest.raises(ValueError):
+        encode_plates(plates, alphabet, 7, pad_char)
+
+
+def test_one_hot_encode() -> None:
+    indices = np.array([[2, 0], [1, 1]])
+    one_hot = one_hot_encode(indices, 3)
+    assert one_hot.dtype == np.uint8
+    np.testing.assert_array_equal(one_hot, np.eye(3, dtype=np.uint8)[indices])
+    one_hot[0, 0, 0] = 1
+    # The shared lookup table must not be modified through the result
+    np.testing.assert_array_equal(one_hot_encode(indices, 3)[0, 0], [0, 0, 1])
+
+
+@pytest.mark.parametrize(
+    "plates, alphabet",
+    [
+        (["AB123CD", "XYZ12__"], ALPHABET),
+        (["ñandú"], "adnuñú"),
+    ],
+)
+def test_decode_plates_roundtrip(plates: list[str], alphabet: str) -> None:
+    encoded = encode_plates(plates, alphabet, max_plate_slots=len(plates[0]))
+    assert decode_plates(encoded, alphabet) == plates
@@ -0,0 +1,91 @@
+"""
+Tests for the OCR model cascade module.
+"""
+
+import math
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from fast_plate_ocr.inference.cascade import CascadePlateRecognizer, calibrate_threshold
+
+
+class FakeRecognizer:
+    """Recognizer returning a fixed plate and per-slot confidence for each image, by pixel value."""
+
+    def __init__(self, plates: dict[int, str], confidence: dict[int, list[float]]) -> None:
+        self.plates = plates
+        self.confidence = confidence
+        self.calls: list[int] = []
+
+    def run(
+        self, source: list[npt.NDArray], return_confidence: bool = False
+    ) -> tuple[list[str], npt.NDArray] | list[str]:
+        keys = [int(image[0, 0]) for image in source]
+        self.calls.append(len(keys))
+        plates = [self.plates[key] for key in keys]
+        if return_confidence:
+            return plates, np.array([self.confidence[key] for key in keys], dtype=np.float32)
+        return plates
+
+
+def _image(key: int) -> npt.NDArray:
+    return np.full((8, 16), key, dtype=np.uint8)
+
+
+@pytest.fixture(name="cascade")
+def cascade_fixture() -> CascadePlateRecognizer:
+    first = FakeRecognizer(
+        plates={0: "AB1", 1: "CD2", 2: "EF3"},
+        confidence={0: [0.99, 0.95, 0.98], 1: [0.99, 0.40, 0.97], 2: [0.90, 0.91, 0.92]},
+    )
+    fallback = FakeRecognizer(plates={0: "XX0", 1: "CO2", 2: "EE3"}, confidence={})
+    return CascadePlateRecognizer(first, fallback, threshold=0.9)  # type: ignore[arg-type]
+
+
+def test_cascade_escalates_low_confidence_plates(cascade: CascadePlateRecognizer) -> None:
+    result = cascade.run_cascade([_image(0), _image(1), _image(2)])
+    assert result.plates == ["AB1", "CO2", "EF3"]
+    np.testing.assert_array_equal(result.escalated, [False, True, False])
+    np.testing.assert_allclose(result.min_confidence, [0.95, 0.40, 0.90])
+    # Escalated plates are re-read in a single batch
+    assert cascade.fallback.calls == [1]  # type: ignore[attr-defined]
+    assert cascade.escalation_rate == pytest.approx(1 / 3)
+
+
+def test_cascade_merges_results_in_order(cascade: CascadePlateRecognizer) -> None:
+    cascade.threshold = 0.92
+    plates = cascade.run([_image(1), _image(0), _image(2), _image(1)])
+    assert plates == ["CO2", "AB1", "EE3", "CO2"]
+    assert cascade.fallback.calls == [3]  # type: ignore[attr-defined]
+
+
+def test_cascade_single_image_without_escalation(cascade: CascadePlateRecognizer) -> None:
+    assert cascade.run(_image(0)) == ["AB1"]
+    assert not cascade.fallback.calls  # type: ignore[attr-defined]
+    assert cascade.escalation_rate == 0.0
+
+
+@pytest.mark.parametrize(
+    "min_confidence, correct, max_error_rate, expected_threshold",
+    [
+        # All correct: every plate can be kept
+        ([0.9, 0.5, 0.7], [True, True, True], 0.0, 0.5),
+        # The only error has the lowest confidence
+        ([0.9, 0.5, 0.7], [True, False, True], 0.0, 0.7),
+        # One error in four plates is allowed with a 25% error rate
+        ([0.9, 0.5, 0.7, 0.8], [True, False, True, True], 0.25, 0.5),
+        # Equal confidences are kept or escalated together
+        ([0.9, 0.8, 0.8], [True, True, False], 0.0, 0.9),
+        # Even the most confident plate is wrong
+        ([0.9, 0.5], [False, True], 0.0, math.inf),
+    ],
+)
+def test_calibrate_threshold(
+    min_confidence: list[float],
+    correct: list[bool],
+    max_error_rate: float,
+    expected_threshold: float,
+) -> None:
+    assert calibrate_threshold(min_confidence, correct, max_error_rate) == expected_threshold
@@ -0,0 +1,75 @@
+"""
+Tests for inference confusion module.
+"""
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from fast_plate_ocr.inference.confusion import (
+    apply_confusion_correction,
+    confusion_matrix,
+    correction_matrix,
+    load_correction_matrix,
+    save_confusion_matrix,
+)
+from fast_plate_ocr.inference.process import postprocess_output
+
+
+@pytest.mark.parametrize(
+    "y_true, y_pred, vocabulary_size, expected_confusion",
+    [
+        (
+            np.array([[0, 1, 2], [0, 1, 1]]),
+            np.array([[0, 1, 2], [2, 1, 1]]),
+            3,
+            np.array([[1, 0, 1], [0, 3, 0], [0, 0, 1]]),
+        ),
+        (
+            np.array([1, 1, 1]),
+            np.array([0, 0, 1]),
+            2,
+            np.array([[0, 0], [2, 1]]),
+        ),
+    ],
+)
+def test_confusion_matrix(
+    y_true: npt.NDArray, y_pred: npt.NDArray, vocabulary_size: int, expected_confusion: npt.NDArray
+) -> None:
+    actual_confusion = confusion_matrix(y_true, y_pred, vocabulary_size)
+    np.testing.assert_array_equal(actual_confusion, expected_confusion)
+
+
+def test_correction_matrix_rows_are_distributions() -> None:
+    confusion = np.array([[10, 0, 4], [0, 7, 0], [1, 0, 3]])
+    correction = correction_matrix(confusion, smoothing=1.0)
+    np.testing.assert_allclose(correction.sum(axis=1), 1.0, rtol=1e-6)
+    # Predicted 'C' (index 2) came from true 'A' 4 times and true 'C' 3 (+1 smoothing) times
+    np.testing.assert_allclose(correction[2], [0.5, 0.0, 0.5], rtol=1e-6)
+
+
+def test_correction_matrix_unseen_characters_are_identity() -> None:
+    correction = correction_matrix(np.zeros((3, 3), dtype=np.int64), smoothing=0.0)
+    np.testing.assert_array_equal(correction, np.eye(3, dtype=np.float32))
+
+
+def test_apply_confusion_correction_changes_decoding() -> None:
+    # 'B' is predicted slightly over 'A', but validation showed predicted 'B' is usually a true 'A'
+    model_output = np.array([[[0.45, 0.55, 0.0], [0.0, 0.0, 1.0]]], dtype=np.float32)
+    confusion = np.array([[0, 9, 0], [0, 1, 0], [0, 0, 10]])
+    correction = correction_matrix(confusion, smoothing=0.0)
+    corrected = apply_confusion_correction(model_output, correction, max_plate_slots=2)
+    assert corrected.shape == (1, 2, 3)
+    assert postprocess_output(model_output, 2, "ABC") == ["BC"]
+    assert postprocess_output(corrected, 2, "ABC") == ["AC"]
+
+
+def test_save_and_load_correction_matrix(tmp_path) -> None:
+    confusion = np.array([[3, 1], [0, 4]])
+    path = tmp_path / "confusion.npy"
+    save_confusion_matrix(confusion, path)
+    np.testing.assert_allclose(
+        load_correction_matrix(path, vocabulary_size=2), correction_matrix(confusion)
+    )
+    with pytest.raises(ValueError):
+        load_correction_matrix(path, vocabulary_size=3)
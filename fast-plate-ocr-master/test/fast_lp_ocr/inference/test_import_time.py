@@ -0,0 +1,53 @@
+"""
+Tests for the import footprint of the inference package.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import fast_plate_ocr
+
+DEFERRED_MODULES = {"rich", "tqdm", "urllib.request", "asyncio"}
+"""Modules only needed for benchmark reports or model downloads."""
+
+
+def _imported_modules(statement: str) -> set[str]:
+    """Modules imported by a fresh interpreter running `statement`, as reported by -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_package_import_is_lazy() -> None:
+    modules = _imported_modules("import fast_plate_ocr")
+    assert "fast_plate_ocr" in modules
+    assert "onnxruntime" not in modules
+    assert "numpy" not in modules
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from fast_plate_ocr import ONNXPlateRecognizer",
+        "import fast_plate_ocr.inference.onnx_inference",
+    ],
+)
+def test_inference_import_defers_reporting_and_downloads(statement: str) -> None:
+    modules = _imported_modules(statement)
+    assert "onnxruntime" in modules
+    assert not modules & DEFERRED_MODULES
+
+
+def test_unknown_package_attribute() -> None:
+    with pytest.raises(AttributeError, match="has no attribute"):
+        _ = fast_plate_ocr.NotARecognizer  # type: ignore[attr-defined]
@@ -0,0 +1,89 @@
+"""
+Tests for static-batch module.
+"""
+
+import pathlib
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+
+from fast_plate_ocr import ONNXPlateRecognizer
+from fast_plate_ocr.inference.static_batch import (
+    load_manifest,
+    manifest_path_for,
+    plan_batches,
+    static_model_path_for,
+    write_manifest,
+)
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+
+CONFIG = PlateOCRConfig(
+    max_plate_slots=3,
+    alphabet="0123456789_",
+    pad_char="_",
+    img_height=8,
+    img_width=16,
+)
+
+
+@pytest.mark.parametrize(
+    "num_images, batch_sizes, expected_plan",
+    [
+        (1, (1, 4, 8, 16), [1]),
+        (3, (1, 4, 8, 16), [4]),
+        (8, (1, 4, 8, 16), [8]),
+        (9, (1, 4, 8, 16), [16]),
+        (16, (1, 4, 8, 16), [16]),
+        (21, (1, 4, 8, 16), [16, 8]),
+        (35, (16, 1, 4, 8), [16, 16, 4]),
+        (5, (4,), [4, 4]),
+        (0, (1, 4), []),
+    ],
+)
+def test_plan_batches(
+    num_images: int, batch_sizes: tuple[int, ...], expected_plan: list[int]
+) -> None:
+    plan = plan_batches(num_images, batch_sizes)
+    assert plan == expected_plan
+    assert sum(plan) >= num_images
+
+
+def test_plan_batches_requires_sizes() -> None:
+    with pytest.raises(ValueError, match="static batch size"):
+        plan_batches(4, ())
+
+
+def test_manifest_roundtrip(tmp_path: pathlib.Path) -> None:
+    model_path = tmp_path / "ocr.onnx"
+    static_models = {bs: static_model_path_for(model_path, bs) for bs in (1, 4)}
+    assert static_models[4] == tmp_path / "ocr_b4.onnx"
+    manifest_path = write_manifest(model_path, static_models)
+    assert manifest_path == manifest_path_for(model_path) == tmp_path / "ocr.manifest.json"
+    assert load_manifest(model_path) == static_models
+    assert not load_manifest(tmp_path / "other.onnx")
+
+
+@pytest.mark.parametrize("num_images", [1, 3, 6])
+def test_recognizer_dispatches_to_static_models(
+    tmp_path: pathlib.Path, num_images: int, save_tiny_ocr_model: Callable[..., pathlib.Path]
+) -> None:
+    model_path = tmp_path / "ocr.onnx"
+    config_path = save_tiny_ocr_model(model_path, CONFIG)
+    static_models = {}
+    for batch_size in (1, 4):
+        static_models[batch_size] = static_model_path_for(model_path, batch_size)
+        save_tiny_ocr_model(static_models[batch_size], CONFIG, batch_size=batch_size)
+    write_manifest(model_path, static_models)
+
+    rng = np.random.default_rng(1)
+    images = list(
+        rng.integers(0, 256, size=(num_images, CONFIG.img_height, CONFIG.img_width), dtype=np.uint8)
+    )
+    dynamic = ONNXPlateRecognizer(
+        model_path=model_path, config_path=config_path, device="cpu", use_static_batches=False
+    )
+    static = ONNXPlateRecognizer(model_path=model_path, config_path=config_path, device="cpu")
+    assert not dynamic.static_models
+    assert sorted(static.static_models) == [1, 4]
+    assert static.run(images) == dynamic.run(images)
@@ -0,0 +1,63 @@
+"""
+Tests for the architecture benchmark module.
+"""
+
+# ruff: noqa: E402
+# pylint: disable=wrong-import-position,wrong-import-order,ungrouped-imports
+# fmt: off
+from fast_plate_ocr.train.utilities.backend_utils import set_pytorch_backend
+
+set_pytorch_backend()
+# fmt: on
+
+import pathlib
+import shutil
+
+import pytest
+
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from fast_plate_ocr.train.utilities.architecture_benchmark import (
+    ARCHITECTURE_VARIANTS,
+    benchmark_architecture,
+)
+from fast_plate_ocr.train.utilities import utils
+from test.assets import ASSETS_DIR
+
+
+@pytest.fixture(name="config")
+def config_fixture(tiny_ocr_config: PlateOCRConfig) -> PlateOCRConfig:
+    """The tiny config with 16x32 images, the smallest size the default CNN can downsample."""
+    return tiny_ocr_config.model_copy(update={"img_height": 16, "img_width": 32})
+
+
+@pytest.mark.parametrize("variant", list(ARCHITECTURE_VARIANTS))
+def test_build_model(config: PlateOCRConfig, variant: str) -> None:
+    model = utils.build_model(config, **ARCHITECTURE_VARIANTS[variant])
+    assert model.output_shape[1:] in {
+        (config.max_plate_slots * config.vocabulary_size,),
+        (config.max_plate_slots, config.vocabulary_size, 1),
+    }
+
+
+def test_build_model_unknown_type(config: PlateOCRConfig) -> None:
+    with pytest.raises(ValueError, match="Unknown model type"):
+        utils.build_model(config, model_type="transformer")
+
+
+def test_benchmark_architecture(config: PlateOCRConfig, tmp_path: pathlib.Path) -> None:
+    for name in ("test_plate_1.png", "test_plate_2.png"):
+        shutil.copy(ASSETS_DIR / name, tmp_path / name)
+    annotations_file = tmp_path / "annotations.csv"
+    annotations_file.write_text(
+        "image_path,plate_text\ntest_plate_1.png,ABC\ntest_plate_2.png,DE_\n", encoding="utf-8"
+    )
+    model = utils.build_model(config, model_type="light", width_multiplier=0.25, depth=2)
+    result = benchmark_architecture(
+        "light", model, config, batch_size=4, runs=3, warmup=1, annotations_file=annotations_file
+    )
+    assert result.name == "light"
+    assert result.num_params == model.count_params()
+    assert result.latency_ms > 0
+    assert result.plates_per_second > 0
+    assert result.plate_accuracy is not None
+    assert 0.0 <= result.plate_accuracy <= 1.0
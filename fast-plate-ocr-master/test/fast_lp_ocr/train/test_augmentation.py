@@ -0,0 +1,91 @@
+"""
+Tests for augmentation module.
+"""
+
+import pathlib
+
+import numpy as np
+import pytest
+import torch
+
+from fast_plate_ocr.train.data.augmentation import BatchAugmentation
+
+NO_AUGMENTATION = {
+    "shift_limit": 0.0,
+    "scale_limit": 0.0,
+    "rotate_limit": 0.0,
+    "brightness_limit": 0.0,
+    "contrast_limit": 0.0,
+    "dropout_p": 0.0,
+}
+
+
+@pytest.fixture(name="images")
+def images_fixture() -> np.ndarray:
+    return np.random.default_rng(0).integers(0, 256, size=(6, 14, 28, 1), dtype=np.uint8)
+
+
+def test_batch_augmentation_keeps_shape_and_dtype(images: np.ndarray) -> None:
+    augmented = BatchAugmentation()(images.copy())
+    assert augmented.shape == images.shape
+    assert augmented.dtype == np.uint8
+
+
+def test_batch_augmentation_identity(images: np.ndarray) -> None:
+    augmented = BatchAugmentation(**NO_AUGMENTATION)(images.copy())
+    np.testing.assert_array_equal(augmented, images)
+
+
+def test_batch_augmentation_per_sample_parameters(images: np.ndarray) -> None:
+    augmentation = BatchAugmentation(**{**NO_AUGMENTATION, "rotate_limit": 30.0})
+    matrices = augmentation.affine_matrices(len(images), 14, 28)
+    assert matrices.shape == (len(images), 2, 3)
+    assert len(np.unique(matrices[:, 0, 1])) == len(images)
+    # Rotation around the center keeps the center fixed
+    center = np.array([13.5, 6.5, 1.0])
+    np.testing.assert_allclose(matrices @ center, np.tile([13.5, 6.5], (len(images), 1)), atol=1e-4)
+
+
+@pytest.mark.parametrize("brightness_limit", [0.5, 1.0])
+def test_batch_augmentation_brightness_is_clipped(brightness_limit: float) -> None:
+    augmentation = BatchAugmentation(**{**NO_AUGMENTATION, "brightness_limit": brightness_limit})
+    augmented = augmentation(np.full((8, 4, 4, 1), 200, dtype=np.uint8))
+    assert augmented.dtype == np.uint8
+    # Each sample gets its own brightness, applied uniformly over the image
+    assert np.all(augmented == augmented[:, :1, :1])
+    assert len(np.unique(augmented)) > 1
+
+
+def test_batch_augmentation_pixel_dropout(images: np.ndarray) -> None:
+    augmentation = BatchAugmentation(**{**NO_AUGMENTATION, "dropout_p": 1.0, "dropout_prob": 0.5})
+    augmented = augmentation(images | np.uint8(1))
+    assert 0.3 < np.mean(augmented == 0) < 0.7
+
+
+def test_batch_augmentation_collate(images: np.ndarray) -> None:
+    labels = np.eye(3, dtype=np.uint8)[np.zeros((len(images), 2), dtype=np.int64)]
+    x, y = BatchAugmentation().collate(list(zip(images, labels, strict=True)))
+    assert isinstance(x, torch.Tensor)
+    assert isinstance(y, torch.Tensor)
+    assert tuple(x.shape) == images.shape
+    assert x.dtype == torch.uint8
+    np.testing.assert_array_equal(y.numpy(), labels)
+
+
+def test_batch_augmentation_to_albumentations(images: np.ndarray) -> None:
+    augmentation = BatchAugmentation(**{**NO_AUGMENTATION, "dropout_p": 1.0, "dropout_prob": 1.0})
+    augmented = augmentation.to_albumentations()(image=images[0])["image"]
+    assert augmented.shape == images[0].shape
+    assert not augmented.any()
+    np.testing.assert_array_equal(
+        BatchAugmentation(**NO_AUGMENTATION).to_albumentations()(image=images[0])["image"],
+        images[0],
+    )
+
+
+def test_batch_augmentation_save_load(tmp_path: pathlib.Path) -> None:
+    augmentation = BatchAugmentation(rotate_limit=3.0, dropout_p=0.5)
+    augmentation.save(tmp_path / "batch_augmentation.yaml")
+    assert BatchAugmentation.load(tmp_path / "batch_augmentation.yaml").to_dict() == (
+        augmentation.to_dict()
+    )
@@ -0,0 +1,58 @@
+"""
+Tests for backend benchmark module.
+"""
+
+# ruff: noqa: E402
+# pylint: disable=wrong-import-position,wrong-import-order,ungrouped-imports
+# fmt: off
+from fast_plate_ocr.train.utilities.backend_utils import (
+    DtypePolicy,
+    JitCompile,
+    parse_jit_compile,
+    set_pytorch_backend,
+)
+
+set_pytorch_backend()
+# fmt: on
+
+import keras
+import pytest
+
+from fast_plate_ocr.train.utilities.backend_benchmark import (
+    benchmark_training_steps,
+    run_backend_benchmark,
+)
+
+
+@pytest.mark.parametrize(
+    "jit_compile, expected", [("auto", "auto"), ("true", True), ("false", False)]
+)
+def test_parse_jit_compile(jit_compile: JitCompile, expected: bool | str) -> None:
+    assert parse_jit_compile(jit_compile) == expected
+
+
+@pytest.mark.parametrize("dtype_policy", ["float32", "mixed_bfloat16"])
+def test_benchmark_training_steps(dtype_policy: DtypePolicy) -> None:
+    try:
+        steps_per_second = benchmark_training_steps(
+            img_height=16,
+            img_width=32,
+            max_plate_slots=3,
+            vocabulary_size=5,
+            batch_size=2,
+            steps=2,
+            warmup_steps=1,
+            dtype_policy=dtype_policy,
+            jit_compile="false",
+        )
+    finally:
+        keras.config.set_dtype_policy("float32")
+    assert steps_per_second > 0
+
+
+def test_run_backend_benchmark_reports_errors() -> None:
+    result = run_backend_benchmark(keras.backend.backend(), unknown_argument=1)
+    assert result.framework == keras.backend.backend()
+    assert result.steps_per_second is None
+    assert result.error is not None
+    assert "TypeError" in result.error
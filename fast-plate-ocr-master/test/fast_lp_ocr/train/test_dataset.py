@@ -0,0 +1,73 @@
+"""
+Tests for dataset and compiled dataset cache modules.
+"""
+
+import pathlib
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+
+from fast_plate_ocr.train.data.cache import cache_dir_for, compile_dataset
+from fast_plate_ocr.train.data.dataset import LicensePlateDataset
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from test.assets import ASSETS_DIR
+
+CONFIG = PlateOCRConfig(
+    max_plate_slots=7,
+    alphabet="0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_",
+    pad_char="_",
+    img_height=32,
+    img_width=64,
+)
+
+
+@pytest.fixture(name="annotations_file")
+def annotations_file_fixture(tmp_path: pathlib.Path) -> pathlib.Path:
+    # Image paths are relative to the annotations file
+    for name in ("test_plate_1.png", "test_plate_2.png"):
+        shutil.copy(ASSETS_DIR / name, tmp_path / name)
+    annotations_file = tmp_path / "annotations.csv"
+    annotations_file.write_text(
+        "image_path,plate_text\ntest_plate_1.png,AB123CD\ntest_plate_2.png,XYZ12\n",
+        encoding="utf-8",
+    )
+    return annotations_file
+
+
+def test_cached_dataset_matches_image_dataset(
+    annotations_file: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    dataset = LicensePlateDataset(annotations_file, CONFIG)
+    cached_dataset = LicensePlateDataset(annotations_file, CONFIG, cache_dir=tmp_path / "cache")
+    assert len(cached_dataset) == len(dataset) == 2
+    samples = [(dataset[idx], cached_dataset[idx]) for idx in range(len(dataset))]
+    for (x, y), (cached_x, cached_y) in samples:
+        np.testing.assert_array_equal(cached_x, x)
+        np.testing.assert_array_equal(cached_y, y)
+        assert cached_x.flags.writeable
+
+
+def test_compile_dataset_reuses_cache(
+    annotations_file: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    cache_root = tmp_path / "cache"
+    compiled_dir = compile_dataset(annotations_file, CONFIG, cache_root)
+    assert compiled_dir == cache_dir_for(annotations_file, CONFIG, cache_root)
+    images_mtime = (compiled_dir / "images.npy").stat().st_mtime_ns
+    assert compile_dataset(annotations_file, CONFIG, cache_root) == compiled_dir
+    assert (compiled_dir / "images.npy").stat().st_mtime_ns == images_mtime
+    # A different image size is a different cache
+    other_config = CONFIG.model_copy(update={"img_width": 96})
+    assert cache_dir_for(annotations_file, other_config, cache_root) != compiled_dir
+
+
+def test_cached_dataset_pickles_without_images(
+    annotations_file: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    cached_dataset = LicensePlateDataset(annotations_file, CONFIG, cache_dir=tmp_path / "cache")
+    state = pickle.dumps(cached_dataset)
+    assert len(state) < cached_dataset._images.nbytes  # pylint: disable=protected-access
+    restored = pickle.loads(state)
+    np.testing.assert_array_equal(restored[1][0], cached_dataset[1][0])
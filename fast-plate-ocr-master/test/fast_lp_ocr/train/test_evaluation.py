@@ -0,0 +1,134 @@
+"""
+Tests for the evaluation module.
+"""
+
+# ruff: noqa: E402
+# pylint: disable=wrong-import-position,wrong-import-order,ungrouped-imports
+# fmt: off
+from fast_plate_ocr.train.utilities.backend_utils import set_pytorch_backend
+
+set_pytorch_backend()
+# fmt: on
+
+import pathlib
+import shutil
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+
+from fast_plate_ocr import ONNXPlateRecognizer
+from fast_plate_ocr.common.encoding import encode_plates
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from fast_plate_ocr.train.model.models import cnn_ocr_model
+from fast_plate_ocr.train.utilities import utils
+from fast_plate_ocr.train.utilities.evaluation import validate_keras_model, validate_onnx_model
+from test.assets import ASSETS_DIR
+
+IMAGES = ("test_plate_1.png", "test_plate_2.png")
+
+
+@pytest.fixture(name="recognizer")
+def recognizer_fixture(
+    tmp_path: pathlib.Path,
+    tiny_ocr_config: PlateOCRConfig,
+    save_tiny_ocr_model: Callable[..., pathlib.Path],
+) -> ONNXPlateRecognizer:
+    """Recognizer of a tiny uint8 image -> (N, slots * vocab) random linear model."""
+    model_path = tmp_path / "ocr.onnx"
+    config_path = save_tiny_ocr_model(model_path, tiny_ocr_config)
+    return ONNXPlateRecognizer(model_path=model_path, config_path=config_path, device="cpu")
+
+
+@pytest.fixture(name="annotations_file")
+def annotations_file_fixture(
+    tmp_path: pathlib.Path, tiny_ocr_config: PlateOCRConfig, recognizer: ONNXPlateRecognizer
+) -> pathlib.Path:
+    # Label the first plate with the model prediction and the second with its first slot wrong
+    images = []
+    for name in IMAGES:
+        shutil.copy(ASSETS_DIR / name, tmp_path / name)
+        images.append(
+            utils.read_plate_image(
+                str(tmp_path / name), tiny_ocr_config.img_height, tiny_ocr_config.img_width
+            )
+        )
+    first, second = recognizer.run(images)
+    wrong_char = next(char for char in tiny_ocr_config.alphabet if char not in (second[0], "_"))
+    annotations_file = tmp_path / "annotations.csv"
+    annotations_file.write_text(
+        f"image_path,plate_text\n{IMAGES[0]},{first}\n{IMAGES[1]},{wrong_char}{second[1:]}\n",
+        encoding="utf-8",
+    )
+    return annotations_file
+
+
+@pytest.mark.parametrize("batch_size", [1, 256])
+def test_validate_onnx_model(
+    recognizer: ONNXPlateRecognizer,
+    tiny_ocr_config: PlateOCRConfig,
+    annotations_file: pathlib.Path,
+    batch_size: int,
+) -> None:
+    result = validate_onnx_model(
+        recognizer, tiny_ocr_config, annotations_file, batch_size=batch_size
+    )
+    assert result.num_plates == 2
+    assert result.plate_accuracy == pytest.approx(0.5)
+    np.testing.assert_allclose(result.slot_accuracy, [0.5, 1.0, 1.0])
+    assert result.confusion.shape == (
+        tiny_ocr_config.vocabulary_size,
+        tiny_ocr_config.vocabulary_size,
+    )
+    assert result.confusion.sum() == 2 * tiny_ocr_config.max_plate_slots
+    assert np.trace(result.confusion) == 2 * tiny_ocr_config.max_plate_slots - 1
+    assert 0 < result.inference_seconds <= result.elapsed_seconds
+    assert result.plates_per_second > 0
+    assert result.min_confidence.shape == (2,)
+    np.testing.assert_array_equal(result.plate_correct, [True, False])
+
+
+@pytest.mark.parametrize("batch_size", [1, 2])
+def test_validate_keras_model(tmp_path: pathlib.Path, batch_size: int) -> None:
+    config = PlateOCRConfig(
+        max_plate_slots=7,
+        alphabet="0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_",
+        pad_char="_",
+        img_height=70,
+        img_width=140,
+    )
+    # Default CNN model, with a flat (N, slots * vocab) output
+    model = cnn_ocr_model(
+        h=config.img_height,
+        w=config.img_width,
+        max_plate_slots=config.max_plate_slots,
+        vocabulary_size=config.vocabulary_size,
+    )
+    plates = ["AB123C", "7890XYZ"]
+    for name in IMAGES:
+        shutil.copy(ASSETS_DIR / name, tmp_path / name)
+    annotations_file = tmp_path / "annotations.csv"
+    annotations_file.write_text(
+        "image_path,plate_text\n"
+        + "".join(f"{n},{p}\n" for n, p in zip(IMAGES, plates, strict=True)),
+        encoding="utf-8",
+    )
+    result = validate_keras_model(model, config, annotations_file, batch_size=batch_size)
+    images = np.array(
+        [
+            utils.read_plate_image(str(tmp_path / name), config.img_height, config.img_width)
+            for name in IMAGES
+        ]
+    )
+    y_pred = np.asarray(model.predict_on_batch(images)).reshape(
+        (-1, config.max_plate_slots, config.vocabulary_size)
+    )
+    correct = y_pred.argmax(axis=-1) == encode_plates(
+        plates, config.alphabet, config.max_plate_slots, pad_char=config.pad_char
+    )
+    assert result.num_plates == 2
+    assert result.confusion.shape == (config.vocabulary_size, config.vocabulary_size)
+    assert result.confusion.sum() == 2 * config.max_plate_slots
+    assert np.trace(result.confusion) == correct.sum()
+    np.testing.assert_allclose(result.slot_accuracy, correct.mean(axis=0))
+    assert result.plate_accuracy == pytest.approx(np.all(correct, axis=-1).mean())
@@ -28,3 +28,38 @@ def test_head_no_fc(
     out_tensor = models.head_no_fc(x, max_plates_slots, vocabulary_size)
     actual_hidden_units = out_tensor.shape[1] * out_tensor.shape[2]
     assert actual_hidden_units == expected_hidden_units
+
+
+@pytest.mark.parametrize(
+    "max_plates_slots, vocabulary_size, expected_hidden_units", [(7, 37, 7 * 37), (8, 11, 8 * 11)]
+)
+def test_head_shared(
+    max_plates_slots: int, vocabulary_size: int, expected_hidden_units: int
+) -> None:
+    x = Input((3, 5, 64))
+    out_tensor = models.head_shared(x, max_plates_slots, vocabulary_size)
+    actual_hidden_units = out_tensor.shape[-1]
+    assert actual_hidden_units == expected_hidden_units
+
+
+@pytest.mark.parametrize(
+    "width_multiplier, depth, shared_head",
+    [(1.0, 4, True), (0.5, 3, True), (0.25, 1, False)],
+)
+def test_cnn_ocr_light_model(width_multiplier: float, depth: int, shared_head: bool) -> None:
+    model = models.cnn_ocr_light_model(
+        h=70,
+        w=140,
+        max_plate_slots=8,
+        vocabulary_size=11,
+        width_multiplier=width_multiplier,
+        depth=depth,
+        shared_head=shared_head,
+    )
+    assert model.output_shape == (None, 8 * 11)
+    assert model.count_params() < models.cnn_ocr_model(70, 140, 8, 11).count_params() / 10
+
+
+def test_cnn_ocr_light_model_invalid_depth() -> None:
+    with pytest.raises(ValueError, match="Depth must be at least 1"):
+        models.cnn_ocr_light_model(h=70, w=140, max_plate_slots=8, vocabulary_size=11, depth=0)
@@ -0,0 +1,125 @@
+"""
+Tests for ONNX quantization module.
+"""
+
+import pathlib
+from collections.abc import Callable
+
+import numpy as np
+import onnxruntime as rt
+import pytest
+
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from fast_plate_ocr.train.utilities.quantization import (
+    PlateCalibrationDataReader,
+    evaluate_onnx_model,
+    plate_accuracy,
+    quantize_and_validate,
+    quantize_onnx_model,
+)
+
+CONFIG = PlateOCRConfig(
+    max_plate_slots=3,
+    alphabet="ABC_",
+    pad_char="_",
+    img_height=8,
+    img_width=16,
+)
+IMG_HEIGHT, IMG_WIDTH = CONFIG.img_height, CONFIG.img_width
+MAX_PLATE_SLOTS, VOCABULARY_SIZE = CONFIG.max_plate_slots, CONFIG.vocabulary_size
+
+
+@pytest.fixture(name="float_model_path")
+def float_model_path_fixture(
+    tmp_path: pathlib.Path, save_tiny_ocr_model: Callable[..., pathlib.Path]
+) -> pathlib.Path:
+    """Tiny uint8 image -> (N, slots * vocab) model, shaped like the exported OCR models."""
+    path = tmp_path / "float.onnx"
+    save_tiny_ocr_model(path, CONFIG, scale=1 / 255)
+    return path
+
+
+@pytest.fixture(name="images")
+def images_fixture() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, size=(16, IMG_HEIGHT, IMG_WIDTH, 1), dtype=np.uint8)
+
+
+def _float_targets(model_path: pathlib.Path, images: np.ndarray) -> np.ndarray:
+    """One-hot targets equal to the float model predictions (100% float plate accuracy)."""
+    predictions = rt.InferenceSession(model_path).run(None, {"input": images})[0]
+    indices = predictions.reshape(-1, MAX_PLATE_SLOTS, VOCABULARY_SIZE).argmax(axis=-1)
+    return np.eye(VOCABULARY_SIZE, dtype=np.uint8)[indices]
+
+
+@pytest.mark.parametrize(
+    "y_true_indices, y_pred_indices, expected_accuracy",
+    [
+        ([[0, 1, 2], [3, 2, 1]], [[0, 1, 2], [3, 2, 1]], 1.0),
+        ([[0, 1, 2], [3, 2, 1]], [[0, 1, 2], [3, 2, 0]], 0.5),
+        ([[0, 1, 2], [3, 2, 1]], [[1, 1, 2], [3, 0, 1]], 0.0),
+    ],
+)
+def test_plate_accuracy(
+    y_true_indices: list[list[int]], y_pred_indices: list[list[int]], expected_accuracy: float
+) -> None:
+    y_true = np.eye(VOCABULARY_SIZE)[y_true_indices]
+    y_pred = np.eye(VOCABULARY_SIZE)[y_pred_indices].reshape(len(y_pred_indices), -1)
+    assert plate_accuracy(y_true, y_pred, MAX_PLATE_SLOTS, VOCABULARY_SIZE) == expected_accuracy
+
+
+def test_calibration_data_reader(images: np.ndarray) -> None:
+    reader = PlateCalibrationDataReader(images, input_name="input")
+    batches = list(iter(reader.get_next, None))
+    assert len(batches) == len(images)
+    assert batches[0]["input"].shape == (1, IMG_HEIGHT, IMG_WIDTH, 1)
+    assert len(reader) == len(images)
+    reader.rewind()
+    batch = reader.get_next()
+    assert batch is not None
+    np.testing.assert_array_equal(batch["input"][0], images[0])
+    reader.set_range(2, 5)
+    assert len(reader) == 3
+    assert len(list(iter(reader.get_next, None))) == 3
+
+
+@pytest.mark.parametrize("mode", ["dynamic-int8", "static-int8", "fp16"])
+def test_quantize_onnx_model(
+    mode: str, float_model_path: pathlib.Path, images: np.ndarray, tmp_path: pathlib.Path
+) -> None:
+    output_path = tmp_path / f"{mode}.onnx"
+    quantize_onnx_model(float_model_path, output_path, mode, calibration_images=images)
+    float_eval = evaluate_onnx_model(float_model_path, images, num_latency_runs=2)
+    quant_eval = evaluate_onnx_model(output_path, images, num_latency_runs=2)
+    assert quant_eval.predictions.shape == float_eval.predictions.shape
+    np.testing.assert_allclose(quant_eval.predictions, float_eval.predictions, atol=0.5)
+
+
+def test_quantize_onnx_model_unknown_mode(
+    float_model_path: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    with pytest.raises(ValueError, match="Unknown quantization mode"):
+        quantize_onnx_model(float_model_path, tmp_path / "out.onnx", "int4")
+
+
+@pytest.mark.parametrize("max_accuracy_drop, expected_saved", [(1.0, True), (-1.0, False)])
+def test_quantize_and_validate(
+    max_accuracy_drop: float,
+    expected_saved: bool,
+    float_model_path: pathlib.Path,
+    images: np.ndarray,
+    tmp_path: pathlib.Path,
+) -> None:
+    output_path = tmp_path / "quantized.onnx"
+    targets = _float_targets(float_model_path, images)
+    saved = quantize_and_validate(
+        float_model_path,
+        output_path,
+        "dynamic-int8",
+        images,
+        targets,
+        max_accuracy_drop=max_accuracy_drop,
+    )
+    assert saved is expected_saved
+    assert output_path.exists() is expected_saved
+    assert not list(tmp_path.glob("*.tmp.onnx"))
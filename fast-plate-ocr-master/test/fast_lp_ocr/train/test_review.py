@@ -0,0 +1,48 @@
+"""
+Tests for review report module.
+"""
+
+import csv
+import pathlib
+
+import numpy as np
+import pytest
+
+from fast_plate_ocr.train.utilities.review import (
+    CROPS_DIR,
+    CSV_FILE,
+    HTML_FILE,
+    PredictionReviewReport,
+)
+
+
+def test_review_report(tmp_path: pathlib.Path) -> None:
+    image = np.zeros((8, 16, 1), dtype=np.uint8)
+    with PredictionReviewReport(tmp_path / "report", low_conf_thresh=0.5) as report:
+        report.add("a.png", image, "AB1", np.array([0.9, 0.2, 0.8]))
+        report.add("<b>.png", image, "CD2", np.array([0.9, 0.9, 0.9]))
+    assert report.num_rows == 2
+
+    with open(tmp_path / "report" / CSV_FILE, encoding="utf-8", newline="") as f_in:
+        rows = list(csv.DictReader(f_in))
+    assert [row["plate"] for row in rows] == ["AB1", "CD2"]
+    assert rows[0]["low_conf_positions"] == "1"
+    assert rows[1]["low_conf_positions"] == ""
+    assert rows[0]["mean_confidence"] == "0.6333"
+
+    page = (tmp_path / "report" / HTML_FILE).read_text(encoding="utf-8")
+    assert page.rstrip().endswith("</html>")
+    assert "base64" not in page
+    assert f'src="{CROPS_DIR}/000001.png"' in page
+    assert sorted(p.name for p in (tmp_path / "report" / CROPS_DIR).iterdir()) == [
+        "000000.png",
+        "000001.png",
+    ]
+    assert 'A<span class="low">B</span>1' in page
+    assert "&lt;b&gt;.png" in page
+
+
+def test_review_report_requires_context_manager(tmp_path: pathlib.Path) -> None:
+    report = PredictionReviewReport(tmp_path, low_conf_thresh=0.5)
+    with pytest.raises(RuntimeError, match="context manager"):
+        report.add("a.png", np.zeros((8, 16, 1), dtype=np.uint8), "AB1", np.ones(3))
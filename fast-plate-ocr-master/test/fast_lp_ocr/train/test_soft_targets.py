@@ -0,0 +1,120 @@
+"""
+Tests for the soft targets cache and dataset used for knowledge distillation.
+"""
+
+# ruff: noqa: E402
+# pylint: disable=wrong-import-position,wrong-import-order,ungrouped-imports
+# fmt: off
+from fast_plate_ocr.train.utilities.backend_utils import set_pytorch_backend
+
+set_pytorch_backend()
+# fmt: on
+
+import pathlib
+import shutil
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from fast_plate_ocr import ONNXPlateRecognizer
+from fast_plate_ocr.train.data.dataset import SoftTargetDataset
+from fast_plate_ocr.train.data.soft_targets import compile_soft_targets, load_soft_targets
+from fast_plate_ocr.train.model.config import PlateOCRConfig
+from test.assets import ASSETS_DIR
+
+
+@pytest.fixture(name="teacher")
+def teacher_fixture(
+    tmp_path: pathlib.Path,
+    tiny_ocr_config: PlateOCRConfig,
+    save_tiny_ocr_model: Callable[..., pathlib.Path],
+) -> ONNXPlateRecognizer:
+    """Recognizer of a tiny uint8 image -> per-slot softmax random linear model."""
+    model_path = tmp_path / "teacher.onnx"
+    num_pixels = tiny_ocr_config.img_height * tiny_ocr_config.img_width
+    config_path = save_tiny_ocr_model(
+        model_path, tiny_ocr_config, softmax=True, scale=1 / num_pixels
+    )
+    return ONNXPlateRecognizer(model_path=model_path, config_path=config_path, device="cpu")
+
+
+@pytest.fixture(name="image_paths")
+def image_paths_fixture(tmp_path: pathlib.Path) -> list[str]:
+    image_paths = []
+    for name in ("test_plate_1.png", "test_plate_2.png"):
+        shutil.copy(ASSETS_DIR / name, tmp_path / name)
+        image_paths.append(str(tmp_path / name))
+    return image_paths
+
+
+def test_run_probabilities(
+    teacher: ONNXPlateRecognizer, image_paths: list[str], tiny_ocr_config: PlateOCRConfig
+) -> None:
+    probs = teacher.run_probabilities(image_paths)
+    assert probs.shape == (2, tiny_ocr_config.max_plate_slots, tiny_ocr_config.vocabulary_size)
+    np.testing.assert_allclose(probs.sum(axis=-1), 1.0, rtol=1e-5)
+    plates = teacher.run(image_paths)
+    assert plates == [
+        "".join(tiny_ocr_config.alphabet[i] for i in row) for row in probs.argmax(axis=-1)
+    ]
+
+
+def test_compile_soft_targets(
+    teacher: ONNXPlateRecognizer,
+    image_paths: list[str],
+    tiny_ocr_config: PlateOCRConfig,
+    tmp_path: pathlib.Path,
+) -> None:
+    cache_dir = compile_soft_targets(
+        teacher, image_paths, tiny_ocr_config, tmp_path / "cache", batch_size=1, num_workers=1
+    )
+    images, soft_targets = load_soft_targets(cache_dir)
+    assert images.shape == (2, tiny_ocr_config.img_height, tiny_ocr_config.img_width, 1)
+    assert soft_targets.dtype == np.float16
+    np.testing.assert_allclose(
+        soft_targets, teacher.run_probabilities(list(images)), rtol=1e-3, atol=1e-3
+    )
+    # The teacher isn't run again for the same images
+    not_runnable_teacher = SimpleNamespace(model_name=teacher.model_name)
+    assert (
+        compile_soft_targets(
+            not_runnable_teacher,  # type: ignore[arg-type]
+            image_paths,
+            tiny_ocr_config,
+            tmp_path / "cache",
+        )
+        == cache_dir
+    )
+
+
+@pytest.mark.parametrize("temperature", [0.5, 1.0, 2.0])
+def test_soft_target_dataset(
+    teacher: ONNXPlateRecognizer,
+    image_paths: list[str],
+    tiny_ocr_config: PlateOCRConfig,
+    tmp_path: pathlib.Path,
+    temperature: float,
+) -> None:
+    cache_dir = compile_soft_targets(teacher, image_paths, tiny_ocr_config, tmp_path / "cache")
+    dataset = SoftTargetDataset(cache_dir, temperature=temperature)
+    _, soft_targets = load_soft_targets(cache_dir)
+    assert len(dataset) == 2
+    x, y = dataset[0]
+    assert x.shape == (tiny_ocr_config.img_height, tiny_ocr_config.img_width, 1)
+    assert y.shape == (tiny_ocr_config.max_plate_slots, tiny_ocr_config.vocabulary_size)
+    assert y.dtype == np.float32
+    np.testing.assert_allclose(y.sum(axis=-1), 1.0, rtol=1e-5)
+    # The temperature never changes the teacher's most likely characters
+    np.testing.assert_array_equal(y.argmax(axis=-1), soft_targets[0].argmax(axis=-1))
+    max_prob = soft_targets[0].astype(np.float32).max(axis=-1)
+    if temperature > 1:
+        assert np.all(y.max(axis=-1) <= max_prob + 1e-6)
+    elif temperature < 1:
+        assert np.all(y.max(axis=-1) >= max_prob - 1e-6)
+
+
+def test_soft_target_dataset_invalid_temperature(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError, match="Temperature must be positive"):
+        SoftTargetDataset(tmp_path, temperature=0)
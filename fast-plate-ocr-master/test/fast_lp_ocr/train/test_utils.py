@@ -2,9 +2,14 @@
 Test utils module.
 """
 
+import pathlib
+import shutil
+
+import numpy as np
 import pytest
 
 from fast_plate_ocr.train.utilities import utils
+from test.assets import ASSETS_DIR
 
 
 @pytest.mark.parametrize(
@@ -37,3 +42,42 @@ from fast_plate_ocr.train.utilities import utils
 def test_one_hot_plate(plate: str, alphabet: str, expected_result: list[list[int]]) -> None:
     actual_result = utils.one_hot_plate(plate, alphabet)
     assert actual_result == expected_result
+
+
+@pytest.mark.parametrize(
+    "num_images, batch_size, prefetch_batches, expected_sizes",
+    [
+        (5, 2, 2, [2, 2, 1]),
+        (4, 4, 0, [4]),
+        (3, 8, 1, [3]),
+        (0, 4, 2, []),
+    ],
+)
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_iter_image_batches(
+    tmp_path: pathlib.Path,
+    num_workers: int,
+    num_images: int,
+    batch_size: int,
+    prefetch_batches: int,
+    expected_sizes: list[int],
+) -> None:
+    for i in range(num_images):
+        shutil.copy(ASSETS_DIR / f"test_plate_{i % 2 + 1}.png", tmp_path / f"plate_{i}.png")
+    image_paths = utils.list_image_paths(tmp_path)
+    batches = list(
+        utils.iter_image_batches(
+            image_paths,
+            width=64,
+            height=32,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            prefetch_batches=prefetch_batches,
+        )
+    )
+    assert [len(paths) for paths, _ in batches] == expected_sizes
+    assert [path for paths, _ in batches for path in paths] == image_paths
+    expected_images = utils.load_images_from_folder(tmp_path, width=64, height=32)
+    for (_, images), start in zip(batches, range(0, num_images, batch_size), strict=True):
+        assert images.shape[1:] == (32, 64, 1)
+        np.testing.assert_array_equal(images, expected_images[start : start + batch_size])
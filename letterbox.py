@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Letterbox Preprocessing
+Aspect-preserving resize + pad for YOLO detectors that writes straight into a single
+preallocated input tensor (optionally the TFLite interpreter's own input buffer),
+with BGR->RGB conversion and normalization fused into one pass
+"""
+
+import cv2
+import numpy as np
+
+# Ultralytics pads letterboxed images with gray 114
+LETTERBOX_PAD_VALUE = 114
+
+
+class LetterboxPreprocessor:
+    """
+    Letterbox frames into a fixed (1, H, W, 3) or (1, 3, H, W) model input without per-frame allocations.
+
+    The returned (ratio, (pad_w, pad_h)) is what yolo_postprocess.scale_boxes needs to
+    map boxes back to the original frame exactly. Pixel values are written as
+    `pixel * scale + offset`, so float models get [0, 1] inputs and quantized models
+    get values already in their integer domain.
+    """
+
+    def __init__(self, input_height, input_width, dtype=np.float32, scale=1.0 / 255.0, offset=0.0,
+                 pad_value=LETTERBOX_PAD_VALUE, channels_first=False):
+        self.input_height = int(input_height)
+        self.input_width = int(input_width)
+        self.dtype = np.dtype(dtype)
+        self.scale = scale
+        self.offset = offset
+        self.pad_value = pad_value
+        # NHWC for TFLite, NCHW (channels_first) for ONNX / PyTorch exports
+        self.channels_first = channels_first
+        shape = (1, 3, self.input_height, self.input_width) if channels_first else (1, self.input_height, self.input_width, 3)
+        self.input_tensor = np.empty(shape, dtype=self.dtype)
+        self._tensor_fn = None
+
+        # Identity mapping (raw 0-255 into an integer tensor) needs no arithmetic at all
+        self._copy_only = np.issubdtype(self.dtype, np.integer) and scale == 1.0 and offset == 0.0
+        self._pad_fill = np.asarray(pad_value * scale + offset).astype(self.dtype)
+
+        # Per frame-size geometry and scratch buffers, rebuilt only when the frame size changes
+        self._frame_shape = None
+        self._geometry = None
+        self._resized = None
+        self._scratch = None
+
+    @classmethod
+    def for_input_details(cls, input_detail, pad_value=LETTERBOX_PAD_VALUE):
+        """Build a preprocessor matching a TFLite input tensor (shape, dtype, quantization)"""
+        _, height, width, _ = input_detail['shape']
+        dtype = input_detail['dtype']
+        quant_scale, zero_point = input_detail.get('quantization', (0.0, 0))
+        if np.issubdtype(dtype, np.integer) and quant_scale:
+            # Quantized input: real value = (q - zero_point) * quant_scale, real = pixel / 255
+            scale, offset = 1.0 / (255.0 * quant_scale), float(zero_point)
+        elif np.issubdtype(dtype, np.integer):
+            scale, offset = 1.0, 0.0
+        else:
+            scale, offset = 1.0 / 255.0, 0.0
+        return cls(height, width, dtype, scale, offset, pad_value)
+
+    def bind_interpreter(self, interpreter, input_index):
+        """
+        Write future frames directly into the interpreter's input buffer.
+
+        interpreter.tensor() returns a callable giving a view of the buffer. The view is
+        fetched per frame and not kept, since TFLite forbids holding it across invoke().
+        """
+        self._tensor_fn = interpreter.tensor(input_index)
+
+    def _update_geometry(self, frame_h, frame_w):
+        ratio = min(self.input_height / frame_h, self.input_width / frame_w)
+        new_w = max(int(round(frame_w * ratio)), 1)
+        new_h = max(int(round(frame_h * ratio)), 1)
+        pad_left = (self.input_width - new_w) // 2
+        pad_top = (self.input_height - new_h) // 2
+        self._geometry = (ratio, pad_left, pad_top, new_w, new_h)
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        scratch_shape = (3, new_h, new_w) if self.channels_first else (new_h, new_w, 3)
+        self._scratch = None if self._copy_only else np.empty(scratch_shape, dtype=np.float32)
+        self._frame_shape = (frame_h, frame_w)
+
+    def __call__(self, image):
+        """
+        Letterbox a BGR frame into the input tensor.
+
+        Returns:
+            (input_tensor, ratio_pad) where input_tensor is the array that was written
+            (None when bound to an interpreter, which then already holds the frame) and
+            ratio_pad is (ratio, (pad_w, pad_h)) for box inversion.
+        """
+        frame_h, frame_w = image.shape[:2]
+        if self._frame_shape != (frame_h, frame_w):
+            self._update_geometry(frame_h, frame_w)
+        ratio, pad_left, pad_top, new_w, new_h = self._geometry
+
+        if (new_w, new_h) == (frame_w, frame_h):
+            resized = image
+        else:
+            resized = cv2.resize(image, (new_w, new_h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+
+        target = self._tensor_fn()[0] if self._tensor_fn is not None else self.input_tensor[0]
+        rgb = resized[..., ::-1]  # BGR -> RGB as a view, consumed by the single write below
+        if self.channels_first:
+            # Work on a (H, W, C) view of the (C, H, W) tensor so slicing below is layout-agnostic
+            target = target.transpose(1, 2, 0)
+        region = target[pad_top:pad_top + new_h, pad_left:pad_left + new_w]
+
+        if self._copy_only:
+            np.copyto(region, rgb)
+        elif np.issubdtype(self.dtype, np.floating):
+            np.multiply(rgb, self.scale, out=region, casting='unsafe')
+            if self.offset:
+                region += self.offset
+        else:
+            scratch = self._scratch.transpose(1, 2, 0) if self.channels_first else self._scratch
+            np.multiply(rgb, self.scale, out=scratch)
+            scratch += self.offset
+            np.rint(scratch, out=scratch)
+            info = np.iinfo(self.dtype)
+            np.clip(scratch, info.min, info.max, out=scratch)
+            np.copyto(region, scratch, casting='unsafe')
+
+        # Pad strips (cheap, and safe even if something else touched the buffer)
+        target[:pad_top] = self._pad_fill
+        target[pad_top + new_h:] = self._pad_fill
+        target[pad_top:pad_top + new_h, :pad_left] = self._pad_fill
+        target[pad_top:pad_top + new_h, pad_left + new_w:] = self._pad_fill
+        del target, region
+
+        output = None if self._tensor_fn is not None else self.input_tensor
+        return output, (ratio, (pad_left, pad_top))
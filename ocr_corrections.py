@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+OCR Character Corrections
+Visual corrections for letters commonly misread for digits, applied to the OCR output of
+numeric plates by python_yolo.py and python_yolo_fast_plate.py
+"""
+
+OCR_CHAR_CORRECTIONS = str.maketrans({
+    'O': '0', 'I': '1', 'L': '1', 'S': '5', 'B': '8',
+    'Z': '2', 'G': '6', 'Q': '0', 'A': '4', 'E': '3'
+})
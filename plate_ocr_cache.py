@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Plate OCR Result Cache
+LRU/TTL cache of OCR reads keyed by the plate track and a perceptual hash of the OCR model
+input, so the near-identical crops of a parked or queued car are only read by the recognizer once
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+# Hash grid (rows, cols), plate shaped like the 70x140 OCR input so each cell covers ~4x4 pixels
+HASH_SHAPE = (16, 32)
+
+# Default Hamming tolerance out of the 512 hash bits: exact matches only. Sensor noise and JPEG
+# re-encoding flip 0-3 bits of the aHash, but replacing a single character can flip as few: 32 of
+# the 63 single digit variants of a plate land within 4 bits of it. A tolerance only absorbs the
+# noise between crops of the same track, never another vehicle's plate
+DEFAULT_MAX_DISTANCE = 0
+
+
+def average_hash(gray, hash_shape=HASH_SHAPE):
+    """aHash: one bit per grid cell, set when the cell is brighter than the crop mean"""
+    rows, cols = hash_shape
+    small = cv2.resize(gray, (cols, rows), interpolation=cv2.INTER_AREA)
+    bits = small > small.mean()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def difference_hash(gray, hash_shape=HASH_SHAPE):
+    """dHash: one bit per grid cell, set when the cell is brighter than its left neighbour"""
+    rows, cols = hash_shape
+    small = cv2.resize(gray, (cols + 1, rows), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+HASH_FUNCTIONS = {
+    'ahash': average_hash,
+    'dhash': difference_hash,
+}
+
+
+class OCRCacheStats(NamedTuple):
+    """Counters of a PlateOCRCache since it was created"""
+    hits: int
+    misses: int
+    expired: int      # Entries dropped because they were older than the TTL
+    evicted: int      # Entries dropped because the cache was full (least recently used)
+    size: int
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _CacheEntry:
+    """An OCR read held in a PlateOCRCache"""
+    __slots__ = ('value', 'created')
+
+    def __init__(self, value, created):
+        self.value = value
+        self.created = created
+
+
+class PlateOCRCache:
+    """
+    OCR reads keyed by (track id, perceptual hash of the crop), matched within a Hamming distance.
+
+    Reads are never shared between tracks, as the crops of two different plates can hash within
+    a few bits of each other. Lookups try the exact hash first and then scan the track's entries
+    for the nearest hash within `max_distance` bits (a few hundred Python int XORs, far cheaper
+    than a recognizer call). Entries expire `ttl` seconds after the read that created them, so a
+    wrong read is not repeated forever, and the least recently used entry is evicted once
+    `max_size` is reached. Thread-safe, as the background and synchronous OCR paths share one cache.
+    """
+
+    def __init__(self, max_size=512, ttl=60.0, max_distance=DEFAULT_MAX_DISTANCE, hash_kind='ahash',
+                 hash_shape=HASH_SHAPE, clock=time.monotonic):
+        if hash_kind not in HASH_FUNCTIONS:
+            raise ValueError(f"Unknown hash kind '{hash_kind}', expected one of {sorted(HASH_FUNCTIONS)}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.hash_shape = hash_shape
+        self._hash_function = HASH_FUNCTIONS[hash_kind]
+        self._clock = clock
+        self._entries = OrderedDict()  # (track id, hash) -> _CacheEntry, least recently used first
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evicted = 0
+
+    def hash(self, ocr_input):
+        """Perceptual hash of a grayscale OCR model input (i.e. the output of preprocess_image)"""
+        return self._hash_function(np.squeeze(ocr_input), self.hash_shape)
+
+    def get(self, track_id, key):
+        """Cached read of the nearest hash of the same track within max_distance, or None"""
+        key = (track_id, key)
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created > self.ttl:
+                self._drop_expired(key)
+                entry = None
+            if entry is None and self.max_distance > 0:
+                key, entry = self._nearest(key, now)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(self, track_id, key, value):
+        """Store the read of a hash of a track, evicting the least recently used entry when full"""
+        key = (track_id, key)
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return OCRCacheStats(self._hits, self._misses, self._expired, self._evicted, len(self._entries))
+
+    def _nearest(self, key, now):
+        """
+        ((track id, hash), entry) of the nearest non-expired hash of the same track within
+        max_distance, (None, None) if none
+        """
+        track_id, hash_value = key
+        best_key, best_entry, best_distance = None, None, self.max_distance + 1
+        expired = []
+        for other_key, entry in self._entries.items():
+            if now - entry.created > self.ttl:
+                expired.append(other_key)
+                continue
+            if other_key[0] != track_id:
+                continue
+            distance = (hash_value ^ other_key[1]).bit_count()
+            if distance < best_distance:
+                best_key, best_entry, best_distance = other_key, entry, distance
+        for other_key in expired:
+            self._drop_expired(other_key)
+        return best_key, best_entry
+
+    def _drop_expired(self, key):
+        del self._entries[key]
+        self._expired += 1
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Plate Watchlist Matcher
+Matches OCR'd license plates against a digits-only hotlist with exact and fuzzy
+(edit distance <= 1) lookups, and hot-reloads the hotlist file without a restart
+"""
+
+import argparse
+import os
+import re
+import threading
+import time
+from typing import NamedTuple, Optional
+
+NON_DIGIT_RE = re.compile(r'[^0-9]')
+
+# Digit pairs the OCR models commonly mix up (8/0/6 being the worst offenders).
+# A substitution between two of these is ranked ahead of any other single edit.
+OCR_CONFUSION_PAIRS = {
+    frozenset(pair) for pair in (
+        '80', '86', '06', '38', '98', '69', '56', '17', '71', '27', '49', '35',
+    )
+}
+
+# Ranking cost of each kind of fuzzy match (lower is better)
+MATCH_COSTS = {
+    'exact': 0.0,
+    'confusion': 0.5,
+    'substitution': 1.0,
+    'missing_digit': 1.0,
+    'extra_digit': 1.0,
+}
+
+
+class WatchlistMatch(NamedTuple):
+    """A watchlist hit for a single OCR read"""
+    plate: str        # Normalized (digits-only) watchlist entry that matched
+    query: str        # Normalized (digits-only) OCR read
+    kind: str         # One of MATCH_COSTS keys
+    cost: float       # Ranking cost, 0.0 for exact matches
+
+
+def normalize_plate(text: Optional[str]) -> str:
+    """Reduce a plate string to its digits, dropping dashes, spaces and padding"""
+    if not text:
+        return ''
+    return NON_DIGIT_RE.sub('', text)
+
+
+def _deletions(plate: str):
+    """All strings obtained by deleting exactly one digit from `plate`"""
+    return {plate[:i] + plate[i + 1:] for i in range(len(plate))}
+
+
+class _WatchlistIndex:
+    """
+    Immutable lookup structures for one version of the hotlist.
+
+    `plates` answers exact lookups in O(1). `deletions` is the precomputed
+    deletion neighbourhood (symmetric-delete index): every entry is stored under
+    each of its single-digit deletions, so any read within one edit of an entry
+    is found with at most 2 * len(read) + 2 hash lookups and no scan.
+    """
+
+    __slots__ = ('plates', 'deletions')
+
+    def __init__(self, plates):
+        self.plates = frozenset(plates)
+        deletions = {}
+        for plate in self.plates:
+            for variant in _deletions(plate):
+                current = deletions.get(variant)
+                # Most variants map to a single plate, so store a bare str and only
+                # promote to a tuple on collision to keep 1M-entry indexes compact
+                if current is None:
+                    deletions[variant] = plate
+                elif isinstance(current, str):
+                    deletions[variant] = (current, plate)
+                else:
+                    deletions[variant] = current + (plate,)
+        self.deletions = deletions
+
+    def neighbours(self, variant):
+        entry = self.deletions.get(variant)
+        if entry is None:
+            return ()
+        if isinstance(entry, str):
+            return (entry,)
+        return entry
+
+
+def _substitution_kind(query: str, plate: str) -> Optional[str]:
+    """Return the match kind if `query` and `plate` differ by exactly one substituted digit"""
+    diff = None
+    for i, (a, b) in enumerate(zip(query, plate)):
+        if a != b:
+            if diff is not None:
+                return None
+            diff = i
+    if diff is None:
+        return None
+    if frozenset((query[diff], plate[diff])) in OCR_CONFUSION_PAIRS:
+        return 'confusion'
+    return 'substitution'
+
+
+class PlateWatchlist:
+    """
+    Digits-only license plate hotlist with exact and edit-distance-1 matching.
+
+    Plates are normalized to digits on load and on lookup, mirroring the Kotlin
+    VehicleMatcher which compares numeric digits only. The index is rebuilt off to
+    the side and swapped in with a single attribute assignment, so lookups from
+    other threads never see a half-built hotlist.
+    """
+
+    def __init__(self, plates=None, path=None, fuzzy=True):
+        self.path = path
+        self.fuzzy = fuzzy
+        self._index = _WatchlistIndex(())
+        self._file_signature = None
+        self._reload_thread = None
+        self._stop_event = threading.Event()
+
+        if path is not None:
+            self.reload_if_changed()
+        elif plates is not None:
+            self.update(plates)
+
+    def __len__(self):
+        return len(self._index.plates)
+
+    def __contains__(self, text):
+        return normalize_plate(text) in self._index.plates
+
+    def update(self, plates):
+        """Replace the hotlist contents with `plates` (any formatting, normalized to digits)"""
+        normalized = (normalize_plate(p) for p in plates)
+        self._index = _WatchlistIndex(p for p in normalized if p)
+
+    @staticmethod
+    def read_plates_file(path):
+        """
+        Read plates from a text or CSV file: one plate per line, first CSV column used,
+        blank lines and lines starting with '#' ignored.
+        """
+        plates = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                plates.append(line.split(',', 1)[0])
+        return plates
+
+    def _current_file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self):
+        """Reload the hotlist file if its mtime or size changed. Returns True if reloaded."""
+        if self.path is None:
+            return False
+        try:
+            signature = self._current_file_signature()
+        except OSError as e:
+            print(f"Watchlist file not readable ({self.path}): {e}")
+            return False
+        if signature == self._file_signature:
+            return False
+
+        start_time = time.perf_counter()
+        self.update(self.read_plates_file(self.path))
+        self._file_signature = signature
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        print(f"Watchlist loaded: {len(self)} plates from {self.path} in {elapsed_ms:.0f}ms")
+        return True
+
+    def start_auto_reload(self, interval=2.0):
+        """Poll the hotlist file in a daemon thread and hot-swap the index when it changes"""
+        if self.path is None or self._reload_thread is not None:
+            return
+
+        def _poll():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    print(f"Watchlist reload error: {e}")
+
+        self._reload_thread = threading.Thread(target=_poll, daemon=True)
+        self._reload_thread.start()
+
+    def stop(self):
+        """Stop the auto-reload thread, if running"""
+        self._stop_event.set()
+        if self._reload_thread is not None:
+            self._reload_thread.join(timeout=1.0)
+            self._reload_thread = None
+
+    def lookup(self, text):
+        """
+        Return every watchlist entry within one edit of `text`, best match first.
+
+        Exact matches short-circuit. Otherwise, with `query` the normalized read:
+          - query found in the deletion index -> the OCR dropped a digit
+          - a deletion of query is a plate      -> the OCR read an extra digit
+          - a deletion of query is in the index -> candidate substitution, verified
+        """
+        query = normalize_plate(text)
+        if not query:
+            return []
+
+        index = self._index  # Single read so a concurrent reload can't split the lookup
+        if query in index.plates:
+            return [WatchlistMatch(query, query, 'exact', MATCH_COSTS['exact'])]
+        if not self.fuzzy:
+            return []
+
+        found = {}
+        for plate in index.neighbours(query):
+            found[plate] = 'missing_digit'
+        for variant in _deletions(query):
+            if variant in index.plates:
+                found.setdefault(variant, 'extra_digit')
+            for plate in index.neighbours(variant):
+                if plate in found or len(plate) != len(query):
+                    continue
+                kind = _substitution_kind(query, plate)
+                if kind is not None:
+                    found[plate] = kind
+
+        matches = [WatchlistMatch(plate, query, kind, MATCH_COSTS[kind]) for plate, kind in found.items()]
+        matches.sort(key=lambda m: (m.cost, m.plate))
+        return matches
+
+    def match(self, text):
+        """Return the best WatchlistMatch for `text`, or None"""
+        matches = self.lookup(text)
+        return matches[0] if matches else None
+
+
+def _benchmark(num_plates, num_queries):
+    """Build a synthetic hotlist and report build time and per-lookup latency"""
+    import random
+
+    rng = random.Random(0)
+    plates = [str(rng.randrange(10**6, 10**8)) for _ in range(num_plates)]
+    start_time = time.perf_counter()
+    watchlist = PlateWatchlist(plates)
+    build_time = time.perf_counter() - start_time
+    print(f"Built index for {len(watchlist)} plates in {build_time:.1f}s")
+
+    queries = []
+    for _ in range(num_queries):
+        plate = list(rng.choice(plates))
+        plate[rng.randrange(len(plate))] = str(rng.randrange(10))
+        queries.append(''.join(plate))
+
+    start_time = time.perf_counter()
+    hits = sum(1 for q in queries if watchlist.match(q) is not None)
+    lookup_us = (time.perf_counter() - start_time) / num_queries * 1e6
+    print(f"{num_queries} fuzzy lookups: {lookup_us:.1f}us per lookup, {hits} hits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Match plates against a watchlist file')
+    parser.add_argument('plates', nargs='*', help='Plates to look up')
+    parser.add_argument('--watchlist', help='Watchlist file (one plate per line or CSV)')
+    parser.add_argument('--exact', action='store_true', help='Disable fuzzy matching')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                        help='Benchmark lookups against a synthetic N-plate hotlist')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark(args.benchmark, num_queries=100_000)
+        return
+
+    if not args.watchlist:
+        parser.error('--watchlist is required unless --benchmark is given')
+
+    watchlist = PlateWatchlist(path=args.watchlist, fuzzy=not args.exact)
+    for plate in args.plates:
+        match = watchlist.match(plate)
+        if match:
+            print(f"{plate}: MATCH {match.plate} ({match.kind})")
+        else:
+            print(f"{plate}: no match")
+
+
+if __name__ == '__main__':
+    main()
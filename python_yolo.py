@@ -13,6 +13,7 @@ from ultralytics import YOLO
 from transformers import TrOCRProcessor, VisionEncoderDecoderModel
 from PIL import Image
 import easyocr
+from ocr_corrections import OCR_CHAR_CORRECTIONS
 
 
 class SimpleOCRWorker:
@@ -229,11 +230,7 @@ class SimpleOCRWorker:
             raw_text_from_ocr = self.processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
             
             # Apply visual character corrections
-            char_map = {
-                'O': '0', 'I': '1', 'L': '1', 'S': '5', 'B': '8',
-                'Z': '2', 'G': '6', 'Q': '0', 'A': '4', 'E': '3'
-            }
-            corrected_raw_text = "".join([char_map.get(char.upper(), char.upper()) for char in raw_text_from_ocr])
+            corrected_raw_text = raw_text_from_ocr.upper().translate(OCR_CHAR_CORRECTIONS)
             
             numeric_text = re.sub(r'[^0-9]', '', corrected_raw_text)
             
@@ -259,11 +256,7 @@ class SimpleOCRWorker:
                 raw_text_from_ocr = "".join([res[1] for res in results])
                 
                 # Apply visual character corrections
-                char_map = {
-                    'O': '0', 'I': '1', 'L': '1', 'S': '5', 'B': '8',
-                    'Z': '2', 'G': '6', 'Q': '0', 'A': '4', 'E': '3'
-                }
-                corrected_raw_text = "".join([char_map.get(char.upper(), char.upper()) for char in raw_text_from_ocr])
+                corrected_raw_text = raw_text_from_ocr.upper().translate(OCR_CHAR_CORRECTIONS)
                 
                 numeric_text = re.sub(r'[^0-9]', '', corrected_raw_text)
                 
@@ -289,11 +282,7 @@ class SimpleOCRWorker:
 
             if self.ocr_engine_type == 'trocr':
                 raw_text_from_ocr = self.processor.batch_decode(self.model.generate(self.processor(images=Image.fromarray(preprocessed_for_sync_ocr), return_tensors="pt").pixel_values.to(self.model.device), max_length=16, num_beams=1, early_stopping=True, do_sample=False), skip_special_tokens=True)[0]
-                char_map = {
-                    'O': '0', 'I': '1', 'L': '1', 'S': '5', 'B': '8',
-                    'Z': '2', 'G': '6', 'Q': '0', 'A': '4', 'E': '3'
-                }
-                corrected_raw_text = "".join([char_map.get(char.upper(), char.upper()) for char in raw_text_from_ocr])
+                corrected_raw_text = raw_text_from_ocr.upper().translate(OCR_CHAR_CORRECTIONS)
                 numeric_text = re.sub(r'[^0-9]', '', corrected_raw_text)
                 text_result = self._validate_and_format_plate_by_rules(corrected_raw_text, numeric_text)
 
@@ -301,11 +290,7 @@ class SimpleOCRWorker:
                 results = self.easyocr_reader.readtext(preprocessed_for_sync_ocr, detail=1)
                 if results:
                     raw_text_from_ocr = "".join([res[1] for res in results])
-                    char_map = {
-                        'O': '0', 'I': '1', 'L': '1', 'S': '5', 'B': '8',
-                        'Z': '2', 'G': '6', 'Q': '0', 'A': '4', 'E': '3'
-                    }
-                    corrected_raw_text = "".join([char_map.get(char.upper(), char.upper()) for char in raw_text_from_ocr])
+                    corrected_raw_text = raw_text_from_ocr.upper().translate(OCR_CHAR_CORRECTIONS)
                     numeric_text = re.sub(r'[^0-9]', '', corrected_raw_text)
                     text_result = self._validate_and_format_plate_by_rules(corrected_raw_text, numeric_text)
             else:
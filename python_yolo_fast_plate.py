@@ -8,42 +8,69 @@ import queue
 import subprocess
 import json
 import numpy as np
-from ultralytics import YOLO
 from fast_plate_ocr import ONNXPlateRecognizer
-from PIL import Image
+from fast_plate_ocr.inference.cascade import CascadePlateRecognizer
+from fast_plate_ocr.inference.confusion import apply_confusion_correction, load_correction_matrix
+from fast_plate_ocr.inference.process import preprocess_image
+from plate_watchlist import PlateWatchlist
+from plate_quality import MIN_SHARPNESS, BestCropBuffer, PlateTracker, score_crop
+from plate_ocr_cache import DEFAULT_MAX_DISTANCE, PlateOCRCache
+from ocr_corrections import OCR_CHAR_CORRECTIONS
+from detector_backends import create_detector, resolve_backend
+from detection_cache import DEFAULT_CACHE_DIR, CachedDetector, open_cached_detector
+
+# NMS IoU threshold of Ultralytics predict(), kept so detections match the previous YOLO() calls
+DETECTOR_IOU_THRESHOLD = 0.7
+DETECTOR_CONF_THRESHOLD = 0.25
+
+VEHICLE_MODEL_PATH = 'yolov8n.pt'
+
+FAST_PLATE_MODELS = ['global-plates-mobile-vit-v2-model', 'european-plates-mobile-vit-v2-model',
+                     'argentinian-plates-cnn-model', 'argentinian-plates-cnn-synth-model']
 
 
 class NumericOnlyONNXPlateRecognizer(ONNXPlateRecognizer):
     """
     Custom FastPlateOCR that forces numeric-only output by constraining the model's character decoding
     """
-    
-    def _postprocess_output_numeric_only(self, model_output, max_plate_slots, model_alphabet):
+
+    def __init__(self, *args, confusion_matrix_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        alphabet = self.config["alphabet"]
+        # Additive mask: 0 for digits, -inf for everything else (built once, not per read)
+        self._numeric_mask = np.where(
+            np.array([char.isdigit() for char in alphabet]), 0.0, -np.inf
+        ).astype(np.float32)
+        self._alphabet_array = np.array(list(alphabet))
+        # Optional P(true|pred) matrix learned with `fast_plate_ocr valid --confusion-matrix`
+        self.correction = None
+        if confusion_matrix_path:
+            self.correction = load_correction_matrix(confusion_matrix_path, vocabulary_size=len(alphabet))
+            print(f"Loaded OCR confusion correction from {confusion_matrix_path}")
+
+    def _postprocess_output_numeric_only(self, model_output, max_plate_slots, model_alphabet, return_confidence=False):
         """
         Custom post-processing that only considers numeric characters (0-9) from the model alphabet
         """
-        predictions = model_output.reshape((-1, max_plate_slots, len(model_alphabet)))
-        
-        # Create a mask for numeric characters only (0-9)
-        numeric_mask = np.array([char.isdigit() for char in model_alphabet])
-        numeric_indices = np.where(numeric_mask)[0]
-        
-        # Only consider predictions for numeric characters
-        # Set all non-numeric character probabilities to very low values
-        masked_predictions = predictions.copy()
-        for i, char in enumerate(model_alphabet):
-            if not char.isdigit():
-                masked_predictions[:, :, i] = -np.inf
-        
+        if self.correction is not None:
+            # Re-weight per-slot probabilities by how often each prediction was really each char
+            predictions = apply_confusion_correction(model_output, self.correction, max_plate_slots)
+        else:
+            predictions = model_output.reshape((-1, max_plate_slots, len(model_alphabet)))
+
+        # Non-numeric characters can never win the argmax
+        masked_predictions = predictions + self._numeric_mask
+
         # Get the indices of the highest probability characters (now only numeric)
         prediction_indices = np.argmax(masked_predictions, axis=-1)
-        
+
         # Convert indices to characters using the original alphabet
-        alphabet_array = np.array(list(model_alphabet))
-        plate_chars = alphabet_array[prediction_indices]
-        
+        plate_chars = self._alphabet_array[prediction_indices]
+
         # Join characters and return as list
-        plates = np.apply_along_axis("".join, 1, plate_chars).tolist()
+        plates = ["".join(chars) for chars in plate_chars]
+        if return_confidence:
+            return plates, np.take_along_axis(predictions, prediction_indices[..., None], axis=-1)[..., 0]
         return plates
     
     def run(self, source, return_confidence=False):
@@ -51,37 +78,70 @@ class NumericOnlyONNXPlateRecognizer(ONNXPlateRecognizer):
         Override the run method to use our custom numeric-only post-processing
         """
         # Use parent's preprocessing and model inference
-        from fast_plate_ocr.inference.onnx_inference import _load_image_from_source
+        from fast_plate_ocr.inference.onnx_inference import load_image_from_source
         from fast_plate_ocr.inference.process import preprocess_image
         
-        x = _load_image_from_source(source)
+        x = load_image_from_source(source)
         # Preprocess
         x = preprocess_image(x, self.config["img_height"], self.config["img_width"])
-        # Run model
-        y = self.model.run(None, {"input": x})
+        # Run model (on its static-batch variants when exported with a manifest)
+        y = self._run_model(x)
         
         # Use our custom numeric-only post-processing
-        plates = self._postprocess_output_numeric_only(
-            y[0],
+        return self._postprocess_output_numeric_only(
+            y,
             self.config["max_plate_slots"],
-            self.config["alphabet"]
+            self.config["alphabet"],
+            return_confidence=return_confidence,
         )
-        
-        if return_confidence:
-            # For confidence, we'd need to modify this too, but for simplicity, return empty array
-            confidence = np.array([])
-            return plates, confidence
-        
-        return plates
+
+
+class TrOCRPlateRecognizer:
+    """
+    TrOCR (as used by python_yolo.py) with the `run(images) -> list[str]` interface of the OCR cascade fallback
+    """
+
+    def __init__(self, model_name='microsoft/trocr-small-printed'):
+        # Only imported when TrOCR is the cascade fallback, it pulls in torch and transformers
+        import torch
+        from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+
+        self._torch = torch
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.processor = TrOCRProcessor.from_pretrained(model_name, use_fast=False)
+        self.model = VisionEncoderDecoderModel.from_pretrained(model_name).to(self.device)
+        self.model.eval()
+        if self.device.type == 'cuda':
+            self.model = self.model.half()
+
+    def run(self, source):
+        """Read a batch of grayscale plate crops in one generate() call"""
+        images_rgb = [cv2.cvtColor(image, cv2.COLOR_GRAY2RGB) for image in source]
+        pixel_values = self.processor(images=images_rgb, return_tensors="pt").pixel_values
+        pixel_values = pixel_values.to(self.device, self.model.dtype)
+        with self._torch.no_grad():
+            generated_ids = self.model.generate(pixel_values, max_length=16, num_beams=1, do_sample=False)
+        texts = self.processor.batch_decode(generated_ids, skip_special_tokens=True)
+        return [text.upper().translate(OCR_CHAR_CORRECTIONS) for text in texts]
 
 
 class FastPlateOCRWorker:
     """Fast Plate OCR worker for latest license plate"""
-    def __init__(self, model_name='global-plates-mobile-vit-v2-model'):
+    def __init__(self, model_name='global-plates-mobile-vit-v2-model', watchlist=None, confusion_matrix_path=None,
+                 cascade_model=None, cascade_threshold=0.9, ocr_cache=None):
         self.model_name = model_name
+        self.confusion_matrix_path = confusion_matrix_path
+        # Optional heavier model ('trocr' or a hub model) re-reading the plates model_name isn't confident about
+        self.cascade_model = cascade_model
+        self.cascade_threshold = cascade_threshold
         self.ocr_recognizer = None
+        self.ocr_input_size = None  # (height, width) of the first OCR model input
+        self.ocr_cache = ocr_cache  # Optional PlateOCRCache, reads of near-duplicate crops skip the model
         self.current_task = None
+        self.current_track_id = None
         self.latest_result = "No plate detected"
+        self.watchlist = watchlist  # Optional PlateWatchlist checked against every valid read
+        self.latest_match = None
         self.processing = False
         self.stop_event = threading.Event()
         self.debug_counter = 0  # Add debug counter
@@ -91,22 +151,84 @@ class FastPlateOCRWorker:
         """Initialize the fast_plate_ocr model"""
         try:
             print(f"Initializing Numeric-Only FastPlateOCR with model: {self.model_name}")
-            self.ocr_recognizer = NumericOnlyONNXPlateRecognizer(self.model_name)
+            self.ocr_recognizer = NumericOnlyONNXPlateRecognizer(
+                self.model_name, confusion_matrix_path=self.confusion_matrix_path)
+            self.ocr_input_size = (self.ocr_recognizer.config["img_height"], self.ocr_recognizer.config["img_width"])
+            if self.cascade_model:
+                print(f"Initializing cascade fallback model: {self.cascade_model}")
+                if self.cascade_model == 'trocr':
+                    fallback = TrOCRPlateRecognizer()
+                else:
+                    fallback = NumericOnlyONNXPlateRecognizer(self.cascade_model)
+                self.ocr_recognizer = CascadePlateRecognizer(
+                    self.ocr_recognizer, fallback, threshold=self.cascade_threshold)
+                print(f"OCR cascade: {self.model_name} -> {self.cascade_model} "
+                      f"below min slot confidence {self.cascade_threshold}")
             print("Numeric-Only FastPlateOCR initialized successfully!")
         except Exception as e:
             print(f"Error initializing FastPlateOCR: {e}")
             self.ocr_recognizer = None
         
-    def process_latest(self, license_plate_crop):
-        """Process the latest license plate (non-blocking)"""
+    def process_latest(self, license_plate_crop, track_id=None):
+        """Process the latest license plate (non-blocking), track_id scopes its OCR cache lookups"""
         if not self.processing and not self.stop_event.is_set() and self.ocr_recognizer is not None:
             self.current_task = license_plate_crop.copy()
+            self.current_track_id = track_id
             thread = threading.Thread(target=self._process_ocr, daemon=True)
             thread.start()
     
     def get_latest_result(self):
         """Get the latest OCR result"""
         return self.latest_result
+
+    def get_latest_match(self):
+        """Get the latest watchlist match (PlateWatchlist.WatchlistMatch) or None"""
+        return self.latest_match
+
+    def get_cascade_stats(self):
+        """(plates read, plates escalated to the fallback model) of the OCR cascade, None without one"""
+        if not isinstance(self.ocr_recognizer, CascadePlateRecognizer):
+            return None
+        return self.ocr_recognizer.num_plates, self.ocr_recognizer.num_escalated
+
+    def get_cache_stats(self):
+        """PlateOCRCache.stats() of the OCR result cache, None without one"""
+        if self.ocr_cache is None:
+            return None
+        return self.ocr_cache.stats()
+
+    def _run_ocr(self, plates_gray, track_ids=None):
+        """
+        Read a list of grayscale crops. With an OCR cache, crops whose model input hashes close to an
+        earlier read of the same plate track reuse it, and only the rest go to the recognizer (in a
+        single run, or none at all). Crops without a track id (None) are always read.
+        """
+        if self.ocr_cache is None or track_ids is None:
+            return self.ocr_recognizer.run(plates_gray)
+        # Hashed on the resized input the model sees, so crop size and scaling noise don't matter
+        ocr_inputs = preprocess_image(plates_gray, *self.ocr_input_size)
+        keys = [self.ocr_cache.hash(ocr_input) for ocr_input in ocr_inputs]
+        texts = [self.ocr_cache.get(track_id, key) if track_id is not None else None
+                 for track_id, key in zip(track_ids, keys)]
+        missing_idx = [idx for idx, text in enumerate(texts) if text is None]
+        if missing_idx:
+            missing_texts = self.ocr_recognizer.run([plates_gray[idx] for idx in missing_idx])
+            for idx, text in zip(missing_idx, missing_texts):
+                texts[idx] = text
+                if track_ids[idx] is not None:
+                    self.ocr_cache.put(track_ids[idx], keys[idx], text)
+        return texts
+
+    def _check_watchlist(self, raw_text):
+        """Look up a validated OCR read in the watchlist and record/report any hit"""
+        if self.watchlist is None:
+            return None
+        # 9-digit reads need no special casing: the extra digit is a single edit
+        match = self.watchlist.match(raw_text)
+        if match is not None:
+            self.latest_match = match
+            print(f"WATCHLIST HIT: read {match.query} -> {match.plate} ({match.kind})")
+        return match
         
     def _process_ocr(self):
         """Process OCR in background"""
@@ -124,7 +246,7 @@ class FastPlateOCRWorker:
             
             # fast_plate_ocr expects grayscale images only
             plate_gray = cv2.cvtColor(self.current_task, cv2.COLOR_BGR2GRAY)
-            result = self.ocr_recognizer.run(plate_gray)
+            result = self._run_ocr([plate_gray], [self.current_track_id])
             
             if debug_mode:
                 print(f"DEBUG: FastPlateOCR result: {result}, type: {type(result)}")
@@ -142,6 +264,7 @@ class FastPlateOCRWorker:
                     if formatted_text:
                         self.latest_result = formatted_text
                         print(f"FastPlateOCR Success (formatted): {self.latest_result}")
+                        self._check_watchlist(raw_text)
                     else:
                         # If formatting fails, show the raw numeric text for debugging
                         numeric_only = re.sub(r'[^0-9]', '', raw_text.replace('_', '').strip())
@@ -221,34 +344,42 @@ class FastPlateOCRWorker:
         # Fallback (shouldn't reach here due to validation)
         return numeric_text
 
-    def process_synchronous_ocr(self, license_plate_crop_bgr):
+    def process_synchronous_ocr(self, license_plate_crop_bgr, track_id=None):
         """Processes OCR synchronously for a given crop and returns the text."""
-        if license_plate_crop_bgr is None or license_plate_crop_bgr.size == 0 or self.ocr_recognizer is None:
-            return None
+        return self.process_synchronous_ocr_batch([license_plate_crop_bgr], [track_id])[0]
+
+    def process_synchronous_ocr_batch(self, license_plate_crops_bgr, track_ids=None):
+        """
+        Processes OCR synchronously for several crops in a single model run (so an OCR cascade
+        escalates all the uncertain ones together) and returns the text of each, None when not valid.
+        track_ids holds the plate track of each crop, scoping its OCR cache lookups.
+        """
+        texts = [None] * len(license_plate_crops_bgr)
+        valid_idx = [idx for idx, crop in enumerate(license_plate_crops_bgr) if crop is not None and crop.size > 0]
+        if not valid_idx or self.ocr_recognizer is None:
+            return texts
         try:
             # fast_plate_ocr expects grayscale images only
-            plate_gray = cv2.cvtColor(license_plate_crop_bgr, cv2.COLOR_BGR2GRAY)
-            result = self.ocr_recognizer.run(plate_gray)
-            
+            plates_gray = [cv2.cvtColor(license_plate_crops_bgr[idx], cv2.COLOR_BGR2GRAY) for idx in valid_idx]
+            result = self._run_ocr(plates_gray, [track_ids[idx] for idx in valid_idx] if track_ids else None)
+
             # fast_plate_ocr returns a list of strings, not an object with .text
-            if result and isinstance(result, list) and len(result) > 0:
-                # Take the first result (most confident)
-                raw_text = result[0] if result[0] else ""
-                if raw_text:
-                    # Apply validation and formatting (no character mapping needed)
-                    formatted_text = self._validate_and_format_plate(raw_text)
-                    if formatted_text:
-                        return formatted_text
-                    else:
-                        # For sync OCR, return None if validation fails (so it doesn't get annotated)
-                        print(f"Sync OCR validation failed for: {raw_text}")
-                        return None
-            
-            return None
-            
+            for idx, raw_text in zip(valid_idx, result):
+                if not raw_text:
+                    continue
+                # Apply validation and formatting (no character mapping needed)
+                formatted_text = self._validate_and_format_plate(raw_text)
+                if formatted_text:
+                    self._check_watchlist(raw_text)
+                    texts[idx] = formatted_text
+                else:
+                    # For sync OCR, return None if validation fails (so it doesn't get annotated)
+                    print(f"Sync OCR validation failed for: {raw_text}")
+            return texts
+
         except Exception as e:
             print(f"Synchronous FastPlateOCR error: {e}")
-            return None
+            return texts
 
     def _auto_correct_plate_perspective_and_enhance(self, plate_crop_bgr, correct_perspective=False, enhance=False, debug_save_path=None):
         """
@@ -453,7 +584,8 @@ class FastPlateOCRWorker:
 
 
 class DetectionWorker(threading.Thread):
-    def __init__(self, vehicle_detector, license_plate_detector, ocr_worker, input_queue, results_dict, stop_event, lock, show_vehicles, show_plates, output_lp_dir, ocr_interval):
+    def __init__(self, vehicle_detector, license_plate_detector, ocr_worker, input_queue, results_dict, stop_event, lock, show_vehicles, show_plates, output_lp_dir, ocr_interval,
+                 crop_buffer_size=3, min_crop_quality=0.35, min_crop_sharpness=MIN_SHARPNESS):
         super().__init__(daemon=True)
         self.vehicle_detector = vehicle_detector
         self.license_plate_detector = license_plate_detector
@@ -472,6 +604,31 @@ class DetectionWorker(threading.Thread):
         if self.ocr_processing_interval <= 0:
             print("Warning: OCR interval must be > 0. Defaulting to 1.")
             self.ocr_processing_interval = 1
+        # Crop quality gating: OCR only runs on the best K crops of each tracked plate
+        self.plate_tracker = PlateTracker()
+        self.crop_buffer = BestCropBuffer(k=crop_buffer_size, min_sharpness=min_crop_sharpness)
+        self.min_crop_quality = min_crop_quality
+
+    @staticmethod
+    def _expanded_crop(frame, box, scale=1.1):
+        """Crop a plate box expanded by `scale` around its center, clipped to the frame"""
+        x1_orig, y1_orig, x2_orig, y2_orig = box
+        cx = (x1_orig + x2_orig) / 2.0
+        cy = (y1_orig + y2_orig) / 2.0
+        new_w = (x2_orig - x1_orig) * scale
+        new_h = (y2_orig - y1_orig) * scale
+        new_x1 = int(max(cx - new_w / 2, 0))
+        new_x2 = int(min(cx + new_w / 2, frame.shape[1]))
+        new_y1 = int(max(cy - new_h / 2, 0))
+        new_y2 = int(min(cy + new_h / 2, frame.shape[0]))
+        return frame[new_y1:new_y2, new_x1:new_x2, :]
+
+    @staticmethod
+    def _detect(detector, frame, frame_idx):
+        """Run a detector, replaying the cached detections of frame_idx if it is a CachedDetector"""
+        if isinstance(detector, CachedDetector):
+            return detector.detect(frame, frame_idx)
+        return detector.detect(frame)
 
     def run(self):
         print("DetectionWorker started.")
@@ -481,27 +638,30 @@ class DetectionWorker(threading.Thread):
                 if frame_data is None:
                     break
                 
-                original_frame_for_ocr, _ = frame_data
+                original_frame_for_ocr, frame_idx = frame_data
                 self.frame_nmr_processed += 1
 
                 # Detect vehicles
                 detected_vehicles = []
                 if self.show_vehicles or self.show_plates:
-                    vehicle_detections_raw = self.vehicle_detector(original_frame_for_ocr, verbose=False)[0]
-                    for detection in vehicle_detections_raw.boxes.data.tolist():
-                        x1, y1, x2, y2, score, class_id = detection
-                        if int(class_id) in self.vehicle_classes and score > 0.5:
-                            detected_vehicles.append([x1, y1, x2, y2, score, class_id])
+                    vehicle_detections = self._detect(self.vehicle_detector, original_frame_for_ocr, frame_idx)
+                    keep = np.isin(vehicle_detections['class_id'], self.vehicle_classes) & (vehicle_detections['score'] > 0.5)
+                    vehicle_detections = vehicle_detections[keep]
+                    for (x1, y1, x2, y2), score, class_id in zip(vehicle_detections['bbox'].tolist(),
+                                                                 vehicle_detections['score'].tolist(),
+                                                                 vehicle_detections['class_id'].tolist()):
+                        detected_vehicles.append([x1, y1, x2, y2, score, class_id])
                 
                 # Detect license plates
                 detected_license_plates = []
-                best_license_plate_coords = None
+                new_best_crops = []  # (track_id, crop) for tracks whose best crop just improved
+                best_track_id = None
                 best_score = 0
                 
                 if self.show_plates:
-                    license_plates_raw = self.license_plate_detector(original_frame_for_ocr, verbose=False)[0]
-                    for lp_detection in license_plates_raw.boxes.data.tolist():
-                        x1_lp, y1_lp, x2_lp, y2_lp, score_lp, class_id_lp = lp_detection
+                    license_plates = self._detect(self.license_plate_detector, original_frame_for_ocr, frame_idx)
+                    for (x1_lp, y1_lp, x2_lp, y2_lp), score_lp in zip(license_plates['bbox'].tolist(),
+                                                                      license_plates['score'].tolist()):
                         associated_vehicle = None
                         for vehicle in detected_vehicles:
                             vx1, vy1, vx2, vy2, _, _ = vehicle
@@ -511,67 +671,75 @@ class DetectionWorker(threading.Thread):
                                 break
                         if associated_vehicle is not None:
                             detected_license_plates.append([x1_lp, y1_lp, x2_lp, y2_lp, score_lp])
-                            if score_lp > best_score:
-                                best_score = score_lp
-                                best_license_plate_coords = (x1_lp, y1_lp, x2_lp, y2_lp)
+
+                    # Score every plate crop and keep the best K per track
+                    track_ids = self.plate_tracker.update(
+                        [plate[:4] for plate in detected_license_plates], self.frame_nmr_processed)
+                    for plate, track_id in zip(detected_license_plates, track_ids):
+                        license_plate_crop_orig = self._expanded_crop(original_frame_for_ocr, plate[:4])
+                        quality = score_crop(license_plate_crop_orig)
+                        rank = self.crop_buffer.add(track_id, license_plate_crop_orig, quality,
+                                                    self.frame_nmr_processed, plate[4])
+                        if rank == 0 and quality.score >= self.min_crop_quality:
+                            new_best_crops.append((track_id, license_plate_crop_orig))
+                        # Plate used for the displayed OCR result: detector confidence weighted by crop quality
+                        if plate[4] * quality.score > best_score:
+                            best_score = plate[4] * quality.score
+                            best_track_id = track_id
+                    self.crop_buffer.expire(self.frame_nmr_processed)
                 
-                # Process and save LP if detected
-                if best_license_plate_coords is not None:
-                    x1_orig, y1_orig, x2_orig, y2_orig = best_license_plate_coords
-                    # Expand the crop by 30% in both width and height around the center
-                    cx = (x1_orig + x2_orig) / 2.0
-                    cy = (y1_orig + y2_orig) / 2.0
-                    w = (x2_orig - x1_orig)
-                    h = (y2_orig - y1_orig)
-                    new_w = w * 1.1
-                    new_h = h * 1.1
-                    new_x1 = int(max(cx - new_w / 2, 0))
-                    new_x2 = int(min(cx + new_w / 2, original_frame_for_ocr.shape[1]))
-                    new_y1 = int(max(cy - new_h / 2, 0))
-                    new_y2 = int(min(cy + new_h / 2, original_frame_for_ocr.shape[0]))
-                    license_plate_crop_orig = original_frame_for_ocr[new_y1:new_y2, new_x1:new_x2, :]
-                    if license_plate_crop_orig.size > 0:
-                        # Auto correct and save debug corners image
-                        debug_corners_dir = os.path.join('script_output', 'debug_corners')
-                        os.makedirs(debug_corners_dir, exist_ok=True)  # Ensure directory exists
-                        debug_corners_path = os.path.join(debug_corners_dir, f'lp_debug_{self.frame_nmr_processed}.png')
-                        print(f"DEBUG: Saving debug corners to {debug_corners_path}")
-                        
-                        # Apply perspective correction and enhancement
+                # Process and save LPs whose track just got a better crop than any seen before
+                new_best_crops = [(track_id, crop) for track_id, crop in new_best_crops if crop.size > 0]
+                corrected_crops = []
+                for track_id, license_plate_crop_orig in new_best_crops:
+                    # Auto correct and save debug corners image
+                    debug_corners_dir = os.path.join('script_output', 'debug_corners')
+                    os.makedirs(debug_corners_dir, exist_ok=True)  # Ensure directory exists
+                    debug_corners_path = os.path.join(debug_corners_dir, f'lp_debug_{self.frame_nmr_processed}_track{track_id}.png')
+                    print(f"DEBUG: Saving debug corners to {debug_corners_path}")
+
+                    # Apply perspective correction and enhancement
+                    corrected_crops.append(self.ocr_worker._auto_correct_plate_perspective_and_enhance(
+                        license_plate_crop_orig, correct_perspective=True, enhance=False, debug_save_path=debug_corners_path))
+
+                # Perform synchronous OCR on all the corrected images of this frame at once
+                annot_texts = self.ocr_worker.process_synchronous_ocr_batch(
+                    corrected_crops, [track_id for track_id, _ in new_best_crops])
+                for (track_id, license_plate_crop_orig), license_plate_corrected, annot_text in zip(
+                        new_best_crops, corrected_crops, annot_texts):
+                    print(f"DEBUG (DetectionWorker): FastPlateOCR for saving frame {self.frame_nmr_processed} track {track_id}. Text: '{annot_text}' (perspective-corrected: {license_plate_corrected.shape != license_plate_crop_orig.shape})")
+                    
+                    # Save the perspective-corrected image with OCR annotation
+                    annotated_lp_to_save = license_plate_corrected.copy()
+                    if annot_text:
+                        text_to_draw = annot_text
+                        font_scale = 0.6; font_thickness = 1; font = cv2.FONT_HERSHEY_SIMPLEX
+                        text_color = (0,0,255); bg_color = (255,255,255)
+                        (text_w, text_h), baseline = cv2.getTextSize(text_to_draw, font, font_scale, font_thickness)
+                        margin = 3
+                        text_x_lp = annotated_lp_to_save.shape[1] - text_w - margin
+                        text_y_lp = text_h + margin
+                        if text_x_lp < 0: text_x_lp = margin
+                        if text_y_lp > annotated_lp_to_save.shape[0] - margin : text_y_lp = annotated_lp_to_save.shape[0] - margin
+                        cv2.rectangle(annotated_lp_to_save, (text_x_lp - margin, text_y_lp - text_h - margin + baseline),
+                                      (text_x_lp + text_w + margin, text_y_lp + margin + baseline), bg_color, -1)
+                        cv2.putText(annotated_lp_to_save, text_to_draw, (text_x_lp, text_y_lp + baseline // 2),
+                                    font, font_scale, text_color, font_thickness, cv2.LINE_AA)
+                    try:
+                        lp_filename = os.path.join(self.output_lp_dir, f"lp_{self.saved_lp_count:04d}_frame{self.frame_nmr_processed}.png")
+                        cv2.imwrite(lp_filename, annotated_lp_to_save)
+                        print(f"DEBUG: Saved perspective-corrected LP to {lp_filename}")
+                        self.saved_lp_count += 1
+                    except Exception as e:
+                        print(f"Error saving annotated license plate image: {e}")
+
+                # Background OCR for the displayed result: best not-yet-OCR'd crop of the top plate's track
+                if best_track_id is not None and self.frame_nmr_processed % self.ocr_processing_interval == 0:
+                    buffered = self.crop_buffer.take_best_pending(best_track_id, self.min_crop_quality)
+                    if buffered is not None:
                         license_plate_corrected = self.ocr_worker._auto_correct_plate_perspective_and_enhance(
-                            license_plate_crop_orig, correct_perspective=True, enhance=False, debug_save_path=debug_corners_path)
-                        
-                        # Perform synchronous OCR on the corrected image
-                        annot_text = self.ocr_worker.process_synchronous_ocr(license_plate_corrected)
-                        print(f"DEBUG (DetectionWorker): FastPlateOCR for saving frame {self.frame_nmr_processed}. Text: '{annot_text}' (perspective-corrected: {license_plate_corrected.shape != license_plate_crop_orig.shape})")
-                        
-                        # Save the perspective-corrected image with OCR annotation
-                        annotated_lp_to_save = license_plate_corrected.copy()
-                        if annot_text:
-                            text_to_draw = annot_text
-                            font_scale = 0.6; font_thickness = 1; font = cv2.FONT_HERSHEY_SIMPLEX
-                            text_color = (0,0,255); bg_color = (255,255,255)
-                            (text_w, text_h), baseline = cv2.getTextSize(text_to_draw, font, font_scale, font_thickness)
-                            margin = 3
-                            text_x_lp = annotated_lp_to_save.shape[1] - text_w - margin
-                            text_y_lp = text_h + margin
-                            if text_x_lp < 0: text_x_lp = margin
-                            if text_y_lp > annotated_lp_to_save.shape[0] - margin : text_y_lp = annotated_lp_to_save.shape[0] - margin
-                            cv2.rectangle(annotated_lp_to_save, (text_x_lp - margin, text_y_lp - text_h - margin + baseline),
-                                          (text_x_lp + text_w + margin, text_y_lp + margin + baseline), bg_color, -1)
-                            cv2.putText(annotated_lp_to_save, text_to_draw, (text_x_lp, text_y_lp + baseline // 2),
-                                        font, font_scale, text_color, font_thickness, cv2.LINE_AA)
-                        try:
-                            lp_filename = os.path.join(self.output_lp_dir, f"lp_{self.saved_lp_count:04d}_frame{self.frame_nmr_processed}.png")
-                            cv2.imwrite(lp_filename, annotated_lp_to_save)
-                            print(f"DEBUG: Saved perspective-corrected LP to {lp_filename}")
-                            self.saved_lp_count += 1
-                        except Exception as e:
-                            print(f"Error saving annotated license plate image: {e}")
-                            
-                        # Use the corrected image for OCR processing as well
-                        if self.frame_nmr_processed % self.ocr_processing_interval == 0:
-                            self.ocr_worker.process_latest(license_plate_corrected.copy())
+                            buffered.crop, correct_perspective=True, enhance=False)
+                        self.ocr_worker.process_latest(license_plate_corrected, best_track_id)
 
                 with self.lock:
                     self.results_dict['vehicles'] = detected_vehicles if self.show_vehicles else []
@@ -623,22 +791,87 @@ def get_video_rotation(video_path):
         return 0
 
 
-def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plate_model='global-plates-mobile-vit-v2-model', manual_rotation=0, ocr_interval=5):
+def resolve_detector_model(model_path, detector_backend='auto'):
+    """
+    Map a detector model path to the file the chosen backend runs.
+
+    'onnx' swaps a .pt path for the .onnx made by export_detectors_onnx.py; 'auto' does the same
+    when that export exists, so torch/ultralytics are only imported if no ONNX model is available.
+    Raises ValueError when an explicit backend can't run the model file (i.e. ultralytics + .onnx).
+    """
+    base_path, extension = os.path.splitext(model_path)
+    onnx_path = base_path + '.onnx'
+    if extension == '.pt' and (detector_backend == 'onnx' or (detector_backend == 'auto' and os.path.isfile(onnx_path))):
+        return onnx_path
+    if detector_backend != 'auto' and resolve_backend(model_path) != detector_backend:
+        raise ValueError(f"--detector-backend {detector_backend} cannot run {model_path}, "
+                         f"{extension} models run on the {resolve_backend(model_path)} backend")
+    return model_path
+
+
+def get_peak_rss_mb():
+    """Peak resident memory of this process in MB (Linux reports ru_maxrss in KB)"""
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plate_model='global-plates-mobile-vit-v2-model', manual_rotation=0, ocr_interval=5,
+         watchlist_path=None, watchlist_reload_interval=2.0, confusion_matrix_path=None,
+         crop_buffer_size=3, min_crop_quality=0.35, min_crop_sharpness=MIN_SHARPNESS, detector_backend='auto', cascade_model=None, cascade_threshold=0.9,
+         ocr_cache_size=512, ocr_cache_ttl=60.0, ocr_cache_distance=DEFAULT_MAX_DISTANCE, ocr_cache_hash='ahash',
+         detection_cache=False, detection_cache_dir=DEFAULT_CACHE_DIR):
     # Load models
+    try:
+        model_path = resolve_detector_model(model_path, detector_backend)
+        vehicle_model_path = resolve_detector_model(VEHICLE_MODEL_PATH, detector_backend)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
     if not os.path.isfile(model_path):
         print(f"Error: License plate detector model not found at {model_path}")
+        if model_path.endswith('.onnx'):
+            print("Export the detectors first with: python export_detectors_onnx.py")
         return
     
     # Load vehicle detection model (COCO)
-    if not os.path.isfile('yolov8n.pt'):
+    if vehicle_model_path == VEHICLE_MODEL_PATH and not os.path.isfile(VEHICLE_MODEL_PATH):
         print("Downloading yolov8n.pt...")
         os.system('curl -L https://github.com/ultralytics/assets/releases/download/v0.0.0/yolov8n.pt -o yolov8n.pt')
+    if not os.path.isfile(vehicle_model_path):
+        print(f"Error: Vehicle detector model not found at {vehicle_model_path}")
+        print("Export the detectors first with: python export_detectors_onnx.py")
+        return
     
-    vehicle_detector = YOLO('yolov8n.pt')
-    license_plate_detector = YOLO(model_path)
+    # Detectors share one interface (detector_backends.Detector); with 'auto' the backend follows the
+    # file extension, so .onnx / .tflite models run without importing torch
+    vehicle_detector = create_detector(vehicle_model_path, backend=detector_backend,
+                                       conf_threshold=DETECTOR_CONF_THRESHOLD, iou_threshold=DETECTOR_IOU_THRESHOLD)
+    license_plate_detector = create_detector(model_path, backend=detector_backend,
+                                             conf_threshold=DETECTOR_CONF_THRESHOLD, iou_threshold=DETECTOR_IOU_THRESHOLD)
+    print(f"Detectors: {vehicle_detector.name} ({vehicle_model_path}), {license_plate_detector.name} ({model_path}); "
+          f"peak RSS {get_peak_rss_mb():.0f} MB")
     
+    # Load watchlist (hot-reloaded in the background when the file changes)
+    watchlist = None
+    if watchlist_path:
+        if not os.path.isfile(watchlist_path):
+            print(f"Error: Watchlist file not found at {watchlist_path}")
+            return
+        watchlist = PlateWatchlist(path=watchlist_path)
+        if watchlist_reload_interval > 0:
+            watchlist.start_auto_reload(watchlist_reload_interval)
+
+    # OCR result cache: near-duplicate crops (parked / queued cars) reuse the first read
+    ocr_cache = None
+    if ocr_cache_size > 0:
+        ocr_cache = PlateOCRCache(max_size=ocr_cache_size, ttl=ocr_cache_ttl, max_distance=ocr_cache_distance,
+                                  hash_kind=ocr_cache_hash)
+
     # Initialize FastPlateOCR worker
-    ocr_worker = FastPlateOCRWorker(model_name=fast_plate_model)
+    ocr_worker = FastPlateOCRWorker(model_name=fast_plate_model, watchlist=watchlist,
+                                    confusion_matrix_path=confusion_matrix_path,
+                                    cascade_model=cascade_model, cascade_threshold=cascade_threshold,
+                                    ocr_cache=ocr_cache)
 
     # Get video rotation
     detected_rotation_angle = get_video_rotation(video_path)
@@ -650,6 +883,15 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
     elif final_rotation_angle != 0:
         print(f"Applying rotation: {final_rotation_angle} degrees.")
 
+    # Detection cache: frames detected by an earlier run with the same video, models and thresholds
+    # are replayed, so experiments downstream of the detectors don't re-run them
+    if detection_cache:
+        vehicle_detector, license_plate_detector = (
+            open_cached_detector(detector, video_path, DETECTOR_CONF_THRESHOLD, DETECTOR_IOU_THRESHOLD,
+                                 rotation=final_rotation_angle, cache_dir=detection_cache_dir)
+            for detector in (vehicle_detector, license_plate_detector)
+        )
+
     # Create output directory for LPs
     output_dir_lps = "script_output/LPs_fastplate"
     os.makedirs(output_dir_lps, exist_ok=True)
@@ -666,7 +908,13 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
     if video_fps <= 0:
         video_fps = 30  # Default fallback FPS
     frame_delay = int(1000 / video_fps)  # Delay in milliseconds
-    print(f"Video FPS: {video_fps:.2f}, Frame delay: {frame_delay}ms")
+    if detection_cache:
+        # Replay mode: every frame is detected (or replayed from the cache) and the video runs as fast
+        # as the detection worker allows, so each run caches the same frames and replays take seconds
+        frame_delay = 1
+        print(f"Video FPS: {video_fps:.2f}, replay mode (no real-time pacing, no dropped frames)")
+    else:
+        print(f"Video FPS: {video_fps:.2f}, Frame delay: {frame_delay}ms")
         
     # Threading and Queues
     detection_input_queue = queue.Queue(maxsize=5)
@@ -686,7 +934,10 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
         show_vehicles,
         show_plates,
         output_dir_lps,
-        ocr_interval
+        ocr_interval,
+        crop_buffer_size,
+        min_crop_quality,
+        min_crop_sharpness
     )
     detection_worker.start()
 
@@ -695,7 +946,7 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
     
     try:
         while not stop_event.is_set():
-            key = cv2.waitKey(frame_delay)  # Use proper frame delay for real-time playback
+            key = cv2.waitKey(frame_delay)  # Use proper frame delay for real-time playback (1ms in replay mode)
             if key & 0xFF == ord('q'):
                 print("User requested quit.")
                 stop_event.set()
@@ -720,6 +971,15 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
             ret, frame = cap.read()
             if not ret:
                 print("End of video or error reading frame.")
+                if detection_cache:
+                    # Let the worker detect the frames still queued, so the cache covers the whole video
+                    while detection_worker.is_alive():
+                        try:
+                            detection_input_queue.put(None, timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    detection_worker.join()
                 stop_event.set()
                 break 
             
@@ -737,10 +997,19 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
             frame_for_detection = frame.copy()
             display_frame = frame.copy()
 
-            try:
-                detection_input_queue.put_nowait((frame_for_detection, None))
-            except queue.Full:
-                pass
+            if detection_cache:
+                # Replay mode: wait for the worker instead of dropping the frame
+                while not stop_event.is_set() and detection_worker.is_alive():
+                    try:
+                        detection_input_queue.put((frame_for_detection, frame_nmr_display), timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+            else:
+                try:
+                    detection_input_queue.put_nowait((frame_for_detection, frame_nmr_display))
+                except queue.Full:
+                    pass
 
             # Get latest detection results
             current_vehicles = []
@@ -778,6 +1047,20 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
                         (0, 255, 0), 2)  # Green border, thicker
             cv2.putText(display_frame, last_plate_text, (text_x, text_y), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)  # White text
+
+            # Display latest watchlist hit below the OCR result
+            latest_match = ocr_worker.get_latest_match()
+            if latest_match is not None:
+                match_text = f"WATCHLIST: {latest_match.plate} ({latest_match.kind})"
+                (match_width, match_height), _ = cv2.getTextSize(match_text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+                match_x = frame_width - match_width - 20 if frame_width > match_width + 20 else 10
+                match_y = text_y + baseline + match_height + 20
+                cv2.rectangle(display_frame,
+                            (match_x - 10, match_y - match_height - 10),
+                            (frame_width - 5, match_y + baseline + 5),
+                            (0, 0, 255), -1)  # Red background
+                cv2.putText(display_frame, match_text, (match_x, match_y),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
             
             # Display FPS information (moved to left side, below other indicators)
             fps_text = f"FPS: {video_fps:.1f}"
@@ -806,6 +1089,18 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
         
         # Signal OCR worker to stop
         ocr_worker.stop_event.set() 
+        cascade_stats = ocr_worker.get_cascade_stats()
+        if cascade_stats is not None and cascade_stats[0] > 0:
+            num_plates, num_escalated = cascade_stats
+            print(f"OCR cascade: {num_escalated}/{num_plates} plates ({num_escalated / num_plates:.1%}) "
+                  f"escalated to {cascade_model}")
+        cache_stats = ocr_worker.get_cache_stats()
+        if cache_stats is not None:
+            print(f"OCR cache: {cache_stats.hits}/{cache_stats.hits + cache_stats.misses} reads "
+                  f"({cache_stats.hit_rate:.1%}) served without the recognizer, "
+                  f"{cache_stats.expired} expired, {cache_stats.evicted} evicted")
+        if watchlist is not None:
+            watchlist.stop()
 
         # Clear the queue
         while not detection_input_queue.empty():
@@ -828,6 +1123,15 @@ def main(video_path, model_path, show_vehicles=True, show_plates=True, fast_plat
             if detection_worker.is_alive():
                 print("DetectionWorker did not finish in time.")
 
+        if detection_cache:
+            for detector in (vehicle_detector, license_plate_detector):
+                cache = detector.cache
+                lookups = cache.hits + cache.misses
+                replayed = f"{cache.hits}/{lookups} frames replayed" if lookups else "no frames"
+                saved = ", saved" if cache.save() else ""
+                print(f"Detection cache ({detector.name} {os.path.basename(detector.model_path)}): "
+                      f"{replayed}, {len(cache)} cached{saved} -> {cache.path}")
+
         if cap.isOpened():
             cap.release()
         cv2.destroyAllWindows()
@@ -839,18 +1143,62 @@ if __name__ == '__main__':
     parser.add_argument('video', help='Path to input video file (.mp4)')
     parser.add_argument('--model', default='./license_plate_detector.pt', 
                        help='Path to license plate detection model (default: ./license_plate_detector.pt)')
+    parser.add_argument('--detector-backend', default='auto', choices=['auto', 'onnx', 'ultralytics'],
+                        help='Detector runtime: auto uses the exported .onnx models when present, onnx requires them '
+                             '(see export_detectors_onnx.py), ultralytics runs the .pt models (default: auto)')
     parser.add_argument('--fast-plate-model', type=str, default='global-plates-mobile-vit-v2-model',
-                       choices=['global-plates-mobile-vit-v2-model', 'european-plates-mobile-vit-v2-model', 
-                               'argentinian-plates-cnn-model', 'argentinian-plates-cnn-synth-model'],
-                       help='FastPlateOCR model to use (default: global-plates-mobile-vit-v2-model)')
+                       choices=FAST_PLATE_MODELS,
+                       help='FastPlateOCR model to use, the first (cheap) stage with --cascade-model '
+                            '(default: global-plates-mobile-vit-v2-model)')
+    parser.add_argument('--cascade-model', type=str, default=None, choices=FAST_PLATE_MODELS + ['trocr'],
+                        help='Heavier OCR model re-reading the plates --fast-plate-model is not confident about, '
+                             'e.g. --fast-plate-model argentinian-plates-cnn-model --cascade-model '
+                             'global-plates-mobile-vit-v2-model (default: no cascade)')
+    parser.add_argument('--cascade-threshold', type=float, default=0.9,
+                        help='Plates whose minimum per-slot confidence is below this are escalated to --cascade-model '
+                             '(default: 0.9). `fast_plate_ocr valid --cascade-max-error` calibrates it on the raw model '
+                             'probabilities, while here the confidences are taken after the numeric-only mask (and '
+                             '--confusion-matrix correction), so they differ: treat the calibrated value as a starting '
+                             'point and check the escalation rate printed at exit')
+    parser.add_argument('--ocr-cache-size', type=int, default=512,
+                        help='Max OCR reads cached by plate track and perceptual hash of the crop, so stationary '
+                             'vehicles are read once; 0 disables the cache (default: 512)')
+    parser.add_argument('--ocr-cache-ttl', type=float, default=60.0,
+                        help='Seconds after which a cached OCR read is dropped and the plate read again (default: 60)')
+    parser.add_argument('--ocr-cache-distance', type=int, default=DEFAULT_MAX_DISTANCE,
+                        help='Max Hamming distance (out of 512 hash bits) between crops of the same plate track '
+                             'sharing a cached read. Crops of different plates can be as close as 1-4 bits, so '
+                             'reads are never shared between tracks; a small distance (i.e. 4) absorbs sensor '
+                             f'noise within a track (default: {DEFAULT_MAX_DISTANCE}, exact matches only)')
+    parser.add_argument('--ocr-cache-hash', default='ahash', choices=['ahash', 'dhash'],
+                        help='Perceptual hash of the OCR cache (default: ahash)')
+    parser.add_argument('--detection-cache', action='store_true',
+                        help='Detect every frame (no real-time pacing or dropped frames), caching the vehicle and '
+                             'plate detections, and replay them on later runs with the same video, models, '
+                             'thresholds and rotation')
+    parser.add_argument('--detection-cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory of the detection cache files (default: {DEFAULT_CACHE_DIR})')
     parser.add_argument('--rotate', type=int, default=0, choices=[0, 90, 180, 270],
                         help='Manually rotate video: 0 (none), 90, 180, 270 degrees clockwise. Overrides auto-detection.')
     parser.add_argument('--ocr-interval', type=int, default=5,
                         help='Process OCR every Nth frame processed by the detection worker (default: 5)')
+    parser.add_argument('--crop-buffer-size', type=int, default=3,
+                        help='Number of best-quality crops kept per tracked plate for OCR (default: 3)')
+    parser.add_argument('--min-crop-quality', type=float, default=0.35,
+                        help='Minimum crop quality score in [0, 1] (sharpness, size, exposure, skew) to run OCR (default: 0.35)')
+    parser.add_argument('--min-crop-sharpness', type=float, default=MIN_SHARPNESS,
+                        help='Minimum crop sharpness in [0, 1], crops blurrier than this never run OCR whatever their '
+                             f'quality score (default: {MIN_SHARPNESS})')
     parser.add_argument('--show-vehicles-only', action='store_true',
                        help='Show only vehicle detection boxes (faster)')
     parser.add_argument('--show-plates-only', action='store_true', 
                        help='Show only license plate detection and OCR')
+    parser.add_argument('--watchlist', type=str, default=None,
+                        help='Watchlist file (one plate per line or CSV); reads are matched exactly and within one digit edit')
+    parser.add_argument('--watchlist-reload-interval', type=float, default=2.0,
+                        help='Seconds between watchlist file change checks, 0 disables hot-reload (default: 2.0)')
+    parser.add_argument('--confusion-matrix', type=str, default=None,
+                        help='Confusion matrix (.npy) from `fast_plate_ocr valid --confusion-matrix` used to correct OCR probabilities')
     args = parser.parse_args()
     
     # Determine what to show based on arguments
@@ -861,4 +1209,9 @@ if __name__ == '__main__':
     else:
         show_vehicles, show_plates = True, True  # Show both by default
     
-    main(args.video, args.model, show_vehicles, show_plates, args.fast_plate_model, args.rotate, args.ocr_interval) 
\ No newline at end of file
+    main(args.video, args.model, show_vehicles, show_plates, args.fast_plate_model, args.rotate, args.ocr_interval,
+         args.watchlist, args.watchlist_reload_interval, args.confusion_matrix,
+         args.crop_buffer_size, args.min_crop_quality, args.min_crop_sharpness, args.detector_backend,
+         args.cascade_model, args.cascade_threshold,
+         args.ocr_cache_size, args.ocr_cache_ttl, args.ocr_cache_distance, args.ocr_cache_hash,
+         args.detection_cache, args.detection_cache_dir)
\ No newline at end of file
@@ -17,6 +17,10 @@ import logging
 from typing import List, Tuple, Optional
 import json
 
+from letterbox import LetterboxPreprocessor
+from tflite_pool import TFLiteInterpreterPool, create_interpreter
+from yolo_postprocess import decode_nms_output, decode_yolo_output, detections_to_list, empty_detections
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -117,8 +121,10 @@ class TFLiteModelConverter:
 class TFLiteModelTester:
     """Test TensorFlow Lite license plate detection model"""
     
-    def __init__(self, tflite_model_path: str):
+    def __init__(self, tflite_model_path: str, num_threads: Optional[int] = None, use_xnnpack: bool = True):
         self.tflite_model_path = tflite_model_path
+        self.num_threads = num_threads
+        self.use_xnnpack = use_xnnpack
         self.interpreter = None
         self.input_details = None
         self.output_details = None
@@ -128,8 +134,7 @@ class TFLiteModelTester:
     def _load_model(self):
         """Load the TensorFlow Lite model"""
         try:
-            self.interpreter = tf.lite.Interpreter(model_path=self.tflite_model_path)
-            self.interpreter.allocate_tensors()
+            self.interpreter = create_interpreter(self.tflite_model_path, self.num_threads, self.use_xnnpack)
             
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
@@ -139,6 +144,10 @@ class TFLiteModelTester:
             if len(input_shape) == 4:  # [batch, height, width, channels]
                 self.input_size = input_shape[1]
             
+            # Letterbox + RGB + normalization written in place into the input tensor
+            self.letterbox = LetterboxPreprocessor.for_input_details(self.input_details[0])
+            self.letterbox.bind_interpreter(self.interpreter, self.input_details[0]['index'])
+            
             logger.info(f"TFLite model loaded successfully")
             logger.info(f"Input shape: {input_shape}")
             logger.info(f"Output shapes: {[output['shape'] for output in self.output_details]}")
@@ -147,73 +156,39 @@ class TFLiteModelTester:
             logger.error(f"Failed to load TFLite model: {e}")
             raise
     
-    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Preprocess image for model input"""
-        # Resize image to model input size
-        resized = cv2.resize(image, (self.input_size, self.input_size))
-        
-        # Normalize to [0, 1]
-        normalized = resized.astype(np.float32) / 255.0
-        
-        # Add batch dimension
-        batch_input = np.expand_dims(normalized, axis=0)
-        
-        return batch_input
+    def preprocess_image(self, image: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+        """Letterbox image into the interpreter's input tensor, returns (ratio, (pad_w, pad_h))"""
+        _, ratio_pad = self.letterbox(image)
+        return ratio_pad
     
     def postprocess_output(self, output: np.ndarray, original_shape: Tuple[int, int], 
-                          conf_threshold: float = 0.5) -> List[dict]:
+                          conf_threshold: float = 0.5, ratio_pad=None) -> np.ndarray:
         """
         Postprocess model output to get bounding boxes
         
         Args:
-            output: Model output
+            output: Model output, either the raw YOLO head (1, 4+classes, anchors) or
+                end-to-end NMS rows (1, N, 6) of x1, y1, x2, y2, conf, class_id
             original_shape: Original image shape (height, width)
             conf_threshold: Confidence threshold for detections
+            ratio_pad: (ratio, (pad_w, pad_h)) from letterbox preprocessing
             
         Returns:
-            List of detections with format: [{'bbox': [x1, y1, x2, y2], 'confidence': float}]
+            Structured array of detections (see yolo_postprocess.DETECTION_DTYPE)
         """
-        detections = []
-        
+        input_shape = (self.input_size, self.input_size)
         try:
-            # Handle different output formats
-            if len(output.shape) == 3:  # [batch, num_detections, 6]
-                output = output[0]  # Remove batch dimension
-            
-            orig_h, orig_w = original_shape
-            scale_x = orig_w / self.input_size
-            scale_y = orig_h / self.input_size
-            
-            for detection in output:
-                if len(detection) >= 6:
-                    x1, y1, x2, y2, conf, class_id = detection[:6]
-                    
-                    if conf > conf_threshold:
-                        # Scale back to original image coordinates
-                        x1 = max(0, min(orig_w, x1 * scale_x))
-                        y1 = max(0, min(orig_h, y1 * scale_y))
-                        x2 = max(0, min(orig_w, x2 * scale_x))
-                        y2 = max(0, min(orig_h, y2 * scale_y))
-                        
-                        detections.append({
-                            'bbox': [x1, y1, x2, y2],
-                            'confidence': float(conf),
-                            'class_id': int(class_id) if len(detection) > 5 else 0
-                        })
-        
+            if output.shape[-1] == 6 and output.shape[-2] != 6:
+                # NMS already applied in the graph, boxes in input pixels
+                return decode_nms_output(output, original_shape, conf_threshold,
+                                         input_shape=input_shape, ratio_pad=ratio_pad)
+            return decode_yolo_output(output, original_shape, conf_threshold,
+                                      input_shape=input_shape, ratio_pad=ratio_pad)
         except Exception as e:
             logger.warning(f"Error in postprocessing: {e}")
-            # Generate a dummy detection for testing
-            orig_h, orig_w = original_shape
-            detections.append({
-                'bbox': [orig_w * 0.2, orig_h * 0.6, orig_w * 0.8, orig_h * 0.9],
-                'confidence': 0.85,
-                'class_id': 0
-            })
-        
-        return detections
+            return empty_detections()
     
-    def detect(self, image: np.ndarray, conf_threshold: float = 0.5) -> Tuple[List[dict], float]:
+    def detect(self, image: np.ndarray, conf_threshold: float = 0.5) -> Tuple[np.ndarray, float]:
         """
         Run detection on an image
         
@@ -226,25 +201,24 @@ class TFLiteModelTester:
         """
         start_time = time.time()
         
-        # Preprocess
-        input_data = self.preprocess_image(image)
+        # Preprocess (fills the interpreter input in place)
+        ratio_pad = self.preprocess_image(image)
         
         # Run inference
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
         self.interpreter.invoke()
         
         # Get output
         output = self.interpreter.get_tensor(self.output_details[0]['index'])
         
         # Postprocess
-        detections = self.postprocess_output(output, image.shape[:2], conf_threshold)
+        detections = self.postprocess_output(output, image.shape[:2], conf_threshold, ratio_pad)
         
         inference_time = (time.time() - start_time) * 1000  # Convert to ms
         
         return detections, inference_time
     
-    def benchmark(self, num_runs: int = 100) -> dict:
-        """Benchmark the model performance"""
+    def benchmark(self, num_runs: int = 100, num_workers: int = 1) -> dict:
+        """Benchmark the model performance (latency, plus pooled throughput if num_workers > 1)"""
         logger.info(f"Running benchmark with {num_runs} iterations...")
         
         # Create a dummy image for benchmarking
@@ -274,6 +248,18 @@ class TFLiteModelTester:
         logger.info(f"  FPS: {stats['fps']:.1f}")
         logger.info(f"  Min/Max time: {stats['min_time_ms']:.2f}/{stats['max_time_ms']:.2f} ms")
         
+        if num_workers > 1:
+            # Throughput with several interpreters invoking concurrently
+            with TFLiteInterpreterPool(self.tflite_model_path, num_workers, self.num_threads,
+                                       self.use_xnnpack) as pool:
+                frames = [dummy_image] * num_runs
+                pool.detect_batch(frames[:num_workers])  # Warm up every interpreter
+                start_time = time.time()
+                pool.detect_batch(frames)
+                stats['pool_workers'] = num_workers
+                stats['pool_fps'] = num_runs / (time.time() - start_time)
+            logger.info(f"  Pooled FPS ({num_workers} interpreters): {stats['pool_fps']:.1f}")
+        
         return stats
 
 
@@ -314,16 +300,13 @@ def create_test_images() -> List[str]:
     return test_images
 
 
-def visualize_detections(image: np.ndarray, detections: List[dict], 
+def visualize_detections(image: np.ndarray, detections: np.ndarray, 
                         save_path: Optional[str] = None) -> np.ndarray:
     """Visualize detections on image"""
     vis_image = image.copy()
     
-    for detection in detections:
-        bbox = detection['bbox']
-        confidence = detection['confidence']
-        
-        x1, y1, x2, y2 = map(int, bbox)
+    for bbox, confidence in zip(detections['bbox'].astype(int).tolist(), detections['score'].tolist()):
+        x1, y1, x2, y2 = bbox
         
         # Draw bounding box
         cv2.rectangle(vis_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
@@ -401,6 +384,10 @@ def main():
     parser.add_argument('--input-size', type=int, default=640, help='Model input size')
     parser.add_argument('--conf-threshold', type=float, default=0.5, help='Confidence threshold')
     parser.add_argument('--tflite-model', type=str, help='Path to existing TFLite model (skip conversion)')
+    parser.add_argument('--threads', type=int, default=None, help='Threads per TFLite interpreter')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Interpreters used concurrently for the throughput benchmark')
+    parser.add_argument('--no-xnnpack', action='store_true', help='Disable the XNNPACK delegate')
     
     args = parser.parse_args()
     
@@ -421,7 +408,7 @@ def main():
     
     # Step 2: Initialize tester
     try:
-        tester = TFLiteModelTester(tflite_model_path)
+        tester = TFLiteModelTester(tflite_model_path, args.threads, not args.no_xnnpack)
     except Exception as e:
         logger.error(f"Failed to initialize tester: {e}")
         return
@@ -441,7 +428,7 @@ def main():
                     'image': image_path,
                     'detections': len(detections),
                     'inference_time_ms': inference_time,
-                    'detection_details': detections
+                    'detection_details': detections_to_list(detections)
                 }
                 results.append(result)
                 
@@ -459,7 +446,7 @@ def main():
         test_video_frames(tester, args.test_video)
     
     if args.benchmark:
-        stats = tester.benchmark()
+        stats = tester.benchmark(num_workers=args.workers)
         
         # Save benchmark results
         with open('benchmark_results.json', 'w') as f:
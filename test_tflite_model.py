@@ -6,23 +6,26 @@ Tests the converted YOLO TFLite model on video files with real-time visualizatio
 
 import cv2
 import numpy as np
-import tensorflow as tf
 import time
 import argparse
 from pathlib import Path
 import sys
+from collections import deque
+
+from letterbox import LetterboxPreprocessor
+from tflite_pool import TFLiteInterpreterPool, create_interpreter
+from yolo_postprocess import decode_yolo_output
 
 class TFLiteDetector:
     """TensorFlow Lite YOLO detector wrapper"""
     
-    def __init__(self, model_path, confidence_threshold=0.25, nms_threshold=0.45):
+    def __init__(self, model_path, confidence_threshold=0.25, nms_threshold=0.45, num_threads=None, use_xnnpack=True):
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.nms_threshold = nms_threshold
         
         # Load TFLite model
-        self.interpreter = tf.lite.Interpreter(model_path=model_path)
-        self.interpreter.allocate_tensors()
+        self.interpreter = create_interpreter(model_path, num_threads, use_xnnpack)
         
         # Get input and output details
         self.input_details = self.interpreter.get_input_details()
@@ -33,6 +36,10 @@ class TFLiteDetector:
         self.input_height = self.input_shape[1]
         self.input_width = self.input_shape[2]
         
+        # Preprocessing writes directly into the interpreter's input tensor
+        self.letterbox = LetterboxPreprocessor.for_input_details(self.input_details[0])
+        self.letterbox.bind_interpreter(self.interpreter, self.input_details[0]['index'])
+        
         print(f"✅ TFLite model loaded: {model_path}")
         print(f"   Input shape: {self.input_shape}")
         print(f"   Input type: {self.input_details[0]['dtype']}")
@@ -44,140 +51,47 @@ class TFLiteDetector:
         self.postprocessing_times = []
     
     def preprocess_image(self, image):
-        """Preprocess image for YOLO input"""
+        """Letterbox image straight into the interpreter's input buffer, returns (ratio, pad)"""
         start_time = time.time()
         
-        # Resize image to model input size
-        input_image = cv2.resize(image, (self.input_width, self.input_height))
-        
-        # Convert BGR to RGB
-        input_image = cv2.cvtColor(input_image, cv2.COLOR_BGR2RGB)
-        
-        # Normalize to [0, 1] or [0, 255] depending on model
-        if self.input_details[0]['dtype'] == np.uint8:
-            input_image = input_image.astype(np.uint8)
-        else:
-            input_image = input_image.astype(np.float32) / 255.0
-        
-        # Add batch dimension
-        input_image = np.expand_dims(input_image, axis=0)
+        # Aspect-preserving resize + pad, BGR->RGB and normalization in one pass with no
+        # per-frame allocations (the input tensor is written in place)
+        _, ratio_pad = self.letterbox(image)
         
         self.preprocessing_times.append(time.time() - start_time)
-        return input_image
+        return ratio_pad
     
-    def postprocess_outputs(self, outputs, original_image_shape):
-        """Postprocess YOLO outputs to get bounding boxes"""
+    def postprocess_outputs(self, outputs, original_image_shape, ratio_pad=None):
+        """Postprocess YOLO outputs to get bounding boxes (DETECTION_DTYPE array)"""
         start_time = time.time()
         
-        # Get output tensor
-        output = outputs[0]
-        
-        # Handle different output formats
-        if len(output.shape) == 3:
-            # Shape: (1, num_detections, 85) -> (num_detections, 85)
-            output = output[0]
-            
-        # CRITICAL FIX: The TFLite model has a transposed output format
-        # Standard YOLO output is (num_detections, 5+classes), e.g., (8400, 5)
-        # This TFLite model outputs (5+classes, num_detections), e.g., (5, 8400)
-        # We need to transpose it back to the standard format.
-        if output.shape[0] < output.shape[1]:
-            print("   ⚠️ Detected transposed output. Transposing to fix.")
-            output = output.T # Transpose from (5, 8400) to (8400, 5)
-
-        # Extract boxes, scores, and class predictions
-        # YOLO output format: [x_center, y_center, width, height, confidence, class_scores...]
-        if output.shape[1] >= 5:
-            boxes = output[:, :4]  # x, y, w, h
-            confidence = output[:, 4]  # objectness confidence
-            
-            # If there are class scores, use them; otherwise use confidence
-            if output.shape[1] > 5:
-                class_scores = output[:, 5:]
-                class_confidence = np.max(class_scores, axis=1)
-                final_confidence = confidence * class_confidence
-            else:
-                final_confidence = confidence
-        else:
-            # Fallback for unexpected output format
-            boxes = output[:, :4]
-            final_confidence = np.ones(len(boxes)) * 0.5
-        
-        # Filter by confidence threshold
-        valid_detections = final_confidence > self.confidence_threshold
-        boxes = boxes[valid_detections]
-        final_confidence = final_confidence[valid_detections]
-        
-        # Convert center coordinates to corner coordinates
-        detections = []
-        orig_h, orig_w = original_image_shape[:2]
-        
-        for i, (box, conf) in enumerate(zip(boxes, final_confidence)):
-            # YOLO format: center_x, center_y, width, height (normalized)
-            center_x, center_y, width, height = box
-            
-            # Convert to pixel coordinates
-            center_x *= orig_w
-            center_y *= orig_h
-            width *= orig_w
-            height *= orig_h
-            
-            # Convert to corner coordinates
-            x1 = int(center_x - width / 2)
-            y1 = int(center_y - height / 2)
-            x2 = int(center_x + width / 2)
-            y2 = int(center_y + height / 2)
-            
-            # Ensure coordinates are within image bounds
-            x1 = max(0, min(x1, orig_w))
-            y1 = max(0, min(y1, orig_h))
-            x2 = max(0, min(x2, orig_w))
-            y2 = max(0, min(y2, orig_h))
-            
-            detections.append({
-                'bbox': [x1, y1, x2, y2],
-                'confidence': float(conf),
-                'class': 'license_plate'
-            })
-        
-        # Apply Non-Maximum Suppression
-        if len(detections) > 1:
-            boxes_nms = np.array([det['bbox'] for det in detections])
-            scores_nms = np.array([det['confidence'] for det in detections])
-            
-            # Convert to [x, y, w, h] format for NMS
-            boxes_nms_format = boxes_nms.copy()
-            boxes_nms_format[:, 2] = boxes_nms[:, 2] - boxes_nms[:, 0]  # width
-            boxes_nms_format[:, 3] = boxes_nms[:, 3] - boxes_nms[:, 1]  # height
-            
-            indices = cv2.dnn.NMSBoxes(
-                boxes_nms_format.tolist(),
-                scores_nms.tolist(),
-                self.confidence_threshold,
-                self.nms_threshold
-            )
-            
-            if len(indices) > 0:
-                indices = indices.flatten()
-                detections = [detections[i] for i in indices]
+        # Raw head output, (1, 4+classes, num_anchors) for TFLite exports; the decoder
+        # handles the transposed layout and normalized coordinates itself
+        detections = decode_yolo_output(
+            outputs[0],
+            original_image_shape,
+            conf_threshold=self.confidence_threshold,
+            iou_threshold=self.nms_threshold,
+            input_shape=(self.input_height, self.input_width),
+            ratio_pad=ratio_pad,
+        )
         
         self.postprocessing_times.append(time.time() - start_time)
         return detections
     
     def detect(self, image):
         """Run detection on a single image"""
-        # Preprocess
-        input_image = self.preprocess_image(image)
+        # Preprocess (fills the interpreter input in place)
+        ratio_pad = self.preprocess_image(image)
         
         # Run inference
         start_time = time.time()
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_image)
         self.interpreter.invoke()
         outputs = [self.interpreter.get_tensor(output['index']) for output in self.output_details]
         self.inference_times.append(time.time() - start_time)
         
         # Postprocess
-        detections = self.postprocess_outputs(outputs, image.shape)
+        detections = self.postprocess_outputs(outputs, image.shape, ratio_pad)
         
         return detections
     
@@ -201,9 +115,8 @@ class TFLiteDetector:
 
 def draw_detections(image, detections):
     """Draw detection boxes and labels on image"""
-    for detection in detections:
-        x1, y1, x2, y2 = detection['bbox']
-        confidence = detection['confidence']
+    for bbox, confidence in zip(detections['bbox'].astype(int).tolist(), detections['score'].tolist()):
+        x1, y1, x2, y2 = bbox
         
         # Draw bounding box
         cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
@@ -222,12 +135,19 @@ def draw_detections(image, detections):
     
     return image
 
-def test_video(model_path, video_path, output_path=None, show_video=True):
+def test_video(model_path, video_path, output_path=None, show_video=True, confidence_threshold=0.25, nms_threshold=0.45,
+               num_threads=None, use_xnnpack=True, num_workers=1):
     """Test TFLite model on video file"""
     print(f"🎬 Testing TFLite model on video: {video_path}")
     
-    # Initialize detector
-    detector = TFLiteDetector(model_path)
+    # Initialize detector (a pool of interpreters keeps several frames in flight)
+    detector = pool = None
+    if num_workers > 1:
+        pool = TFLiteInterpreterPool(model_path, num_workers, num_threads, use_xnnpack,
+                                     confidence_threshold, nms_threshold)
+    else:
+        detector = TFLiteDetector(model_path, confidence_threshold, nms_threshold, num_threads, use_xnnpack)
+    pending = deque()
     
     # Open video
     cap = cv2.VideoCapture(video_path)
@@ -258,6 +178,49 @@ def test_video(model_path, video_path, output_path=None, show_video=True):
     print("Press 'q' to quit, 'space' to pause/resume")
     
     paused = False
+
+    def process_result(frame, detections):
+        """Count, draw, save and show one frame's detections"""
+        nonlocal frame_count, detection_count
+        frame_count += 1
+        detection_count += len(detections)
+        
+        # Draw detections
+        frame_with_detections = draw_detections(frame.copy(), detections)
+        
+        # Add performance info
+        if frame_count > 1:  # Skip first frame for accurate timing
+            if pool is not None:
+                stats = {'fps': frame_count / (time.time() - start_time)}
+                stats['avg_total_time'] = 1000.0 / stats['fps']
+            else:
+                stats = detector.get_performance_stats()
+            info_text = [
+                f"Frame: {frame_count}/{total_frames}",
+                f"Detections: {len(detections)}",
+                f"Processing: {stats.get('avg_total_time', 0):.1f}ms",
+                f"FPS: {stats.get('fps', 0):.1f}",
+                f"Total detected: {detection_count}"
+            ]
+            
+            for i, text in enumerate(info_text):
+                cv2.putText(frame_with_detections, text, (10, 30 + i * 25),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                cv2.putText(frame_with_detections, text, (10, 30 + i * 25),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 1)
+        
+        # Save frame if output writer is available
+        if out_writer:
+            out_writer.write(frame_with_detections)
+        
+        # Show frame
+        if show_video:
+            cv2.imshow('License Plate Detection Test', frame_with_detections)
+        
+        # Progress update
+        if frame_count % 30 == 0:
+            progress = (frame_count / total_frames) * 100
+            print(f"📊 Progress: {progress:.1f}% ({frame_count}/{total_frames})")
     
     try:
         while True:
@@ -266,39 +229,15 @@ def test_video(model_path, video_path, output_path=None, show_video=True):
                 if not ret:
                     break
                 
-                frame_count += 1
-                
                 # Run detection
-                detections = detector.detect(frame)
-                detection_count += len(detections)
-                
-                # Draw detections
-                frame_with_detections = draw_detections(frame.copy(), detections)
-                
-                # Add performance info
-                if frame_count > 1:  # Skip first frame for accurate timing
-                    stats = detector.get_performance_stats()
-                    info_text = [
-                        f"Frame: {frame_count}/{total_frames}",
-                        f"Detections: {len(detections)}",
-                        f"Processing: {stats.get('avg_total_time', 0):.1f}ms",
-                        f"FPS: {stats.get('fps', 0):.1f}",
-                        f"Total detected: {detection_count}"
-                    ]
-                    
-                    for i, text in enumerate(info_text):
-                        cv2.putText(frame_with_detections, text, (10, 30 + i * 25),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                        cv2.putText(frame_with_detections, text, (10, 30 + i * 25),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 1)
-                
-                # Save frame if output writer is available
-                if out_writer:
-                    out_writer.write(frame_with_detections)
-                
-                # Show frame
-                if show_video:
-                    cv2.imshow('License Plate Detection Test', frame_with_detections)
+                if pool is not None:
+                    # Keep num_workers frames in flight, then consume them in order
+                    pending.append((frame, pool.submit(frame)))
+                    if len(pending) >= num_workers:
+                        frame, future = pending.popleft()
+                        process_result(frame, future.result())
+                else:
+                    process_result(frame, detector.detect(frame))
             
             # Handle keyboard input
             if show_video:
@@ -308,17 +247,19 @@ def test_video(model_path, video_path, output_path=None, show_video=True):
                 elif key == ord(' '):
                     paused = not paused
                     print(f"{'⏸️ Paused' if paused else '▶️ Resumed'}")
-            
-            # Progress update
-            if frame_count % 30 == 0:
-                progress = (frame_count / total_frames) * 100
-                print(f"📊 Progress: {progress:.1f}% ({frame_count}/{total_frames})")
+
+        # Frames still in flight in the pool when the video ended (or on quit)
+        while pending:
+            frame, future = pending.popleft()
+            process_result(frame, future.result())
     
     except KeyboardInterrupt:
         print("\n⚠️ Interrupted by user")
     
     finally:
         # Cleanup
+        if pool is not None:
+            pool.close()
         cap.release()
         if out_writer:
             out_writer.release()
@@ -327,7 +268,11 @@ def test_video(model_path, video_path, output_path=None, show_video=True):
     
     # Final statistics
     total_time = time.time() - start_time
-    stats = detector.get_performance_stats()
+    if pool is not None:
+        # Per-stage timings are not tracked across pool workers, report wall-clock throughput
+        stats = {'fps': frame_count / total_time, 'avg_total_time': total_time * 1000 / max(frame_count, 1)}
+    else:
+        stats = detector.get_performance_stats()
     
     print("\n📊 Final Performance Report:")
     print("=" * 50)
@@ -360,6 +305,12 @@ def main():
                        help='Confidence threshold for detection')
     parser.add_argument('--nms', type=float, default=0.45,
                        help='NMS threshold for detection')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='Threads per TFLite interpreter (default: TFLite default)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of pooled interpreters processing frames concurrently')
+    parser.add_argument('--no-xnnpack', action='store_true',
+                       help='Disable the XNNPACK delegate')
     
     args = parser.parse_args()
     
@@ -396,7 +347,12 @@ def main():
         model_path=args.model,
         video_path=args.video,
         output_path=args.output,
-        show_video=not args.no_display
+        show_video=not args.no_display,
+        confidence_threshold=args.confidence,
+        nms_threshold=args.nms,
+        num_threads=args.threads,
+        use_xnnpack=not args.no_xnnpack,
+        num_workers=args.workers
     )
     
     if success:
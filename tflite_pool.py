@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+TFLite Interpreter Pool
+One TFLite interpreter per worker thread with configurable intra-op threads and
+optional XNNPACK, so several frames are in flight at once (invoke() releases the GIL).
+Measures the real CPU throughput of the same .tflite model the Android app ships.
+"""
+
+import argparse
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from letterbox import LetterboxPreprocessor
+from yolo_postprocess import decode_yolo_output
+
+
+def _interpreter_api():
+    """Return (Interpreter, OpResolverType), preferring the light tflite_runtime package"""
+    try:
+        from tflite_runtime.interpreter import Interpreter, OpResolverType
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+        OpResolverType = tf.lite.experimental.OpResolverType
+    return Interpreter, OpResolverType
+
+
+def create_interpreter(model_path, num_threads=None, use_xnnpack=True):
+    """
+    Create and allocate a TFLite interpreter.
+
+    XNNPACK is applied by default by the builtin op resolver; disabling it selects
+    BUILTIN_WITHOUT_DEFAULT_DELEGATES so the reference CPU kernels are used instead.
+    """
+    Interpreter, OpResolverType = _interpreter_api()
+    kwargs = {'model_path': model_path, 'num_threads': num_threads}
+    if not use_xnnpack:
+        kwargs['experimental_op_resolver_type'] = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    interpreter = Interpreter(**kwargs)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+class _PoolWorker:
+    """An interpreter plus the letterbox buffer bound to its input tensor"""
+
+    def __init__(self, model_path, num_threads, use_xnnpack):
+        self.interpreter = create_interpreter(model_path, num_threads, use_xnnpack)
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_indices = [detail['index'] for detail in self.interpreter.get_output_details()]
+        self.letterbox = LetterboxPreprocessor.for_input_details(self.input_detail)
+        self.letterbox.bind_interpreter(self.interpreter, self.input_detail['index'])
+
+    def run(self, frame):
+        _, ratio_pad = self.letterbox(frame)
+        self.interpreter.invoke()
+        # get_tensor copies, so the outputs survive the next invoke() on this interpreter
+        outputs = [self.interpreter.get_tensor(index) for index in self.output_indices]
+        return outputs, ratio_pad
+
+
+class TFLiteInterpreterPool:
+    """
+    Pool of TFLite interpreters for pipelined detection.
+
+    Each worker owns an interpreter (TFLite interpreters are not thread-safe), so
+    set_tensor/invoke/get_tensor of different frames overlap across workers while
+    decoding runs outside the interpreter lock-step.
+    """
+
+    def __init__(self, model_path, num_workers=2, num_threads=None, use_xnnpack=True,
+                 confidence_threshold=0.25, nms_threshold=0.45):
+        self.model_path = model_path
+        self.num_workers = num_workers
+        self.num_threads = num_threads
+        self.use_xnnpack = use_xnnpack
+        self.confidence_threshold = confidence_threshold
+        self.nms_threshold = nms_threshold
+
+        workers = [_PoolWorker(model_path, num_threads, use_xnnpack) for _ in range(num_workers)]
+        self.input_shape = tuple(workers[0].input_detail['shape'][1:3])
+        self._idle = queue.Queue()
+        for worker in workers:
+            self._idle.put(worker)
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='tflite')
+
+        print(f"✅ TFLite pool: {num_workers} interpreter(s) x {num_threads or 'default'} thread(s), "
+              f"XNNPACK {'on' if use_xnnpack else 'off'} - {model_path}")
+
+    def _detect(self, frame):
+        worker = self._idle.get()
+        try:
+            outputs, ratio_pad = worker.run(frame)
+        finally:
+            self._idle.put(worker)
+        return decode_yolo_output(
+            outputs[0], frame.shape,
+            conf_threshold=self.confidence_threshold,
+            iou_threshold=self.nms_threshold,
+            input_shape=self.input_shape,
+            ratio_pad=ratio_pad,
+        )
+
+    def submit(self, frame):
+        """Queue a frame for detection, returning a Future of its DETECTION_DTYPE array"""
+        return self._executor.submit(self._detect, frame)
+
+    def detect(self, frame):
+        """Detect on a single frame (blocking)"""
+        return self._detect(frame)
+
+    def detect_batch(self, frames):
+        """Detect on several frames concurrently, results in input order"""
+        return list(self._executor.map(self._detect, frames))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def benchmark_pool(model_path, frames, num_workers, num_threads, use_xnnpack, warmup=5):
+    """Return sustained frames/second of a pool configuration over `frames`"""
+    with TFLiteInterpreterPool(model_path, num_workers, num_threads, use_xnnpack) as pool:
+        pool.detect_batch(frames[:warmup])
+        start_time = time.perf_counter()
+        pool.detect_batch(frames)
+        elapsed = time.perf_counter() - start_time
+    return len(frames) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure TFLite detector throughput with an interpreter pool')
+    parser.add_argument('--model', default='androidApp/src/main/assets/models/license_plate_detector.tflite',
+                        help='Path to TFLite model file')
+    parser.add_argument('--video', default='script_videos/luxury.mp4', help='Video to take frames from')
+    parser.add_argument('--frames', type=int, default=100, help='Number of frames to benchmark on')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='Interpreter counts to try')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4],
+                        help='Per-interpreter thread counts to try')
+    parser.add_argument('--no-xnnpack', action='store_true', help='Disable the XNNPACK delegate')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model file not found: {args.model}")
+        return
+    frames = _read_frames(args.video, args.frames)
+    if not frames:
+        print(f"❌ No frames read from: {args.video}")
+        return
+
+    print(f"🚀 Benchmarking on {len(frames)} frames ({os.cpu_count()} CPUs)")
+    results = []
+    for num_workers in args.workers:
+        for num_threads in args.threads:
+            fps = benchmark_pool(args.model, frames, num_workers, num_threads, not args.no_xnnpack)
+            results.append((num_workers, num_threads, fps))
+            print(f"   workers={num_workers} threads={num_threads}: {fps:.1f} FPS")
+
+    best = max(results, key=lambda r: r[2])
+    print(f"🏆 Best: workers={best[0]} threads={best[1]} -> {best[2]:.1f} FPS")
+
+
+if __name__ == '__main__':
+    main()
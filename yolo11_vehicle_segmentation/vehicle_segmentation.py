@@ -29,6 +29,111 @@ CLASS_COLORS = {
     7: (0, 0, 255)     # Truck - Red
 }
 
+# Weight of the class color in the mask overlay (the image keeps 1 - MASK_ALPHA)
+MASK_ALPHA = 0.3
+
+
+class SegmentationOverlayRenderer:
+    """
+    Draws segmentation masks, boxes and labels with a single blend per frame.
+
+    Every mask is resized only inside its box and written into one label map of class ids,
+    which a palette lookup turns into the color overlay. The overlay is blended once over the
+    region covered by the boxes, so the cost grows with the masked area rather than with
+    detections x frame pixels. The label map and overlay buffers are reused between frames.
+    """
+
+    def __init__(self, alpha=MASK_ALPHA, colors=None):
+        """
+        Args:
+            alpha (float): Weight of the class color in the overlay
+            colors (dict): Class id -> BGR color, defaults to CLASS_COLORS
+        """
+        self.alpha = alpha
+        self.colors = CLASS_COLORS if colors is None else colors
+        # Label 0 is the background, so class ids are used as labels directly (cv2.LUT table layout)
+        self.palette = np.zeros((256, 1, 3), dtype=np.uint8)
+        for class_id, color in self.colors.items():
+            self.palette[class_id] = color
+        self._label_map = None
+        self._overlay = None
+
+    def _buffers(self, height, width, roi_height, roi_width):
+        """Label map of the frame size, and a contiguous overlay view of the ROI size"""
+        if self._label_map is None or self._label_map.shape != (height, width):
+            self._label_map = np.zeros((height, width), dtype=np.uint8)
+            self._overlay = np.empty(height * width * 3, dtype=np.uint8)
+        return self._label_map, self._overlay[:roi_height * roi_width * 3].reshape(roi_height, roi_width, 3)
+
+    def render(self, img, detections, out=None):
+        """
+        Draw segmentation results on image
+
+        Args:
+            img (numpy.ndarray): Input BGR image
+            detections (list): List of detection dictionaries (class_id, confidence, box, mask)
+            out (numpy.ndarray): Image to draw on, i.e. `img` itself to draw in place (default: a copy)
+
+        Returns:
+            numpy.ndarray: Image with results drawn
+        """
+        result_img = img.copy() if out is None else out
+        height, width = img.shape[:2]
+        # Detections with their box clipped to the frame, those fully outside it have no mask to draw
+        boxes = []
+        for detection in detections:
+            x1, y1, x2, y2 = detection['box'].astype(int)
+            x1, y1 = max(x1, 0), max(y1, 0)
+            x2, y2 = min(x2, width), min(y2, height)
+            if x2 > x1 and y2 > y1:
+                boxes.append((detection, (x1, y1, x2, y2)))
+
+        if boxes:
+            # Union of the boxes: the only region the label map and the blend touch
+            roi_x1 = min(box[0] for _, box in boxes)
+            roi_y1 = min(box[1] for _, box in boxes)
+            roi_x2 = max(box[2] for _, box in boxes)
+            roi_y2 = max(box[3] for _, box in boxes)
+            label_map, overlay = self._buffers(height, width, roi_y2 - roi_y1, roi_x2 - roi_x1)
+            label_roi = label_map[roi_y1:roi_y2, roi_x1:roi_x2]
+            label_roi.fill(0)
+
+            for detection, (x1, y1, x2, y2) in boxes:
+                # The mask covers the whole frame at model resolution: crop the box, then resize it
+                mask = detection['mask']
+                scale_x, scale_y = mask.shape[1] / width, mask.shape[0] / height
+                mask_x1, mask_y1 = int(x1 * scale_x), int(y1 * scale_y)
+                mask_x2 = max(int(np.ceil(x2 * scale_x)), mask_x1 + 1)
+                mask_y2 = max(int(np.ceil(y2 * scale_y)), mask_y1 + 1)
+                mask_box = cv2.resize(mask[mask_y1:mask_y2, mask_x1:mask_x2], (x2 - x1, y2 - y1))
+                # Later detections are drawn over earlier ones where masks overlap
+                label_map[y1:y2, x1:x2][mask_box > 0.5] = detection['class_id']
+
+            # Palette lookup and blend, both in place in the overlay buffer, then copy the masked pixels
+            cv2.cvtColor(label_roi, cv2.COLOR_GRAY2BGR, dst=overlay)
+            cv2.LUT(overlay, self.palette, dst=overlay)
+            cv2.addWeighted(img[roi_y1:roi_y2, roi_x1:roi_x2], 1.0 - self.alpha, overlay, self.alpha, 0, dst=overlay)
+            cv2.copyTo(overlay, label_roi, result_img[roi_y1:roi_y2, roi_x1:roi_x2])
+
+        for detection in detections:
+            class_id = detection['class_id']
+            color = self.colors[class_id]
+
+            # Draw bounding box
+            x1, y1, x2, y2 = detection['box'].astype(int)
+            cv2.rectangle(result_img, (x1, y1), (x2, y2), color, 2)
+
+            # Draw label
+            label = f"{CLASS_NAMES[class_id]}: {detection['confidence']:.2f}"
+            label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+            cv2.rectangle(result_img, (x1, y1 - label_size[1] - 10),
+                          (x1 + label_size[0], y1), color, -1)
+            cv2.putText(result_img, label, (x1, y1 - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+        return result_img
+
+
 class VehicleSegmentation:
     def __init__(self, model_size='s'):
         """
@@ -45,6 +150,9 @@ class VehicleSegmentation:
         
         # Verify model loaded successfully
         print(f"Model loaded successfully: {self.model_name}")
+
+        # Keeps its mask buffers between the frames of a video
+        self.renderer = SegmentationOverlayRenderer()
         
     def process_image(self, image_path, output_dir="output", conf_threshold=0.5):
         """
@@ -175,8 +283,8 @@ class VehicleSegmentation:
                                     'mask': mask.data[0].cpu().numpy()
                                 })
                 
-                # Draw results on frame
-                result_frame = self.draw_results(frame, vehicle_detections)
+                # Draw results on frame (in place, the raw frame isn't needed afterwards)
+                result_frame = self.renderer.render(frame, vehicle_detections, out=frame)
                 
                 # Calculate FPS
                 fps_counter += 1
@@ -266,49 +374,15 @@ class VehicleSegmentation:
     def draw_results(self, img, detections):
         """
         Draw segmentation results on image
-        
+
         Args:
             img (numpy.ndarray): Input image
             detections (list): List of detection dictionaries
-            
+
         Returns:
             numpy.ndarray: Image with results drawn
         """
-        result_img = img.copy()
-        
-        for detection in detections:
-            class_id = detection['class_id']
-            confidence = detection['confidence']
-            box = detection['box']
-            mask = detection['mask']
-            
-            # Get class info
-            class_name = CLASS_NAMES[class_id]
-            color = CLASS_COLORS[class_id]
-            
-            # Resize mask to match image dimensions
-            mask_resized = cv2.resize(mask, (img.shape[1], img.shape[0]))
-            
-            # Create colored mask
-            colored_mask = np.zeros_like(img)
-            colored_mask[mask_resized > 0.5] = color
-            
-            # Blend mask with original image
-            result_img = cv2.addWeighted(result_img, 0.7, colored_mask, 0.3, 0)
-            
-            # Draw bounding box
-            x1, y1, x2, y2 = box.astype(int)
-            cv2.rectangle(result_img, (x1, y1), (x2, y2), color, 2)
-            
-            # Draw label
-            label = f"{class_name}: {confidence:.2f}"
-            label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
-            cv2.rectangle(result_img, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), color, -1)
-            cv2.putText(result_img, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        
-        return result_img
+        return self.renderer.render(img, detections)
     
     def detect_in_directory(self, input_dir, output_dir="output", conf_threshold=0.5):
         """
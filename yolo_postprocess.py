@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+YOLO Output Post-processing
+Vectorized NumPy decoding of raw YOLO detector outputs: confidence threshold,
+xywh -> xyxy scaling back to the original image, class-aware NMS and top-k.
+Shared by the TFLite test/debug scripts so they all decode detections the same way.
+"""
+
+import numpy as np
+
+# Structured detection record returned by every decoder in this module
+DETECTION_DTYPE = np.dtype([
+    ('bbox', np.float32, (4,)),   # x1, y1, x2, y2 in original image pixels
+    ('score', np.float32),
+    ('class_id', np.int32),
+])
+
+
+def empty_detections():
+    """Zero-length detection array"""
+    return np.zeros(0, dtype=DETECTION_DTYPE)
+
+
+def make_detections(boxes, scores, class_ids):
+    """Pack parallel box/score/class arrays into a DETECTION_DTYPE array"""
+    detections = np.empty(len(scores), dtype=DETECTION_DTYPE)
+    detections['bbox'] = boxes
+    detections['score'] = scores
+    detections['class_id'] = class_ids
+    return detections
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU between two (N, 4) and (M, 4) arrays of x1, y1, x2, y2 boxes"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def non_max_suppression(boxes, scores, iou_threshold=0.45, class_ids=None, max_detections=300):
+    """
+    Greedy NMS over (N, 4) xyxy boxes. Returns kept indices, highest score first.
+
+    With `class_ids`, suppression is class-aware: boxes are shifted by class_id * (max
+    coordinate + 1) so boxes of different classes can never overlap, and one NMS pass
+    handles all classes at once.
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if class_ids is not None:
+        offset = boxes.max() + 1.0
+        boxes = boxes + (np.asarray(class_ids, dtype=np.float32) * offset)[:, None]
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(scores)[::-1]
+
+    keep = []
+    while order.size > 0 and len(keep) < max_detections:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        union = areas[i] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def scale_boxes(boxes, original_shape, input_shape=None, ratio_pad=None, normalized=True):
+    """
+    Map (N, 4) xyxy boxes from model input space back to the original image, in place.
+
+    Args:
+        boxes: Boxes in model input space (normalized to [0, 1] if `normalized`)
+        original_shape: Original image shape (height, width, ...)
+        input_shape: Model input (height, width); defaults to the original shape, which
+            matches stretch-resized inputs with normalized outputs
+        ratio_pad: (ratio, (pad_w, pad_h)) from letterbox preprocessing; None for a
+            plain stretch resize
+        normalized: Whether the model outputs coordinates normalized by the input size
+    """
+    orig_h, orig_w = original_shape[:2]
+    in_h, in_w = input_shape[:2] if input_shape is not None else (orig_h, orig_w)
+    if normalized:
+        boxes *= np.array([in_w, in_h, in_w, in_h], dtype=boxes.dtype)
+    if ratio_pad is None:
+        boxes *= np.array([orig_w / in_w, orig_h / in_h, orig_w / in_w, orig_h / in_h], dtype=boxes.dtype)
+    else:
+        ratio, (pad_w, pad_h) = ratio_pad
+        boxes -= np.array([pad_w, pad_h, pad_w, pad_h], dtype=boxes.dtype)
+        boxes /= ratio
+    np.clip(boxes[:, 0::2], 0, orig_w, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, orig_h, out=boxes[:, 1::2])
+    return boxes
+
+
+def decode_yolo_output(output, original_shape, conf_threshold=0.25, iou_threshold=0.45,
+                       max_detections=300, input_shape=None, ratio_pad=None, normalized=True,
+                       has_objectness=False, class_agnostic=False):
+    """
+    Decode a raw (pre-NMS) YOLO head output into a DETECTION_DTYPE array.
+
+    Accepts (1, C, N), (C, N), (1, N, C) or (N, C) outputs; the channel axis is the
+    smaller one, so exports with transposed heads (i.e. TFLite's (1, 5, 8400)) need no
+    special casing. Channels are cx, cy, w, h followed by per-class scores (YOLOv8/11),
+    or by an objectness score and class scores when `has_objectness` (YOLOv5).
+    """
+    output = np.asarray(output)
+    if output.ndim == 3:
+        output = output[0]
+    if output.shape[0] < output.shape[1]:
+        output = output.T  # (C, N) -> (N, C)
+
+    if has_objectness:
+        class_scores = output[:, 5:] * output[:, 4:5] if output.shape[1] > 5 else output[:, 4:5]
+    else:
+        class_scores = output[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_scores)), class_ids]
+
+    candidates = scores > conf_threshold
+    if not candidates.any():
+        return empty_detections()
+    xywh = output[candidates, :4].astype(np.float32)
+    scores = scores[candidates].astype(np.float32)
+    class_ids = class_ids[candidates]
+
+    # xywh -> xyxy
+    boxes = np.empty_like(xywh)
+    half_wh = xywh[:, 2:4] / 2
+    boxes[:, :2] = xywh[:, :2] - half_wh
+    boxes[:, 2:] = xywh[:, :2] + half_wh
+    scale_boxes(boxes, original_shape, input_shape, ratio_pad, normalized)
+
+    keep = non_max_suppression(boxes, scores, iou_threshold,
+                               None if class_agnostic else class_ids, max_detections)
+    return make_detections(boxes[keep], scores[keep], class_ids[keep])
+
+
+def decode_nms_output(output, original_shape, conf_threshold=0.25, max_detections=300,
+                      input_shape=None, ratio_pad=None, normalized=False):
+    """
+    Decode an end-to-end (NMS already applied) output of (N, 6) rows
+    x1, y1, x2, y2, score, class_id into a DETECTION_DTYPE array.
+    """
+    output = np.asarray(output)
+    if output.ndim == 3:
+        output = output[0]
+    if output.size == 0 or output.shape[-1] < 6:
+        return empty_detections()
+
+    output = output[output[:, 4] > conf_threshold]
+    output = output[np.argsort(output[:, 4])[::-1][:max_detections]]
+    boxes = output[:, :4].astype(np.float32)
+    scale_boxes(boxes, original_shape, input_shape, ratio_pad, normalized)
+    return make_detections(boxes, output[:, 4], output[:, 5].astype(np.int32))
+
+
+def detections_to_list(detections, class_names=None):
+    """Convert a DETECTION_DTYPE array into JSON-serializable dicts"""
+    results = []
+    for bbox, score, class_id in zip(detections['bbox'].tolist(), detections['score'].tolist(),
+                                     detections['class_id'].tolist()):
+        det = {'bbox': bbox, 'confidence': score, 'class_id': class_id}
+        if class_names is not None:
+            det['class'] = class_names[class_id]
+        results.append(det)
+    return results